@@ -1,5 +1,8 @@
 # bookmode/admin.py
 from django.contrib import admin
+from django.db import transaction
+
+from quiz.changes import batched_bank_changes
 
 from .models import BookModeSession
 
@@ -9,3 +12,8 @@ class BookModeSessionAdmin(admin.ModelAdmin):
     list_display = ("order_index", "question_text", "section", "active")
     list_editable = ("active", "section",)
     search_fields = ("question_text", "correct_answer")
+
+    def delete_queryset(self, request, queryset):
+        # "delete selected": one change-log write for the lot, not one per row
+        with transaction.atomic(), batched_bank_changes():
+            super().delete_queryset(request, queryset)
@@ -0,0 +1,52 @@
+# bookmode/facets.py
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from quiz.bank import get_bank_version
+
+from .models import BookModeSession
+
+
+FACET_CACHE_TIMEOUT = 60 * 60 * 24
+
+_local = {}
+
+
+def get_section_facets():
+    """
+    Sections of active BookModeSession rows with their counts:
+      {"total": n, "sections": [(section, count), ...], "by_norm": {section_norm: count}}
+
+    Cached like quiz.facets: per process and in the Django cache, keyed
+    on the bank version.
+    """
+    version = get_bank_version()
+    facets = _local.get(version)
+    if facets is None:
+        cache_key = f"bookmode:sections:{version}"
+        facets = cache.get(cache_key)
+        if facets is None:
+            rows = (
+                BookModeSession.objects.filter(active=True)
+                .order_by()
+                .values_list("section", "section_norm")
+                .annotate(n=Count("id"))
+            )
+            sections = {}
+            by_norm = {}
+            total = 0
+            for section, section_norm, n in rows:
+                total += n
+                by_norm[section_norm] = by_norm.get(section_norm, 0) + n
+                if section:
+                    sections[section] = sections.get(section, 0) + n
+            facets = {
+                "total": total,
+                "sections": sorted(sections.items()),
+                "by_norm": by_norm,
+            }
+            cache.set(cache_key, facets, FACET_CACHE_TIMEOUT)
+        _local.clear()
+        _local[version] = facets
+    return facets
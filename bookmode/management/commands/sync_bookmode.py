@@ -0,0 +1,16 @@
+# bookmode/management/commands/sync_bookmode.py
+
+from django.core.management.base import BaseCommand
+
+from bookmode.sync import sync_book_based_to_bookmode
+
+
+class Command(BaseCommand):
+    help = (
+        "Sync book-based Questions into BookModeSession (listening mode). "
+        "Same as the 'Copy all Book-Based Questions' admin action."
+    )
+
+    def handle(self, *args, **options):
+        result = sync_book_based_to_bookmode()
+        self.stdout.write(self.style.SUCCESS(result.summary()))
@@ -10,12 +10,40 @@ class BookModeSession(models.Model):
     has_played = models.BooleanField(default=False)  # tracking
     section = models.CharField(max_length=100, blank=True)  # optional grouping
     active = models.BooleanField(default=True)  # allow disabling
+    # lower-cased section, so the listening filter is an indexed equality
+    section_norm = models.CharField(max_length=100, blank=True, default='', editable=False)
+
+    class Meta:
+        # Partial indexes on active rows: Django emits a bare "active" test,
+        # which SQLite can only use through an index with the same WHERE.
+        indexes = [
+            # book_listen: active rows of one section, in play order
+            models.Index(fields=['section_norm', 'order_index', 'id'], condition=models.Q(active=True), name='bookmode_active_section_idx'),
+            # book_listen with "All sections"
+            models.Index(fields=['order_index', 'id'], condition=models.Q(active=True), name='bookmode_active_order_idx'),
+            # DISTINCT section dropdown
+            models.Index(fields=['section'], condition=models.Q(active=True), name='bookmode_active_sec_name_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.section_norm = (self.section or "").strip().lower()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | {"section_norm"}
+        super().save(*args, **kwargs)
 
     def get_distractor_list(self):
         if not self.distractors:
             return []
         return [d.strip() for d in self.distractors.split('\n') if d.strip()]
 
+    def listen_text(self, position):
+        """
+        Sentence read out by listening mode for this item at 1-based `position`.
+        Built server-side so pre-generated audio matches what the page requests.
+        """
+        return f"Question {position}. {self.question_text}. Correct answer: {self.correct_answer}."
+
     def __str__(self):
         return f"{self.order_index}. {self.question_text[:50]}"
 
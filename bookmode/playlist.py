@@ -0,0 +1,117 @@
+# bookmode/playlist.py
+
+import hashlib
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from quiz.bank import get_bank_version
+from quiz.packs import PackStore
+
+from .models import BookModeSession
+
+
+def playlist_name(section) -> str:
+    """File-safe name for a section's playlist ('' = all sections)."""
+    section_norm = (section or "").strip().lower()
+    if not section_norm:
+        return "playlist-all"
+    return "playlist-" + hashlib.sha1(section_norm.encode("utf-8")).hexdigest()[:16]
+
+
+def listen_queryset(section=None):
+    """Active sessions of one section (or all), in play order."""
+    qs = BookModeSession.objects.filter(active=True)
+    if section:
+        qs = qs.filter(section_norm=section.strip().lower())
+    return qs.order_by("order_index", "id")
+
+
+# ----------------- NAVIGATION -----------------
+#
+# The listening page remembers where you are by (order_index, id) rather
+# than by a row number: every move is one seek on the partial
+# (section_norm,) order_index, id index instead of an OFFSET, and the
+# position stays on the same item when rows are added or deactivated.
+
+def item_key(item):
+    return [item.order_index, item.id]
+
+
+def _after(key):
+    order_index, pk = key
+    # the plain >= bound lets SQLite start the index range at order_index
+    return Q(order_index__gte=order_index) & (Q(order_index__gt=order_index) | Q(id__gt=pk))
+
+
+def _before(key):
+    order_index, pk = key
+    return Q(order_index__lte=order_index) & (Q(order_index__lt=order_index) | Q(id__lt=pk))
+
+
+def next_item(qs, key):
+    """First row after `key` in play order, or None at the end."""
+    return qs.filter(_after(key)).first()
+
+
+def prev_item(qs, key):
+    """Last row before `key` in play order, or None at the start."""
+    return qs.filter(_before(key)).last()
+
+
+def item_at(qs, key):
+    """
+    The row at `key`; if it was deleted or deactivated meanwhile, the one
+    that now follows it (or the last one).
+    """
+    order_index, pk = key
+    item = qs.filter(order_index=order_index, id=pk).first()
+    return item or next_item(qs, key) or prev_item(qs, key)
+
+
+def item_rank(section, key) -> int:
+    """
+    1-based position of `key` in the section, for "N of M". A COUNT over
+    the index range before it, cached per bank version; the view mostly
+    carries the rank along in the session (+1 / -1 per step) instead.
+    """
+    cache_key = f"bookmode:listen_rank:{get_bank_version()}:{playlist_name(section)}:{key[0]}:{key[1]}"
+    rank = cache.get(cache_key)
+    if rank is None:
+        rank = listen_queryset(section).filter(_before(key)).count() + 1
+        cache.set(cache_key, rank, 60 * 60)
+    return rank
+
+
+# ----------------- PLAYLIST -----------------
+
+def build_playlist(name, version, section):
+    """Everything the listening page plays, in order (one query)."""
+    rows = listen_queryset(section).only("id", "question_text", "correct_answer")
+    return {
+        "section": section or "",
+        "version": version,
+        "items": [
+            {
+                "id": item.id,
+                "question_text": item.question_text,
+                "correct_answer": item.correct_answer,
+                # sentence is built server-side (BookModeSession.listen_text) so it
+                # matches the audio made by `manage.py pregenerate_audio`
+                "tts_text": item.listen_text(position),
+            }
+            for position, item in enumerate(rows.iterator(chunk_size=1000), start=1)
+        ],
+    }
+
+
+_store = None
+
+
+def get_playlist_store() -> PackStore:
+    global _store
+    if _store is None:
+        _store = PackStore(Path(settings.PACK_CACHE_DIR) / "playlists", build_playlist, settings.PACK_PRUNE_AFTER)
+    return _store
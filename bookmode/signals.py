@@ -0,0 +1,19 @@
+# bookmode/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from quiz.bank import bump_bank_version
+from quiz.changes import after_bank_commit, log_bank_change
+from quiz.models import BankChange
+from quiz.signals import bank_changed
+
+from .models import BookModeSession
+
+
+@receiver(post_save, sender=BookModeSession)
+@receiver(post_delete, sender=BookModeSession)
+@receiver(bank_changed, sender=BookModeSession)
+def book_session_changed(sender, signal, instance=None, changed_ids=(), deleted_ids=(), **kwargs):
+    log_bank_change(BankChange.MODEL_BOOKMODE, signal, instance, changed_ids, deleted_ids)
+    after_bank_commit(bump_bank_version)
@@ -0,0 +1,121 @@
+# bookmode/sync.py
+
+import time
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Max
+
+from quiz.models import Question
+from quiz.normalise import normalise_question
+from quiz.signals import bank_changed
+
+from .models import BookModeSession
+
+
+SYNC_FIELDS = ["question_text", "correct_answer", "distractors", "section", "section_norm", "active"]
+WRITE_BATCH = 500
+
+
+@dataclass
+class SyncResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (
+            f"Synced book-based questions: {self.created} created, "
+            f"{self.updated} updated, {self.unchanged} unchanged, "
+            f"{self.deactivated} deactivated ({self.seconds:.2f}s)."
+        )
+
+
+def session_values_for(question_text, answer_text, subcategory):
+    """The BookModeSession fields a book-based Question maps to."""
+    # Clean the answer a bit (strip trailing .?! etc)
+    cleaned_answer = (answer_text or "").strip().rstrip(".!?").strip()
+    section = (subcategory or "")[:100]
+    return {
+        "question_text": question_text,
+        "correct_answer": cleaned_answer[:255],
+        "distractors": "",
+        "section": section,
+        "section_norm": section.strip().lower(),
+        "active": True,
+    }
+
+
+def sync_book_based_to_bookmode(queryset=None):
+    """
+    Sync book-based questions from Question -> BookModeSession as a diff.
+
+    - Matches rows on normalised question text.
+    - Creates sessions for new questions (appended after the current
+      highest order_index), updates changed ones and leaves identical
+      ones untouched.
+    - Deactivates sessions whose source question no longer exists
+      (no book-based or selected question has that text any more).
+    - All writes are bulk operations inside one transaction.
+    """
+    started = time.perf_counter()
+    result = SyncResult()
+    book_based = Question.objects.filter(category="book_based")
+    if queryset is None or not queryset.exists():
+        queryset = book_based
+
+    source = queryset.order_by("id").values_list(
+        "question_norm", "question_text", "answer_text", "subcategory"
+    )
+
+    with transaction.atomic():
+        # Map existing sessions by normalised question text
+        existing = {}
+        for b in BookModeSession.objects.all().order_by("id"):
+            key = normalise_question(b.question_text)
+            if key:
+                existing[key] = b
+
+        order = BookModeSession.objects.aggregate(Max("order_index"))["order_index__max"] or 0
+
+        # desired state per key; if a question appears twice, the last one wins
+        desired = {}
+        for norm_key, question_text, answer_text, subcategory in source:
+            desired[norm_key] = session_values_for(question_text, answer_text, subcategory)
+
+        to_create = []
+        to_update = []
+        for norm_key, values in desired.items():
+            session = existing.get(norm_key)
+            if session is None:
+                order += 1
+                to_create.append(BookModeSession(order_index=order, **values))
+            elif any(getattr(session, f) != v for f, v in values.items()):
+                # keep existing order_index so order doesn't jump around
+                for f, v in values.items():
+                    setattr(session, f, v)
+                to_update.append(session)
+            else:
+                result.unchanged += 1
+
+        result.created = len(to_create)
+        result.updated = len(to_update)
+
+        BookModeSession.objects.bulk_create(to_create, batch_size=WRITE_BATCH)
+        BookModeSession.objects.bulk_update(to_update, SYNC_FIELDS, batch_size=WRITE_BATCH)
+
+        live_keys = set(desired) | set(book_based.values_list("question_norm", flat=True))
+        stale_ids = [
+            b.id for key, b in existing.items()
+            if b.active and key not in live_keys
+        ]
+        result.deactivated = BookModeSession.objects.filter(id__in=stale_ids).update(active=False)
+
+        changed_ids = [b.pk for b in to_create + to_update] + stale_ids
+        if changed_ids:
+            bank_changed.send(sender=BookModeSession, changed_ids=changed_ids, deleted_ids=[])
+
+    result.seconds = time.perf_counter() - started
+    return result
@@ -8,6 +8,7 @@ urlpatterns = [
     path("play/<int:question_id>/", views.book_play, name="book_play_question"),
     path("play/", views.book_play, name="book_play"),
     path("listen/", views.book_listen, name="book_listen"),
+    path("listen/playlist.json", views.book_listen_playlist, name="book_listen_playlist"),
     # path("sessions/", views.sessions, name="bookmode_sessions"),
     # path("cant_go_wrong/<int:q_id>", views.book_question_strict, name="book_question_strict"),
     # path("question/<int:q_id>/", views.book_question, name="book_question"),
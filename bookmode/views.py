@@ -1,11 +1,31 @@
-from django.shortcuts import render
-from .models import BookModeSession
-
+from urllib.parse import urlencode
 
+from django.shortcuts import render
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from quiz.bank import get_bank_version
+from quiz.conditional import template_page
+from quiz.packs import pack_response
+from quiz.tts import get_backend
+from .facets import get_section_facets
+from .playlist import (
+    get_playlist_store,
+    item_at,
+    item_key,
+    item_rank,
+    listen_queryset,
+    next_item,
+    playlist_name,
+    prev_item,
+)
+
+
+@template_page()
 def book_home(request):
     return render(request, "bookmode/book_home.html", {})
 
 
+@template_page(per_user=True)   # the page carries a CSRF token
 def book_play(request):
     mode = request.GET.get("mode", "normal")  # "normal" or "cant"
     context = {"mode": mode}
@@ -17,8 +37,11 @@ def book_listen(request):
     Listening drill:
     - walks through all BookModeSession questions in order_index (then id)
     - uses question_text + correct_answer
-    - remembers current index in the Django session
+    - remembers the current item in the Django session by its
+      (order_index, id) key; next/prev are single keyset seeks
     - supports filtering by BookModeSession.section (your 'sub category')
+    - the page only carries the current item; the JS fetches the whole
+      section once from book_listen_playlist (cached by ETag)
     """
 
     # ---------- READ SELECTED SECTION FROM REQUEST ----------
@@ -27,91 +50,102 @@ def book_listen(request):
     else:
         selected_category = (request.GET.get("category", "") or "").strip()
 
-    # Base queryset: all active sessions
-    base_qs = BookModeSession.objects.filter(active=True)
-
-    # Distinct list of sections from BookModeSession itself
-    categories = (
-        base_qs
-        .exclude(section__isnull=True)
-        .exclude(section__exact="")
-        .values_list("section", flat=True)
-        .distinct()
-        .order_by("section")
-    )
+    # Sections (with counts) for the dropdown; cached per bank version
+    facets = get_section_facets()
+    categories = facets["sections"]
 
-    # Apply section filter if one is chosen
-    qs = base_qs
+    # Apply section filter if one is chosen (keeps the original ordering)
+    qs = listen_queryset(selected_category)
     if selected_category:
-        qs = qs.filter(section__iexact=selected_category)
-
-    # Keep your original ordering
-    qs = qs.order_by("order_index", "id")
-
-    total = qs.count()
+        total = facets["by_norm"].get(selected_category.lower(), 0)
+    else:
+        total = facets["total"]
 
     # No questions at all (or none in this section)
+    empty_context = {
+        "question": None,
+        "index": 0,
+        "total": 0,
+        "categories": categories,
+        "selected_category": selected_category,
+    }
     if total == 0:
-        return render(
-            request,
-            "bookmode/book_listen.html",
-            {
-                "question": None,
-                "index": 0,
-                "total": 0,
-                "all_questions": [],
-                "categories": categories,
-                "selected_category": selected_category,
-            },
-        )
+        return render(request, "bookmode/book_listen.html", empty_context)
 
     # ---------- SESSION KEY PER SECTION ----------
     if selected_category:
-        session_key = f"book_listen_index_{selected_category}"
+        session_key = f"book_listen_pos_{selected_category}"
+    else:
+        session_key = "book_listen_pos"
+
+    # where we are: {"key": [order_index, id], "rank": 1-based, "version": bank version}
+    state = request.session.get(session_key)
+    if not isinstance(state, dict):
+        state = None
+    version = get_bank_version()
+
+    # Current question (one indexed seek, no OFFSET)
+    if state:
+        question = item_at(qs, state["key"])
+        rank = state["rank"]
     else:
-        session_key = "book_listen_index"
+        question = qs.first()
+        rank = 1
+
+    # the cached total can be behind the table: trust the lookup, not the count
+    if question is None:
+        return render(request, "bookmode/book_listen.html", empty_context)
 
-    # current index (0-based)
-    idx = request.session.get(session_key, 0)
+    # the item went away, or the bank changed under us: recount the rank
+    if state and (item_key(question) != state["key"] or state.get("version") != version):
+        rank = item_rank(selected_category, item_key(question))
 
     # ---------- POST ACTIONS: next / prev / reset ----------
     if request.method == "POST":
         action = request.POST.get("action")
 
         if action == "next":
-            idx += 1
+            following = next_item(qs, item_key(question))
+            if following is not None:
+                question, rank = following, rank + 1
         elif action == "prev":
-            idx -= 1
+            preceding = prev_item(qs, item_key(question))
+            if preceding is not None:
+                question, rank = preceding, rank - 1
         elif action == "reset":
-            idx = 0
+            question, rank = qs.first() or question, 1
 
-        # clamp
-        if idx < 0:
-            idx = 0
-        if idx >= total:
-            idx = total - 1
+    new_state = {"key": item_key(question), "rank": rank, "version": version}
+    if new_state != state:
+        request.session[session_key] = new_state
 
-        request.session[session_key] = idx
-
-    # extra safety clamp
-    if idx >= total:
-        idx = total - 1
-        request.session[session_key] = idx
-
-    # Current question
-    question = qs[idx]
-
-    # ---------- DATA FOR JS "PLAY ALL" ----------
-    all_questions = list(
-        qs.values("question_text", "correct_answer")
-    )
+    # ---------- PLAYLIST FOR JS "PLAY ALL" (fetched separately) ----------
+    playlist_url = reverse("book_listen_playlist")
+    if selected_category:
+        playlist_url += "?" + urlencode({"category": selected_category})
 
     context = {
         "question": question,
-        "index": idx + 1,  # 1-based for display
+        "index": rank,  # 1-based for display
         "total": total,
-        "all_questions": all_questions,
+        "playlist_url": playlist_url,
         "categories": categories,
         "selected_category": selected_category,
+        "tts_speed_steps": get_backend().speed_steps,
     }
     return render(request, "bookmode/book_listen.html", context)
+
+
+@require_GET
+def book_listen_playlist(request):
+    """
+    GET .../listen/playlist.json?category=<section>
+
+    The listening playlist for one section (or all): id, question,
+    answer and TTS sentence per item, in play order. Pre-compressed on
+    disk per bank version, strong ETag, 304 when unchanged.
+    """
+    section = (request.GET.get("category", "") or "").strip()
+    return pack_response(
+        request, get_playlist_store(), playlist_name(section), "playlist.json", section,
+    )
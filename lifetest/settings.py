@@ -58,8 +58,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # parse each template once per process, also with DEBUG on
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -90,7 +96,32 @@ STATICFILE_DIRS = [
     BASE_DIR / "static",
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Hashed + pre-compressed static names only where `collectstatic` has run
+# (it writes staticfiles.json; without it every {% static %} raises).
+# Heroku runs collectstatic on each deploy, so it's on there by default;
+# elsewhere run collectstatic, then set STATIC_MANIFEST=True. Local
+# runserver and the tests use the plain storage.
+STATIC_MANIFEST = os.getenv("STATIC_MANIFEST", "True" if "DYNO" in os.environ else "False") == "True"
+# (STATICFILES_STORAGE is ignored since Django 5.1; this needs STORAGES)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": (
+            "whitenoise.storage.CompressedManifestStaticFilesStorage" if STATIC_MANIFEST
+            else "django.contrib.staticfiles.storage.StaticFilesStorage"
+        ),
+    },
+}
+
+
+def _static_headers(headers, path, url):
+    # the service worker is served from /static/ but controls the whole site
+    if url.startswith(STATIC_URL + "quiz/sw.") and url.endswith(".js"):
+        headers["Service-Worker-Allowed"] = "/"
+
+
+WHITENOISE_ADD_HEADERS_FUNCTION = _static_headers
+WHITENOISE_MIMETYPES = {".webmanifest": "application/manifest+json"}
 
 
 SESSION_COOKIE_SAMESITE = "Lax"
@@ -100,3 +131,25 @@ SESSION_ENGINE = "django.contrib.sessions.backends.signed_cookies"
 # SESSION_COOKIE_HTTPONLY = True   # safer (default anyway)
 # SESSION_COOKIE_SECURE = True
 
+
+# Text-to-speech (see quiz/tts.py and quiz/tts_backends.py)
+#   quiz.tts_backends.GTTSBackend    - Google TTS, needs network
+#   quiz.tts_backends.EspeakBackend  - offline, needs espeak-ng installed
+#   quiz.tts_backends.StubBackend    - deterministic tones for tests/benchmarks
+TTS_BACKEND = os.getenv("TTS_BACKEND", "quiz.tts_backends.GTTSBackend")
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", str(BASE_DIR / "tts_cache"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# the bank version (quiz/bank.py) is read from the database at most this
+# often per process; a change shows up in other workers within this time
+BANK_VERSION_TTL = float(os.getenv("BANK_VERSION_TTL", 1.0))
+
+# offline question packs (see quiz/packs.py), rebuilt per bank version
+PACK_CACHE_DIR = os.getenv("PACK_CACHE_DIR", str(BASE_DIR / "pack_cache"))
+# files of a superseded version are kept this long, for workers (and
+# downloads) still on it
+PACK_PRUNE_AFTER = int(os.getenv("PACK_PRUNE_AFTER", 600))
+
+# mc_quiz answer events are buffered per process and written in batches
+ANSWER_EVENT_BUFFER_SIZE = int(os.getenv("ANSWER_EVENT_BUFFER_SIZE", 200))
+ANSWER_EVENT_FLUSH_SECONDS = float(os.getenv("ANSWER_EVENT_FLUSH_SECONDS", 10))
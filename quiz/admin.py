@@ -1,24 +1,14 @@
 # quiz/admin.py
 from django.contrib import admin, messages
+from django.contrib.admin.models import CHANGE, LogEntry
 from django.db import transaction
-from django.db.models import Max
-import re
 
-from .models import Question
-from bookmode.models import BookModeSession  # <- app name 'bookmode' matches your app
-
-
-def normalise(text: str) -> str:
-    """
-    Normalise question text so small changes (like trailing full stop)
-    don't create duplicates.
-    """
-    if not text:
-        return ""
-    t = text.strip()
-    t = t.rstrip(".")                 # remove final "."
-    t = re.sub(r"\s+", " ", t)        # collapse multiple spaces
-    return t.lower()
+from .changes import batched_bank_changes
+from .cleanup import clean_variants
+from .events import common_wrong_answers, flush_answer_events, most_missed_questions
+from .models import ExamAttempt, Question, QuestionStats
+from .signals import bank_changed
+from bookmode.sync import sync_book_based_to_bookmode
 
 
 # ------------------ ACTION 1: COPY BOOK QUESTIONS → BOOKMODE ------------------ #
@@ -31,71 +21,12 @@ def copy_book_based_to_bookmode(modeladmin, request, queryset=None):
     - Updates existing BookModeSession rows if the (normalised) question matches.
     - Creates new ones for genuinely new questions.
     - Does NOT duplicate questions on repeated runs.
-    """
-
-    # 1) Highest existing order_index so new ones go at the end
-    max_order = BookModeSession.objects.aggregate(
-        Max('order_index')
-    )['order_index__max'] or 0
+    - Deactivates sessions whose question was deleted.
 
-    order = max_order
-
-    # 2) Map existing sessions by normalised question text
-    existing_by_norm = {}
-    for b in BookModeSession.objects.all():
-        key = normalise(b.question_text)
-        if key:
-            existing_by_norm[key] = b
-
-    created = 0
-    updated = 0
-
-    # 3) Decide which questions to process:
-    #    - If admin selected some, use queryset
-    #    - Otherwise, take all book_based questions
-    if queryset is not None and queryset.exists():
-        qs = queryset
-    else:
-        qs = Question.objects.filter(category="book_based")
-
-    # 4) Process questions in a stable order
-    for q in qs.order_by("id"):
-        norm_key = normalise(q.question_text)
-
-        # Clean the answer a bit (strip trailing .?! etc)
-        cleaned_answer = (q.answer_text or "").strip().rstrip(".!?").strip()
-
-        if norm_key in existing_by_norm:
-            # UPDATE existing BookModeSession
-            session = existing_by_norm[norm_key]
-
-            session.question_text = q.question_text
-            session.correct_answer = cleaned_answer[:255]
-            session.distractors = ""
-            session.section = (q.subcategory or "")[:100]
-            session.active = True
-            # keep existing order_index so order doesn’t jump around
-            session.save()
-            updated += 1
-
-        else:
-            # CREATE new BookModeSession
-            order += 1
-            session = BookModeSession.objects.create(
-                question_text=q.question_text,
-                correct_answer=cleaned_answer[:255],
-                distractors="",
-                order_index=order,
-                section=(q.subcategory or "")[:100],
-                active=True,
-            )
-            created += 1
-            existing_by_norm[norm_key] = session
-
-    modeladmin.message_user(
-        request,
-        f"Synced book-based questions: {created} created, {updated} updated."
-    )
+    See bookmode.sync (also available as `manage.py sync_bookmode`).
+    """
+    result = sync_book_based_to_bookmode(queryset)
+    modeladmin.message_user(request, result.summary())
 
 
 # --------------- ACTION 2: CLEAN "(extended variant N)" IN QUIZ --------------- #
@@ -110,83 +41,110 @@ def clean_extended_variants(modeladmin, request, queryset):
     - If a clean base question exists (without the suffix), delete all variants
       and any extra base duplicates, keep ONE base.
     - If no base exists, rename one variant to the base text and delete the rest.
-    """
-
-    # Case-insensitive pattern for:
-    #   (Extended Variant 123)
-    #   (Variant 123)
-    pattern = re.compile(
-        r"\s*\((?:extended\s+)?variant\s+\d+\)$",
-        re.IGNORECASE
-    )
 
-    # DB filter: also case-insensitive, matches both forms
-    variant_qs = list(
-        Question.objects.filter(
-            question_text__iregex=r"\((extended\s+)?variant\s+[0-9]+\)$"
-        ).order_by("question_text", "id")
-    )
+    See quiz.cleanup (also available as `manage.py clean_variants`).
+    """
+    plan = clean_variants()
+    if not plan.groups:
+        messages.info(request, plan.summary())
+    else:
+        messages.success(request, plan.summary())
 
-    if not variant_qs:
-        messages.info(request, "No '(variant N)' or '(extended variant N)' questions found.")
-        return
 
-    # Group variants by base_text (question without the suffix)
-    groups = {}  # base_text -> [variant rows]
-    for q in variant_qs:
-        base_text = pattern.sub("", q.question_text).strip()
-        groups.setdefault(base_text, []).append(q)
+@admin.action(description="Preview '(variant N)' clean-up (dry run, changes nothing)")
+def preview_extended_variants(modeladmin, request, queryset):
+    plan = clean_variants(dry_run=True)
+    messages.info(request, plan.summary())
+    for q_id, old_text, new_text in plan.renames[:10]:
+        messages.info(request, f"#{q_id}: '{old_text[:80]}' → '{new_text[:80]}'")
 
-    to_delete_ids = []
-    changed_count = 0
 
-    with transaction.atomic():
-        for base_text, variants in groups.items():
-            # Find any existing clean base questions
-            base_qs = list(
-                Question.objects.filter(question_text=base_text).order_by("id")
-            )
-
-            if base_qs:
-                # We already have at least one clean base entry
-                base = base_qs[0]  # keep this one
-
-                # Any extra base duplicates are redundant
-                extra_base_ids = [b.id for b in base_qs[1:]]
-
-                # All these variant rows are redundant too
-                variant_ids = [v.id for v in variants]
-
-                to_delete_ids.extend(extra_base_ids + variant_ids)
-
-            else:
-                # No clean base exists:
-                # - keep the first variant, rename it to the base text
-                # - delete the rest
-                keeper = variants[0]
-                if keeper.question_text != base_text:
-                    keeper.question_text = base_text
-                    keeper.save(update_fields=["question_text"])
-                    changed_count += 1
-
-                extra_variant_ids = [v.id for v in variants[1:]]
-                to_delete_ids.extend(extra_variant_ids)
-
-        deleted = Question.objects.filter(id__in=to_delete_ids).delete()[0]
-
-    messages.success(
-        request,
-        f"Cleaned variants: converted {changed_count} questions, "
-        f"deleted {deleted} redundant rows."
+# ------------- ACTION 3: MOST-MISSED PRACTICE QUESTIONS → HARDEST ------------- #
+@admin.action(description="Move selected most-missed general/common questions → Hardest")
+def move_most_missed_to_hardest(modeladmin, request, queryset):
+    """
+    Use the answer statistics (quiz.events) to fill the 'hardest'
+    category: of the selected questions, the general / common ones
+    answered at least 10 times with an error rate of 50%+ move to
+    'hardest'. Each move goes in the admin history with the category
+    it came from.
+    """
+    flush_answer_events()
+    missed = list(
+        most_missed_questions()
+        .filter(question__in=queryset, question__category__in=["general", "common"])
+        .values_list("question_id", "question__category", "question__subcategory", "question__question_text")
     )
+    ids = [q_id for q_id, *_ in missed]
+    # category isn't an input of the derived fields, so a bulk update is safe
+    with transaction.atomic():
+        moved = Question.objects.filter(id__in=ids).update(category="hardest")
+        if moved:
+            bank_changed.send(sender=Question, changed_ids=ids, deleted_ids=[])
+            for category in {category for _, category, *_ in missed}:
+                LogEntry.objects.log_actions(
+                    request.user.pk,
+                    [
+                        Question(id=q_id, category="hardest", subcategory=sub, question_text=text)
+                        for q_id, cat, sub, text in missed if cat == category
+                    ],
+                    CHANGE,
+                    f"Moved to Hardest (most missed); category was '{category}'.",
+                )
+    messages.success(request, f"Moved {moved} most-missed questions to Hardest.")
+
 
 # ------------------------------ QUESTION ADMIN ------------------------------- #
 
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
-    list_display = ("question_text", "category", "subcategory", "topic")
+    list_display = ("question_text", "category", "subcategory", "topic", "times_answered", "error_rate")
     list_filter = ("category", "topic", "subcategory")
+    list_select_related = ("stats",)
     search_fields = ("question_text", "answer_text")
-
-    # BOTH actions available on the Question admin
-    actions = [copy_book_based_to_bookmode, clean_extended_variants]
+    readonly_fields = ("common_wrong_answers",)
+
+    # maintenance actions available on the Question admin
+    actions = [
+        copy_book_based_to_bookmode, clean_extended_variants, preview_extended_variants,
+        move_most_missed_to_hardest,
+    ]
+
+    def delete_queryset(self, request, queryset):
+        # "delete selected": one change-log write for the lot, not one per row
+        with transaction.atomic(), batched_bank_changes():
+            super().delete_queryset(request, queryset)
+
+    # answer statistics (filled in batches from mc_quiz answers)
+    def _stats(self, obj):
+        try:
+            return obj.stats
+        except QuestionStats.DoesNotExist:
+            return None
+
+    @admin.display(description="Answered", ordering="stats__attempts")
+    def times_answered(self, obj):
+        stats = self._stats(obj)
+        return stats.attempts if stats else 0
+
+    @admin.display(description="Wrong %", ordering="stats__error_rate")
+    def error_rate(self, obj):
+        stats = self._stats(obj)
+        return f"{stats.error_rate:.0%}" if stats and stats.attempts else "–"
+
+    @admin.display(description="Most picked wrong answers")
+    def common_wrong_answers(self, obj):
+        if obj.pk is None:
+            return "–"
+        rows = common_wrong_answers(obj.pk)
+        return "; ".join(f"{chosen} ({n}×)" for chosen, n in rows) or "–"
+
+
+# ------------------------------ EXAM HISTORY --------------------------------- #
+
+@admin.register(ExamAttempt)
+class ExamAttemptAdmin(admin.ModelAdmin):
+    list_display = ("learner_key", "finished_at", "correct", "total", "passed")
+    list_filter = ("passed",)
+    search_fields = ("learner_key",)
+    date_hierarchy = "finished_at"
@@ -0,0 +1,43 @@
+# quiz/bank.py
+
+import time
+
+from django.conf import settings
+
+from .models import BankVersion
+
+
+_cached = (None, 0.0)   # (version, time.monotonic() when read)
+
+
+def get_bank_version() -> int:
+    """
+    Opaque number that changes whenever the question bank (Question or
+    BookModeSession) changes. Caches key their entries on it, so a bump
+    invalidates every derived view of the bank at once.
+
+    Lives in the database (one BankVersion row), so a change made by any
+    worker, dyno or management command reaches all of them. Each process
+    re-reads it at most every BANK_VERSION_TTL seconds.
+    """
+    global _cached
+    version, read_at = _cached
+    now = time.monotonic()
+    if version is None or now - read_at >= settings.BANK_VERSION_TTL:
+        version = BankVersion.objects.filter(pk=1).values_list("version", flat=True).first()
+        if version is None:
+            version = BankVersion.objects.get_or_create(pk=1, defaults={"version": time.time_ns()})[0].version
+        _cached = (version, now)
+    return version
+
+
+def bump_bank_version():
+    global _cached
+    # never backwards, even if this host's clock is behind the last writer's
+    version = time.time_ns()
+    if not BankVersion.objects.filter(pk=1, version__lt=version).update(version=version):
+        row, created = BankVersion.objects.get_or_create(pk=1, defaults={"version": version})
+        if not created:
+            version = row.version + 1
+            BankVersion.objects.filter(pk=1).update(version=version)
+    _cached = (version, time.monotonic())
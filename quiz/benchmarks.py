@@ -0,0 +1,300 @@
+# quiz/benchmarks.py
+
+import html
+import re
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from bookmode.models import BookModeSession
+from .changes import batched_bank_changes
+from .choices import get_distractor_index
+from .events import flush_answer_events
+from .exam import EXAM_QUESTION_COUNT
+from .models import Question
+from .packs import pack_modes
+from .queries import questions_for_mode
+from .synthetic import WORDS
+
+
+# Most SQL queries one request of each group may run. Going over any of
+# them fails `manage.py bench_suite`; they don't depend on the bank size.
+QUERY_BUDGETS = {
+    "mc_quiz page": 1,
+    "mc_quiz filtered": 1,
+    "mc_quiz search": 2,
+    "mc_quiz answer": 1,
+    "mc_quiz next": 1,
+    "exam start": 2,
+    "exam answer": 0,
+    "exam next": 0,
+    # one F() upsert per topic / subcategory rollup on the paper
+    "exam finish": 40,
+    "exam progress": 4,
+    "book_listen page": 1,
+    "book_listen step": 2,
+    "book_listen playlist": 1,
+    "tts": 0,
+    "upload_questions new": 12,
+    "upload_questions unchanged": 8,
+    "admin changelist": 6,
+    "admin copy_book_based_to_bookmode": 14,
+    "admin preview_extended_variants": 6,
+    # the synthetic bank's variant groups (capped, see quiz.synthetic):
+    # plan, rename, cascade, batched deletes and the change log
+    "admin clean_extended_variants": 18,
+    "admin move_most_missed_to_hardest": 10,
+}
+
+CHOICE_RE = re.compile(r'name="choice"\s+value="([^"]*)"')
+HIDDEN_RE = re.compile(r'name="(question_id|seed)" value="([^"]*)"')
+
+# uploaded files are named bench-*.txt, so their subcategory starts with this
+UPLOAD_SUBCATEGORY_PREFIX = "Bench-"
+
+ADMIN_ACTIONS = [
+    "preview_extended_variants",
+    "clean_extended_variants",
+    "move_most_missed_to_hardest",
+    "copy_book_based_to_bookmode",
+]
+
+
+def percentile(timings, pct):
+    if len(timings) == 1:
+        return timings[0]
+    return statistics.quantiles(timings, n=100, method="inclusive")[pct - 1]
+
+
+@dataclass
+class Measurement:
+    group: str
+    budget: int
+    timings: list = field(default_factory=list)
+    queries: list = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    over_budget_sql: list = field(default_factory=list)
+
+    @property
+    def over_budget(self) -> bool:
+        return bool(self.queries) and max(self.queries) > self.budget
+
+    def as_dict(self) -> dict:
+        ms = lambda seconds: round(seconds * 1000, 3)
+        return {
+            "group": self.group,
+            "n": len(self.timings),
+            "p50_ms": ms(percentile(self.timings, 50)),
+            "p95_ms": ms(percentile(self.timings, 95)),
+            "p99_ms": ms(percentile(self.timings, 99)),
+            "mean_ms": ms(statistics.fmean(self.timings)),
+            "max_ms": ms(max(self.timings)),
+            "queries_min": min(self.queries),
+            "queries_max": max(self.queries),
+            "query_budget": self.budget,
+            "over_budget": self.over_budget,
+            "statuses": {str(status): n for status, n in sorted(self.statuses.items())},
+            "errors": self.errors,
+            # the statements of the first request that went over, to see why
+            "over_budget_sql": self.over_budget_sql,
+        }
+
+
+class BenchRecorder:
+    """
+    Sends requests through the test client (full middleware stack) and
+    records wall time + SQL query count per request, keyed by label.
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def request(self, client, group, label, method, path, data=None, expect=200, check=None, **extra):
+        """
+        One timed request. It counts as an error if the status isn't
+        `expect`, or if `check(response)` is given and returns False.
+        """
+        measurement = self.results.get(label)
+        if measurement is None:
+            measurement = self.results[label] = Measurement(group, QUERY_BUDGETS[group])
+
+        send = client.post if method == "POST" else client.get
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send(path, data or {}, **extra)
+            elapsed = time.perf_counter() - started
+
+        measurement.timings.append(elapsed)
+        measurement.queries.append(len(captured))
+        if len(captured) > measurement.budget and not measurement.over_budget_sql:
+            measurement.over_budget_sql = [query["sql"] for query in captured.captured_queries]
+        measurement.statuses[response.status_code] += 1
+        if response.status_code != expect or (check is not None and not check(response)):
+            measurement.errors += 1
+        return response
+
+    def as_dict(self) -> dict:
+        return {label: m.as_dict() for label, m in self.results.items()}
+
+    def over_budget(self):
+        return [label for label, m in self.results.items() if m.over_budget]
+
+    def with_errors(self):
+        return [label for label, m in self.results.items() if m.errors]
+
+
+def _form_values(response):
+    """(hidden question_id / seed fields, first answer option) of a quiz page."""
+    content = response.content.decode("utf-8")
+    hidden = dict(HIDDEN_RE.findall(content))
+    choice = CHOICE_RE.search(content)
+    return hidden, html.unescape(choice.group(1)) if choice else ""
+
+
+def _shows_question(response):
+    """The quiz page has a question on it (a filter that matches nothing doesn't)."""
+    return 'name="question_id"' in response.content.decode("utf-8")
+
+
+def _filter_cases(mode):
+    """
+    mc_quiz filters taken from the mode's own questions, so every case
+    has rows to count and pick from: its first subcategory and that
+    question's topic, and a search for the bank words in its text.
+    """
+    q = (
+        questions_for_mode(mode).exclude(subcategory="")
+        .order_by("id").values("subcategory", "topic", "question_text").first()
+    )
+    words = [w for w in re.findall(r"\w+", q["question_text"]) if w in WORDS]
+    return [
+        ("mc_quiz filtered", "sub", {"sub": q["subcategory"]}),
+        ("mc_quiz filtered", "topic", {"topic": q["topic"]}),
+        ("mc_quiz filtered", "sub+topic", {"sub": q["subcategory"], "topic": q["topic"]}),
+        ("mc_quiz search", "search", {"q": " ".join(words) or q["question_text"]}),
+    ]
+
+
+# ----------------- SCENARIOS -----------------
+
+def bench_mc_quiz(rec, client, iterations):
+    """Every mode, the sub / topic / search filters, answering and 'next'."""
+    # a warm worker has the index; the untimed page below only builds it
+    # when its random question isn't true/false
+    get_distractor_index()
+    for mode in pack_modes():
+        path = reverse("quiz_mc", args=[mode])
+        client.get(path)   # untimed, so the first sample isn't a cold cache
+        for _ in range(iterations):
+            rec.request(client, "mc_quiz page", f"mc_quiz {mode}", "GET", path)
+
+    for mode in ["all", "general", "book_based", "history"]:
+        path = reverse("quiz_mc", args=[mode])
+        for group, name, params in _filter_cases(mode):
+            client.get(path, params)
+            for _ in range(iterations):
+                rec.request(client, group, f"mc_quiz {mode} ?{name}", "GET", path, params,
+                            check=_shows_question)
+
+    path = reverse("quiz_mc", args=["all"])
+    page = client.get(path)
+    for _ in range(iterations):
+        hidden, choice = _form_values(page)
+        rec.request(client, "mc_quiz answer", "mc_quiz answer", "POST", path, {**hidden, "choice": choice})
+        page = rec.request(client, "mc_quiz next", "mc_quiz next", "POST", path, {"next": "1"})
+
+
+def bench_exam(rec, client, runs):
+    """Full EXAM_QUESTION_COUNT-question exams, start to results, then the progress page."""
+    path = reverse("exam_quiz")
+    for _ in range(runs):
+        page = rec.request(client, "exam start", "exam start", "GET", path)
+        for position in range(EXAM_QUESTION_COUNT):
+            _, choice = _form_values(page)
+            rec.request(client, "exam answer", "exam answer", "POST", path, {"check": "1", "choice": choice})
+            if position == EXAM_QUESTION_COUNT - 1:
+                rec.request(client, "exam finish", "exam finish", "POST", path, {"next": "1"})
+            else:
+                page = rec.request(client, "exam next", "exam next", "POST", path, {"next": "1"})
+        rec.request(client, "exam progress", "exam progress", "GET", reverse("exam_progress"))
+
+
+def bench_book_listen(rec, client, iterations):
+    """Listening page (all + one section), next / prev, the playlist and TTS."""
+    path = reverse("book_listen")
+    section = (
+        BookModeSession.objects.filter(active=True).exclude(section="")
+        .order_by("order_index", "id").values_list("section", flat=True).first()
+    ) or ""
+
+    for label, params in [("book_listen", {}), ("book_listen ?category", {"category": section})]:
+        client.get(path, params)
+        for _ in range(iterations):
+            rec.request(client, "book_listen page", label, "GET", path, params)
+        for _ in range(iterations):
+            rec.request(client, "book_listen step", f"{label} next", "POST", path, {**params, "action": "next"})
+        for _ in range(iterations):
+            rec.request(client, "book_listen step", f"{label} prev", "POST", path, {**params, "action": "prev"})
+
+    playlist = reverse("book_listen_playlist")
+    etag = client.get(playlist, {"category": section}, HTTP_ACCEPT_ENCODING="gzip").get("ETag")
+    for _ in range(iterations):
+        rec.request(client, "book_listen playlist", "book_listen playlist", "GET", playlist,
+                    {"category": section}, HTTP_ACCEPT_ENCODING="gzip")
+        rec.request(client, "book_listen playlist", "book_listen playlist 304", "GET", playlist,
+                    {"category": section}, expect=304, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag)
+
+    tts_path = reverse("tts_view")
+    for i in range(iterations):
+        # half new sentences (synthesised), half repeats (cached file)
+        rec.request(client, "tts", "tts", "GET", tts_path, {"text": f"Question {i // 2 + 1}. Benchmark sentence."})
+
+
+def bench_upload(rec, staff_client, runs, run_id):
+    """Upload a 50-question .txt file (new questions), then the same file again (no changes)."""
+    path = reverse("quiz_upload")
+    for run in range(runs):
+        body = "\n\n".join(
+            f"Q: Benchmark upload {run_id}-{run} question {i}?\nA: Answer {i}."
+            for i in range(50)
+        ).encode("utf-8")
+        for group, label in [("upload_questions new", "upload_questions new"),
+                             ("upload_questions unchanged", "upload_questions unchanged")]:
+            upload = SimpleUploadedFile(f"{UPLOAD_SUBCATEGORY_PREFIX.lower()}{run_id}-{run}.txt", body, content_type="text/plain")
+            rec.request(staff_client, group, label, "POST", path,
+                        {"file": upload, "topic": "other", "category": "general"}, expect=302)
+
+
+def bench_admin(rec, staff_client, runs):
+    """The Question changelist and each maintenance action."""
+    path = reverse("admin:quiz_question_changelist")
+    staff_client.get(path)
+    # the most-missed action flushes the mc_quiz answer buffer first; do
+    # that untimed, so it measures the action itself
+    flush_answer_events()
+    for _ in range(runs):
+        rec.request(staff_client, "admin changelist", "admin changelist", "GET", path)
+
+    selected = list(Question.objects.order_by("id").values_list("id", flat=True)[:5])
+    for action in ADMIN_ACTIONS:
+        for _ in range(runs):
+            # rolled back, so every run does the same work (the variant
+            # groups are there to clean each time) and a kept database
+            # stays as generated
+            with transaction.atomic():
+                rec.request(staff_client, f"admin {action}", f"admin {action}", "POST", path,
+                            {"action": action, "_selected_action": selected}, expect=302)
+                transaction.set_rollback(True)
+
+
+def remove_uploads():
+    """Delete what bench_upload added, so a kept database stays at its generated size."""
+    with transaction.atomic(), batched_bank_changes():
+        return Question.objects.filter(subcategory__startswith=UPLOAD_SUBCATEGORY_PREFIX).delete()[0]
@@ -0,0 +1,166 @@
+# quiz/changes.py
+
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+
+from bookmode.models import BookModeSession
+
+from .choices import build_choices_with_seed
+from .models import BankChange, Question
+from .packs import answer_hash, pack_salt
+
+
+# ----------------- WRITING -----------------
+
+_batch = threading.local()
+
+
+@contextmanager
+def batched_bank_changes():
+    """
+    Wrap a queryset .delete() (or any loop of saves) in this: the per-row
+    post_delete / post_save signals then only collect their change-log
+    rows and after-commit callbacks, which are written once on exit,
+    still inside the caller's transaction. Nests; the outermost block writes.
+    """
+    if getattr(_batch, "rows", None) is not None:
+        yield
+        return
+
+    _batch.rows, _batch.callbacks = [], {}
+    try:
+        yield
+        rows, callbacks = _batch.rows, _batch.callbacks
+    finally:
+        _batch.rows = _batch.callbacks = None
+
+    if rows:
+        BankChange.objects.bulk_create(rows, batch_size=1000)
+    for callback in callbacks:
+        transaction.on_commit(callback)
+
+
+def after_bank_commit(callback):
+    """transaction.on_commit(callback), once per batch inside batched_bank_changes()."""
+    if getattr(_batch, "callbacks", None) is not None:
+        _batch.callbacks[callback] = None
+    else:
+        transaction.on_commit(callback)
+
+
+def log_bank_change(model, signal, instance=None, changed_ids=(), deleted_ids=()):
+    """
+    Append change-log rows for one signal (post_save / post_delete /
+    bank_changed). Runs inside the writer's transaction, so the log
+    rolls back together with the change it describes.
+    """
+    if signal is post_save:
+        changed_ids = [instance.pk]
+    elif signal is post_delete:
+        deleted_ids = [instance.pk]
+
+    rows = [BankChange(model=model, object_id=pk, op=BankChange.OP_UPSERT) for pk in changed_ids]
+    rows += [BankChange(model=model, object_id=pk, op=BankChange.OP_DELETE) for pk in deleted_ids]
+    if getattr(_batch, "rows", None) is not None:
+        _batch.rows.extend(rows)
+    elif rows:
+        BankChange.objects.bulk_create(rows, batch_size=1000)
+
+
+def latest_change_id() -> int:
+    return BankChange.objects.aggregate(last=Max("id"))["last"] or 0
+
+
+# ----------------- READING -----------------
+
+def question_payload(q):
+    return {
+        "id": q.id,
+        "q": q.question_text,
+        "sub": q.subcategory or "",
+        "topic": q.topic,
+        "category": q.category,
+        "choices": build_choices_with_seed(q, q.id),
+        "answer_hash": answer_hash(pack_salt(), q.answer_text),
+    }
+
+
+def bookmode_payload(b):
+    return {
+        "id": b.id,
+        "question": b.question_text,
+        "answer": b.correct_answer,
+        "section": b.section,
+        "order_index": b.order_index,
+        "active": b.active,
+    }
+
+
+def changes_since(since, limit):
+    """
+    One page of the change log after version `since`:
+
+      - only the newest change per object in the page is returned
+      - upserts carry the current row (same shape as the offline packs);
+        a row that is gone by now is reported as a delete
+      - `next` is the version to pass as ?since= for the following page
+    """
+    page = list(
+        BankChange.objects
+        .filter(id__gt=since)
+        .order_by("id")
+        .values_list("id", "model", "object_id", "op")[:limit + 1]
+    )
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    latest = {}
+    for change_id, model, object_id, op in page:
+        latest[model, object_id] = (change_id, op)
+
+    loaders = {
+        BankChange.MODEL_QUESTION: (Question, question_payload),
+        BankChange.MODEL_BOOKMODE: (BookModeSession, bookmode_payload),
+    }
+    rows = {}
+    for model, (model_cls, _) in loaders.items():
+        ids = [oid for (m, oid), (_, op) in latest.items() if m == model and op == BankChange.OP_UPSERT]
+        rows[model] = model_cls.objects.in_bulk(ids) if ids else {}
+
+    changes = []
+    for (model, object_id), (change_id, op) in sorted(latest.items(), key=lambda kv: kv[1][0]):
+        obj = rows[model].get(object_id) if op == BankChange.OP_UPSERT else None
+        if obj is None:
+            changes.append({"version": change_id, "model": model, "op": BankChange.OP_DELETE, "id": object_id})
+        else:
+            payload = loaders[model][1](obj)
+            changes.append({"version": change_id, "model": model, "op": op, "id": object_id, "data": payload})
+
+    return {
+        "since": since,
+        "next": page[-1][0] if page else since,
+        "has_more": has_more,
+        "changes": changes,
+    }
+
+
+# ----------------- COMPACTION -----------------
+
+def compact_bank_changes():
+    """
+    Drop every change that a later change to the same object supersedes.
+    Any ?since= still gets a correct delta: the newest change per object
+    (including delete tombstones) is always kept. Returns rows removed.
+    """
+    latest_ids = (
+        BankChange.objects
+        .values("model", "object_id")
+        .annotate(last=Max("id"))
+        .values("last")
+    )
+    with transaction.atomic():
+        return BankChange.objects.exclude(id__in=latest_ids).delete()[0]
@@ -0,0 +1,253 @@
+# quiz/choices.py
+
+import bisect
+import random
+import threading
+
+from .bank import get_bank_version
+from .models import Question
+from .normalise import find_year
+
+NEAR_POOL_SIZE = 20   # how many similar-length answers we shuffle from
+DISTRACTOR_COUNT = 3
+
+
+# ----------------- DISTRACTOR INDEX -----------------
+
+class DistractorIndex:
+    """
+    In-memory view of every answer in the bank, built once per process
+    and bank version (rebuilt when any process changes the bank).
+
+      - answers bucketed by length (for "similar length" distractors)
+      - sorted set of years (for year / date-style distractors)
+      - answers grouped by topic (for exam distractors)
+
+    Every lookup is a bisect or a handful of random picks, so building
+    choices never touches the database.
+    """
+
+    def __init__(self, rows, version=None):
+        # rows: iterable of (id, answer_text, topic, answer_year)
+        by_length = {}
+        by_topic = {}
+        answers = []
+        years = set()
+
+        for q_id, answer_text, topic, answer_year in rows:
+            text = (answer_text or "").strip()
+            if not text:
+                continue
+            entry = (q_id, text)
+            answers.append(entry)
+            by_length.setdefault(len(text), []).append(entry)
+            by_topic.setdefault(topic, []).append(entry)
+            if answer_year is not None:
+                years.add(answer_year)
+
+        for bucket in by_length.values():
+            bucket.sort()
+
+        self.answers = sorted(answers)
+        self.by_length = by_length
+        self.lengths = sorted(by_length)
+        self.by_topic = {topic: sorted(pool) for topic, pool in by_topic.items()}
+        self.years = sorted(years)
+        self.version = version
+
+    @classmethod
+    def from_db(cls, version=None):
+        return cls(Question.objects.values_list("id", "answer_text", "topic", "answer_year"), version)
+
+    def nearest_by_length(self, length, exclude_id, exclude_text, limit=NEAR_POOL_SIZE):
+        """
+        Up to `limit` answers whose length is closest to `length`
+        (ties broken by question id), skipping the question itself and
+        anything identical to its answer.
+        """
+        picked = []
+        right = bisect.bisect_left(self.lengths, length)
+        left = right - 1
+
+        while len(picked) < limit and (left >= 0 or right < len(self.lengths)):
+            # distance of the next bucket on each side
+            d_left = length - self.lengths[left] if left >= 0 else None
+            d_right = self.lengths[right] - length if right < len(self.lengths) else None
+            if d_right is None or (d_left is not None and d_left < d_right):
+                dist = d_left
+            else:
+                dist = d_right
+
+            level = []
+            if d_left == dist:
+                level.extend(self.by_length[self.lengths[left]])
+                left -= 1
+            if d_right == dist:
+                level.extend(self.by_length[self.lengths[right]])
+                right += 1
+
+            level.sort()
+            for q_id, text in level:
+                if q_id != exclude_id and text != exclude_text:
+                    picked.append(text)
+
+        return picked[:limit]
+
+    def other_years(self, year):
+        """Sorted list of every known year except `year`."""
+        i = bisect.bisect_left(self.years, year)
+        if i < len(self.years) and self.years[i] == year:
+            return self.years[:i] + self.years[i + 1:]
+        return self.years
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_distractor_index() -> DistractorIndex:
+    global _index
+    # read before the rows: a change committed in between only makes the
+    # index look older than it is, so it gets rebuilt once more, never missed
+    version = get_bank_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = DistractorIndex.from_db(version)
+            index = _index
+    return index
+
+
+def invalidate_distractor_index():
+    """Drop the cached index; the next request rebuilds it from the DB."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def _random_indices(rng, n):
+    """
+    Yield distinct indices in range(n) in random order, without
+    materialising (or shuffling) the whole range up front.
+    """
+    seen = set()
+    while len(seen) < n:
+        if len(seen) >= 32:
+            # lots of rejects: finish with a proper shuffle of what's left
+            rest = [i for i in range(n) if i not in seen]
+            rng.shuffle(rest)
+            yield from rest
+            return
+        i = rng.randrange(n)
+        if i not in seen:
+            seen.add(i)
+            yield i
+
+
+# ----------------- MULTIPLE-CHOICE BUILDERS -----------------
+
+def build_choices_with_seed(q, seed_value: int):
+    """
+    Smarter multiple-choice options:
+
+    - True/False questions -> only 'True' and 'False'
+    - Year / date-style answers -> other year/date-style distractors
+    - Other answers -> text distractors of similar length
+
+    The same (question, seed) always gives the same options, so the
+    check-answer POST rebuilds exactly what was rendered.
+    """
+    rng = random.Random(seed_value)
+    correct_raw = (q.answer_text or "").strip()
+
+    # -------- TRUE / FALSE --------
+    if q.answer_kind == Question.KIND_TRUE_FALSE:
+        options = ["True", "False"]
+        rng.shuffle(options)
+        return options
+
+    index = get_distractor_index()
+
+    # -------- YEAR / DATE-STYLE ANSWERS --------
+    if q.answer_kind == Question.KIND_YEAR:
+        year_match = find_year(correct_raw)
+        year_num = q.answer_year
+
+        # keep the wording pattern, e.g. "In the 1450s."
+        prefix = correct_raw[:year_match.start()]
+        suffix = correct_raw[year_match.end():]
+        has_s = "s" in year_match.group(0)
+
+        other_years = index.other_years(year_num)
+        distract_years = rng.sample(other_years, min(DISTRACTOR_COUNT, len(other_years)))
+
+        # if we don't have enough, synthesise nearby years
+        while len(distract_years) < DISTRACTOR_COUNT:
+            delta = rng.choice([-10, -5, -1, 1, 5, 10])
+            y = year_num + delta
+            if 1000 <= y <= 2099 and y not in distract_years and y != year_num:
+                distract_years.append(y)
+
+        def make_phrase(y: int) -> str:
+            y_str = f"{y}{'s' if has_s else ''}"
+            return f"{prefix}{y_str}{suffix}"
+
+        options = [make_phrase(year_num)] + [make_phrase(y) for y in distract_years]
+        rng.shuffle(options)
+        return options
+
+    # -------- GENERAL TEXT ANSWERS --------
+    correct = correct_raw
+    near = index.nearest_by_length(len(correct), q.id, correct)
+    rng.shuffle(near)
+
+    distractors = []
+    for d in near:
+        if d not in distractors:
+            distractors.append(d)
+        if len(distractors) == DISTRACTOR_COUNT:
+            break
+
+    # pad if still short (tiny banks / lots of identical answers)
+    if len(distractors) < DISTRACTOR_COUNT:
+        for i in _random_indices(rng, len(index.answers)):
+            q_id, d = index.answers[i]
+            if q_id != q.id and d != correct and d not in distractors:
+                distractors.append(d)
+            if len(distractors) == DISTRACTOR_COUNT:
+                break
+
+    options = [correct] + distractors
+    rng.shuffle(options)
+    return options
+
+
+def build_exam_choices(q, seed_value=0):
+    """
+    Exam options: the correct answer plus 3 answers from the same topic
+    (falling back to the whole bank when the topic is too small).
+    """
+    correct = (q.answer_text or "").strip()
+    index = get_distractor_index()
+
+    pool = index.by_topic.get(q.topic, [])
+    if sum(1 for q_id, _ in pool if q_id != q.id) < DISTRACTOR_COUNT:
+        pool = index.answers
+
+    rng = random.Random(seed_value or q.id)
+
+    seen = {correct}
+    distractors = []
+    for i in _random_indices(rng, len(pool)):
+        q_id, ans = pool[i]
+        if q_id != q.id and ans not in seen:
+            seen.add(ans)
+            distractors.append(ans)
+        if len(distractors) == DISTRACTOR_COUNT:
+            break
+
+    opts = [correct] + distractors
+    rng2 = random.Random((seed_value or q.id) + 999_999)
+    rng2.shuffle(opts)
+    return opts
@@ -0,0 +1,124 @@
+# quiz/cleanup.py
+
+import re
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .changes import batched_bank_changes
+from .models import Question
+from .signals import bank_changed
+
+
+# Case-insensitive pattern for:
+#   (Extended Variant 123)
+#   (Variant 123)
+VARIANT_SUFFIX = re.compile(r"\s*\((?:extended\s+)?variant\s+\d+\)$", re.IGNORECASE)
+VARIANT_DB_REGEX = r"\((extended\s+)?variant\s+[0-9]+\)$"
+
+
+@dataclass
+class VariantCleanPlan:
+    renames: list = field(default_factory=list)      # [(id, old_text, new_text)]
+    delete_ids: list = field(default_factory=list)
+    groups: int = 0
+    deleted: int = 0
+    applied: bool = False
+
+    def summary(self) -> str:
+        if not self.groups:
+            return "No '(variant N)' or '(extended variant N)' questions found."
+        if not self.applied:
+            return (
+                f"Dry run: {self.groups} variant groups; would convert "
+                f"{len(self.renames)} questions and delete {len(self.delete_ids)} redundant rows."
+            )
+        return (
+            f"Cleaned variants: converted {len(self.renames)} questions, "
+            f"deleted {self.deleted} redundant rows."
+        )
+
+
+def plan_variant_cleanup():
+    """
+    Work out what clean_variants() would do, in two queries:
+    one for all variant rows, one for every matching clean base row.
+
+    - If a clean base question exists (without the suffix), delete all
+      variants and any extra base duplicates, keep ONE base (lowest id).
+    - If no base exists, rename the first variant to the base text and
+      delete the rest.
+    """
+    plan = VariantCleanPlan()
+
+    variants = list(
+        Question.objects.filter(question_text__iregex=VARIANT_DB_REGEX)
+        .order_by("question_text", "id")
+        .values_list("id", "question_text")
+    )
+    if not variants:
+        return plan
+
+    # Group variants by base_text (question without the suffix)
+    groups = {}  # base_text -> [(id, text)]
+    for q_id, text in variants:
+        base_text = VARIANT_SUFFIX.sub("", text).strip()
+        groups.setdefault(base_text, []).append((q_id, text))
+    plan.groups = len(groups)
+
+    # Every clean base row for every group, in one query
+    bases = {}  # base_text -> [ids], lowest first
+    for q_id, text in (
+        Question.objects.filter(question_text__in=list(groups))
+        .order_by("id")
+        .values_list("id", "question_text")
+    ):
+        bases.setdefault(text, []).append(q_id)
+
+    for base_text, group in groups.items():
+        base_ids = bases.get(base_text)
+        if base_ids:
+            # keep the first base; extra bases and all variants are redundant
+            plan.delete_ids.extend(base_ids[1:])
+            plan.delete_ids.extend(q_id for q_id, _ in group)
+        else:
+            keeper_id, keeper_text = group[0]
+            if keeper_text != base_text:
+                plan.renames.append((keeper_id, keeper_text, base_text))
+            plan.delete_ids.extend(q_id for q_id, _ in group[1:])
+
+    return plan
+
+
+def clean_variants(dry_run=False):
+    """
+    Collapse '(variant N)' / '(extended variant N)' duplicates with a
+    constant number of queries: fetch candidates, fetch bases, one bulk
+    rename, one bulk delete. With dry_run=True nothing is written.
+    """
+    plan = plan_variant_cleanup()
+    if dry_run or not plan.groups:
+        return plan
+
+    with transaction.atomic():
+        keepers = []
+        for q_id, _, new_text in plan.renames:
+            q = Question(id=q_id, question_text=new_text)
+            q.update_derived_fields()
+            keepers.append(q)
+        # answer-derived fields are unchanged by a rename; only question text moves
+        Question.objects.bulk_update(keepers, ["question_text", "question_norm"])
+
+        # one change-log write for the lot, not one per deleted row
+        with batched_bank_changes():
+            plan.deleted = Question.objects.filter(id__in=plan.delete_ids).delete()[0]
+
+        if keepers:
+            bank_changed.send(
+                sender=Question,
+                changed_ids=[q.id for q in keepers],
+                deleted_ids=[],
+            )
+
+    plan.applied = True
+    return plan
@@ -0,0 +1,82 @@
+# quiz/conditional.py
+
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.http import condition
+
+
+_template_version = None
+
+
+def template_version():
+    """
+    (hash, newest mtime) over every template file, computed once per
+    process. Goes into the page ETags so a deploy that changes a
+    template invalidates them, and is identical across workers.
+    """
+    global _template_version
+    if _template_version is None:
+        digest = hashlib.sha1()
+        newest = 0.0
+        directories = [Path(d) for engine in engines.all() for d in engine.dirs]
+        directories += [Path(d) for d in get_app_template_dirs("templates")]
+        for directory in directories:
+            for path in sorted(directory.rglob("*.html")):
+                digest.update(str(path.relative_to(directory)).encode("utf-8"))
+                digest.update(path.read_bytes())
+                newest = max(newest, path.stat().st_mtime)
+        _template_version = (digest.hexdigest()[:12], newest)
+    return _template_version
+
+
+def page_etag(request, per_user=False):
+    """
+    ETag for a page that only changes with the templates: template hash
+    + full path (query included). With per_user, the CSRF cookie and
+    user id are mixed in as well, for pages that embed a CSRF token.
+    """
+    parts = [template_version()[0], request.get_full_path()]
+    if per_user:
+        parts.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME, ""))
+        parts.append(str(getattr(request.user, "pk", "") or ""))
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def page_last_modified(request):
+    """The newest template file."""
+    return datetime.fromtimestamp(template_version()[1], tz=dt_timezone.utc)
+
+
+def template_page(per_user=False):
+    """
+    Conditional GET for views that render only templates, nothing from
+    the bank (the menus): ETag (+ Last-Modified for pages that are the
+    same for everyone), so a revalidation that matches is a 304 without
+    rendering anything. The bank version stays out of the ETag, so an
+    upload doesn't invalidate pages that never show it.
+    """
+    def decorator(view):
+        conditional = condition(
+            etag_func=lambda request, *args, **kwargs: page_etag(request, per_user),
+            last_modified_func=None if per_user else (lambda request, *args, **kwargs: page_last_modified(request)),
+        )(view)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            # always revalidate; the ETag makes that cheap
+            patch_cache_control(response, no_cache=True)
+            if per_user:
+                patch_vary_headers(response, ["Cookie"])
+            return response
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,179 @@
+# quiz/events.py
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, F, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from .models import AnswerEvent, Question, QuestionStats
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------- BUFFER -----------------
+
+class AnswerEventBuffer:
+    """
+    Per-process buffer for mc_quiz answers.
+
+      - record() only appends to a list (no DB write on the request path)
+      - once the buffer holds `max_size` events, or the oldest one is
+        `max_age` seconds old, the whole batch is flushed: one bulk
+        INSERT + the QuestionStats upserts, in one transaction
+      - the age check runs on a timer started with the first event, so a
+        quiet worker doesn't sit on its last answers until the next one
+      - flush() is also registered with atexit, so a worker that shuts
+        down cleanly writes what it still holds
+    """
+
+    def __init__(self, max_size, max_age):
+        self.max_size = max_size
+        self.max_age = max_age
+        self._events = []
+        self._oldest = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def record(self, question_id, chosen, is_correct, mode):
+        now = time.monotonic()
+        with self._lock:
+            if not self._events:
+                self._oldest = now
+                self._start_timer()
+            self._events.append(AnswerEvent(
+                question_id=question_id,
+                chosen=(chosen or "")[:255],
+                is_correct=bool(is_correct),
+                mode=(mode or "")[:30],
+                created_at=timezone.now(),
+            ))
+            due = len(self._events) >= self.max_size or now - self._oldest >= self.max_age
+        if due:
+            self.flush()
+
+    def _start_timer(self):
+        if self.max_age > 0:
+            self._timer = threading.Timer(self.max_age, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        finally:
+            # the timer thread got its own DB connection; don't leave it open
+            connections.close_all()
+
+    def flush(self):
+        with self._lock:
+            events, self._events = self._events, []
+            self._oldest = None
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        if not events:
+            return 0
+        try:
+            write_answer_events(events)
+        except Exception:
+            # stats are best-effort: never fail a quiz request over them
+            logger.exception("Dropped %d answer events", len(events))
+            return 0
+        return len(events)
+
+    def __len__(self):
+        return len(self._events)
+
+
+def write_answer_events(events):
+    """Insert a batch of AnswerEvents and fold them into QuestionStats."""
+    # questions deleted since they were answered would fail the FK check
+    existing = set(
+        Question.objects
+        .filter(id__in={event.question_id for event in events})
+        .values_list("id", flat=True)
+    )
+    events = [event for event in events if event.question_id in existing]
+    if not events:
+        return
+
+    attempts = Counter()
+    correct = Counter()
+    last_at = {}
+    for event in events:
+        attempts[event.question_id] += 1
+        correct[event.question_id] += event.is_correct
+        last_at[event.question_id] = max(event.created_at, last_at.get(event.question_id, event.created_at))
+
+    with transaction.atomic():
+        AnswerEvent.objects.bulk_create(events, batch_size=500)
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=q_id) for q_id in attempts],
+            ignore_conflicts=True,
+        )
+        for q_id, n in attempts.items():
+            new_attempts = F("attempts") + n
+            new_correct = F("correct") + correct[q_id]
+            # SET expressions all see the old row, so this is the new rate
+            QuestionStats.objects.filter(question_id=q_id).update(
+                attempts=new_attempts,
+                correct=new_correct,
+                error_rate=Cast(new_attempts - new_correct, FloatField()) / Cast(new_attempts, FloatField()),
+                last_answered_at=last_at[q_id],
+            )
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_answer_buffer() -> AnswerEventBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = AnswerEventBuffer(
+                    settings.ANSWER_EVENT_BUFFER_SIZE,
+                    settings.ANSWER_EVENT_FLUSH_SECONDS,
+                )
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_answer(question_id, chosen, is_correct, mode):
+    get_answer_buffer().record(question_id, chosen, is_correct, mode)
+
+
+def flush_answer_events() -> int:
+    """Write whatever this process has buffered; returns the event count."""
+    return get_answer_buffer().flush()
+
+
+# ----------------- USING THE STATS -----------------
+
+def most_missed_questions(min_attempts=10, min_error_rate=0.5):
+    """Questions people get wrong most often (enough answers to be meaningful)."""
+    return (
+        QuestionStats.objects
+        .filter(attempts__gte=min_attempts, error_rate__gte=min_error_rate)
+        .select_related("question")
+        .order_by("-error_rate", "-attempts")
+    )
+
+
+def common_wrong_answers(question_id, limit=5):
+    """[(chosen option, times picked)] for wrong answers to one question."""
+    return list(
+        AnswerEvent.objects
+        .filter(question_id=question_id, is_correct=False)
+        .values_list("chosen")
+        .annotate(n=Count("id"))
+        .order_by("-n")[:limit]
+    )
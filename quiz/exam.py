@@ -0,0 +1,188 @@
+# quiz/exam.py
+
+import hashlib
+import random
+
+from django.core.cache import cache
+
+from .models import Question
+from .choices import build_exam_choices, get_distractor_index
+from .normalise import normalise_answer
+
+# ----------------- GLOBAL EXAM SETTINGS -----------------
+
+EXAM_QUESTION_COUNT = 24          # questions per exam
+EXAM_DURATION_SECONDS = 45 * 60  # 45 minutes
+EXAM_PASS_MARK = 18               # Life in the UK style pass mark
+
+# keep a paper a little longer than the exam itself can run
+PAPER_CACHE_TIMEOUT = EXAM_DURATION_SECONDS + 15 * 60
+
+# ANSWER_WIDTH characters per answered question in the packed answer
+# vector: a digest of the chosen answer's normalised text (not its option
+# index, so a paper rebuilt with other options still scores the same), or
+# NO_ANSWER. 24 questions fit in 144 characters of the session cookie.
+ANSWER_WIDTH = 6
+NO_ANSWER = "-" * ANSWER_WIDTH
+
+# shown (and skipped) in the slot of a question deleted mid-attempt
+REMOVED_QUESTION_TEXT = "(This question has been removed from the bank.)"
+
+
+def new_exam_seed() -> int:
+    return random.getrandbits(48)
+
+
+# ----------------- EXAM PAPERS -----------------
+
+def exam_question_ids(seed, count=EXAM_QUESTION_COUNT):
+    """
+    The questions on the paper for `seed`: a seeded sample over every
+    question id that has an answer (taken from the distractor index, so
+    no query). Same bank + same seed -> same questions, same order.
+    """
+    ids = [q_id for q_id, _ in get_distractor_index().answers]
+    if len(ids) <= count:
+        return ids
+    return random.Random(seed).sample(ids, count)
+
+
+def build_exam_paper(seed, question_ids=None):
+    """
+    Everything an exam attempt needs, built in one go:
+
+      - question ids pinned when the attempt started (else derived from
+        the seed)
+      - one in_bulk() for the selected questions
+      - choices for every question from the in-memory distractor index
+        (no per-topic queries)
+      - question i uses seed + i, so a rebuild gives the same paper
+
+    A question deleted since the attempt started keeps its slot as a
+    "removed" placeholder, so positions (and the packed answers) never shift.
+    """
+    if question_ids is None:
+        question_ids = exam_question_ids(seed)
+    questions = Question.objects.in_bulk(question_ids)
+
+    paper = []
+    for position, q_id in enumerate(question_ids):
+        q = questions.get(q_id)
+        if q is None:
+            paper.append(_removed_item(q_id))
+            continue
+        paper.append({
+            "id": q.id,
+            "question_text": q.question_text,
+            "answer_text": (q.answer_text or "").strip(),
+            "answer_norm": q.answer_norm,
+            "topic": q.topic,
+            "subcategory": q.subcategory,
+            "choices": build_exam_choices(q, seed + position),
+        })
+    return paper
+
+
+def _removed_item(q_id):
+    return {
+        "id": q_id,
+        "removed": True,
+        "question_text": REMOVED_QUESTION_TEXT,
+        "answer_text": "",
+        "answer_norm": None,
+        "topic": "",
+        "subcategory": "",
+        "choices": [],
+    }
+
+
+def get_exam_paper(seed, question_ids=None):
+    """
+    The paper for one attempt, kept in the Django cache so the steps of
+    the exam don't hit the database. A miss (expired entry, another
+    worker with a local cache) rebuilds it from the seed and the ids the
+    attempt pinned in its session: the same questions in the same slots,
+    but their options come from the current bank, so after an edit they
+    may differ. Answers are packed by value (answer_digest), so that
+    doesn't change a score.
+    """
+    key = f"quiz:exam_paper:{seed}"
+    paper = cache.get(key)
+    if paper is None:
+        paper = build_exam_paper(seed, question_ids)
+        cache.set(key, paper, PAPER_CACHE_TIMEOUT)
+    return paper
+
+
+def skip_removed(paper, index, answers):
+    """
+    Step past removed slots at `index`, giving each a NO_ANSWER so the
+    answer vector stays aligned with the paper. Returns (index, answers).
+    """
+    while index < len(paper) and paper[index].get("removed") and answered_count(answers) == index:
+        answers += NO_ANSWER
+        index += 1
+    return index, answers
+
+
+# ----------------- ANSWERS & SCORING -----------------
+
+def answer_digest(answer_norm) -> str:
+    return hashlib.sha1(answer_norm.encode("utf-8")).hexdigest()[:ANSWER_WIDTH]
+
+
+def answered_count(answers) -> int:
+    return len(answers) // ANSWER_WIDTH
+
+
+def answer_code(answers, position) -> str:
+    """The packed answer for one slot (NO_ANSWER past the end)."""
+    code = answers[position * ANSWER_WIDTH:(position + 1) * ANSWER_WIDTH]
+    return code if len(code) == ANSWER_WIDTH else NO_ANSWER
+
+
+def pack_answer(item, selected) -> str:
+    """The packed answer for `selected`, which must be one of the item's options."""
+    norm = normalise_answer(selected)
+    if not norm or norm not in {normalise_answer(choice) for choice in item["choices"]}:
+        return NO_ANSWER
+    return answer_digest(norm)
+
+
+def unpack_answer(item, code):
+    """The option on this paper behind one packed answer, or None."""
+    if code == NO_ANSWER:
+        return None
+    for choice in item["choices"]:
+        if answer_digest(normalise_answer(choice)) == code:
+            return choice
+    return None
+
+
+def is_answer_correct(item, code) -> bool:
+    return code != NO_ANSWER and bool(item["answer_norm"]) and code == answer_digest(item["answer_norm"])
+
+
+def score_exam(paper, answers):
+    """
+    Rebuild results from the paper + packed answers:
+    (correct, incorrect, review list for the template). A question left
+    unanswered (the time ran out) is incorrect, as in the stored
+    ExamAttempt; removed questions count neither way. For the tally so
+    far, pass paper[:answered_count(answers)].
+    """
+    correct = 0
+    review = []
+    for position, item in enumerate(paper):
+        if item.get("removed"):
+            continue
+        code = answer_code(answers, position)
+        ok = is_answer_correct(item, code)
+        correct += ok
+        review.append({
+            "question": item["question_text"],
+            "your_answer": unpack_answer(item, code),
+            "correct_answer": item["answer_text"],
+            "is_correct": ok,
+        })
+    return correct, len(review) - correct, review
@@ -0,0 +1,80 @@
+# quiz/facets.py
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .bank import get_bank_version
+from .models import Question
+from .queries import questions_for_mode
+
+
+FACET_CACHE_TIMEOUT = 60 * 60 * 24
+
+# (mode, bank_version) -> facets; survives for the life of the process
+_local = {}
+
+
+def _build_question_facets(mode):
+    rows = (
+        questions_for_mode(mode)
+        .order_by()
+        .values_list("subcategory", "topic")
+        .annotate(n=Count("id"))
+    )
+
+    pairs = {}
+    sub_counts = {}
+    topic_counts = {}
+    total = 0
+    for sub, topic, n in rows:
+        sub = sub or ""
+        pairs[(sub, topic)] = pairs.get((sub, topic), 0) + n
+        sub_counts[sub] = sub_counts.get(sub, 0) + n
+        topic_counts[topic] = topic_counts.get(topic, 0) + n
+        total += n
+
+    return {
+        "total": total,
+        # dropdown: named question sets only, alphabetical
+        "subcategories": sorted((s, n) for s, n in sub_counts.items() if s),
+        "topics": [
+            (key, label, topic_counts.get(key, 0))
+            for key, label in Question.TOPIC_CHOICES
+        ],
+        "pairs": pairs,
+    }
+
+
+def get_question_facets(mode):
+    """
+    Subcategories and topics (with question counts) for an mc_quiz mode.
+
+    Cached per process and in the Django cache, keyed on the bank
+    version, so a normal page render issues no facet queries at all.
+    """
+    mode = (mode or "").strip().lower()
+    version = get_bank_version()
+    local_key = (mode, version)
+
+    facets = _local.get(local_key)
+    if facets is None:
+        cache_key = f"quiz:facets:{mode}:{version}"
+        facets = cache.get(cache_key)
+        if facets is None:
+            facets = _build_question_facets(mode)
+            cache.set(cache_key, facets, FACET_CACHE_TIMEOUT)
+        # old versions are dead weight once the bank has moved on
+        for key in [k for k in _local if k[1] != version]:
+            del _local[key]
+        _local[local_key] = facets
+    return facets
+
+
+def count_for(facets, sub=None, topic=None):
+    """Number of questions for a subcategory and/or topic filter."""
+    if not sub and not topic:
+        return facets["total"]
+    return sum(
+        n for (s, t), n in facets["pairs"].items()
+        if (not sub or s == sub) and (not topic or t == topic)
+    )
@@ -1,7 +1,29 @@
 from django import forms
 from .models import Question
 
+
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleFileField(forms.FileField):
+    """FileField that accepts several files and cleans to a list."""
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("widget", MultipleFileInput())
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        single_clean = super().clean
+        if isinstance(data, (list, tuple)):
+            return [single_clean(d, initial) for d in data]
+        return [single_clean(data, initial)]
+
+
 class UploadFileForm(forms.Form):
-    file = forms.FileField(label="Upload Q&A text file")
+    file = MultipleFileField(
+        label="Upload Q&A files",
+        help_text="One or more .txt, .csv or .jsonl files, or a .zip of them.",
+    )
     topic = forms.ChoiceField(choices=Question.TOPIC_CHOICES, label="Topic")
     category = forms.ChoiceField(choices=Question.CATEGORY_CHOICES, label="Category")
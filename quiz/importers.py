@@ -0,0 +1,305 @@
+# quiz/importers.py
+
+import csv
+import io
+import json
+import os
+import re
+import time
+import zipfile
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .models import Question
+from .normalise import normalise_question
+from .signals import bank_changed
+
+
+# Accept: "Q:", "question:", "A:", "answer:" (any case, optional spaces)
+Q_PATTERN = re.compile(r"^\s*(question|q)\s*:", re.IGNORECASE)
+A_PATTERN = re.compile(r"^\s*(answer|a)\s*:", re.IGNORECASE)
+
+LOOKUP_CHUNK = 500   # keep IN (...) lists well under SQLite's variable limit
+WRITE_BATCH = 500
+
+IMPORT_FIELDS = ["question_text", "answer_text", "topic", "category", "subcategory"]
+
+
+@dataclass
+class ImportResult:
+    parsed: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    seconds: float = 0.0
+    files: int = 0
+    skipped_files: list = field(default_factory=list)
+
+    def add(self, other):
+        self.parsed += other.parsed
+        self.created += other.created
+        self.updated += other.updated
+        self.unchanged += other.unchanged
+        self.files += other.files
+        self.skipped_files += other.skipped_files
+
+    def summary(self) -> str:
+        text = (
+            f"Parsed {self.parsed} Q/A pairs from {self.files} file(s). "
+            f"Created {self.created}, updated {self.updated}, "
+            f"unchanged {self.unchanged} ({self.seconds:.2f}s)."
+        )
+        if self.skipped_files:
+            text += f" Skipped unsupported files: {', '.join(self.skipped_files)}."
+        return text
+
+
+# ----------------- PARSERS -----------------
+
+# file extension -> parser(lines) yielding (question, answer)
+PARSERS = {}
+
+
+def register_parser(*extensions):
+    def decorator(func):
+        for ext in extensions:
+            PARSERS[ext.lower()] = func
+        return func
+    return decorator
+
+
+def get_parser(filename):
+    _, ext = os.path.splitext(filename)
+    return PARSERS.get(ext.lower())
+
+
+@register_parser(".txt", ".md", "")
+def parse_qa_lines(lines):
+    """
+    Yield (question, answer) pairs from Q&A text blocks:
+
+        Q: When was the Magna Carta signed?
+        A: 1215.
+
+        question: When was the Magna Carta signed?
+        answer: 1215.
+
+    Lines that don't start a question/answer continue the previous one.
+    """
+    current_q = None
+    current_a = None
+
+    for raw_line in lines:
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if Q_PATTERN.match(line):
+            # emit previous pair
+            if current_q and current_a:
+                yield current_q.strip(), current_a.strip()
+            current_q = line.split(":", 1)[1].strip()
+            current_a = None
+
+        elif A_PATTERN.match(line):
+            current_a = line.split(":", 1)[1].strip()
+
+        else:
+            # continuation lines
+            if current_a is not None:
+                current_a += "\n" + line
+            elif current_q is not None:
+                current_q += "\n" + line
+
+    # flush last pair
+    if current_q and current_a:
+        yield current_q.strip(), current_a.strip()
+
+
+@register_parser(".csv")
+def parse_csv_lines(lines):
+    """
+    CSV with a question column and an answer column.
+    A header row naming them ("question"/"q", "answer"/"a") is optional;
+    without one the first two columns are used.
+    """
+    reader = csv.reader(lines)
+    q_col, a_col = 0, 1
+    for i, row in enumerate(reader):
+        if i == 0:
+            header = [cell.strip().lower() for cell in row]
+            q_names = [h for h in header if h in ("question", "q")]
+            a_names = [h for h in header if h in ("answer", "a")]
+            if q_names and a_names:
+                q_col, a_col = header.index(q_names[0]), header.index(a_names[0])
+                continue
+        if len(row) > max(q_col, a_col):
+            yield row[q_col].strip(), row[a_col].strip()
+
+
+@register_parser(".jsonl", ".ndjson")
+def parse_jsonl_lines(lines):
+    """One JSON object per line: {"question": "...", "answer": "..."}."""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(obj, dict):
+            q_text = obj.get("question") or obj.get("q") or ""
+            a_text = obj.get("answer") or obj.get("a") or ""
+            yield str(q_text).strip(), str(a_text).strip()
+
+
+# ----------------- UPLOAD SOURCES -----------------
+
+def subcategory_from_filename(filename):
+    """'stone_age.txt' -> 'Stone Age' (as the upload form has always done)."""
+    base, _ = os.path.splitext(os.path.basename(filename))
+    return base.replace("_", " ").title().strip()
+
+
+def iter_upload_sources(uploaded):
+    """
+    Yield (filename, binary file object) for an uploaded file, expanding
+    zip archives into their members. Nothing is read into memory here.
+    """
+    if zipfile.is_zipfile(uploaded):
+        uploaded.seek(0)
+        with zipfile.ZipFile(uploaded) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                base = os.path.basename(name)
+                if info.is_dir() or not base or base.startswith(".") or name.startswith("__MACOSX/"):
+                    continue
+                with archive.open(info) as member:
+                    yield name, member
+    else:
+        uploaded.seek(0)
+        yield uploaded.name, getattr(uploaded, "file", uploaded)
+
+
+def text_lines(binary_file):
+    """Stream a binary file as decoded text lines."""
+    return io.TextIOWrapper(binary_file, encoding="utf-8", errors="ignore", newline="")
+
+
+# ----------------- WRITING -----------------
+
+def _batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _import_batch(pairs, topic, category, subcategory, result):
+    """
+    Upsert one batch of (question, answer) pairs.
+
+    Existing rows are matched on the indexed question_norm key, then
+    written with bulk_create / bulk_update. Rows whose fields are
+    already identical are left alone. If the same question appears
+    twice in a batch, the last one wins.
+    """
+    incoming = {}
+    for q_text, a_text in pairs:
+        if not q_text or not a_text:
+            continue
+        result.parsed += 1
+        key = normalise_question(q_text)
+        incoming[key] = {
+            "question_text": q_text,
+            "answer_text": a_text,
+            "topic": topic,
+            "category": category,
+            "subcategory": subcategory,
+        }
+
+    existing = {}
+    keys = list(incoming)
+    for i in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[i:i + LOOKUP_CHUNK]
+        for obj in Question.objects.filter(question_norm__in=chunk).order_by("-id"):
+            existing[obj.question_norm] = obj   # lowest id wins
+
+    to_create = []
+    to_update = []
+    for key, values in incoming.items():
+        obj = existing.get(key)
+        if obj is None:
+            obj = Question(**values)
+            obj.update_derived_fields()
+            to_create.append(obj)
+        elif any(getattr(obj, f) != v for f, v in values.items()):
+            for f, v in values.items():
+                setattr(obj, f, v)
+            obj.update_derived_fields()
+            to_update.append(obj)
+        else:
+            result.unchanged += 1
+
+    Question.objects.bulk_create(to_create, batch_size=WRITE_BATCH)
+    Question.objects.bulk_update(
+        to_update, IMPORT_FIELDS + Question.DERIVED_FIELDS, batch_size=WRITE_BATCH
+    )
+    result.created += len(to_create)
+    result.updated += len(to_update)
+
+    changed_ids = [obj.pk for obj in to_create + to_update]
+    if changed_ids:
+        bank_changed.send(sender=Question, changed_ids=changed_ids, deleted_ids=[])
+
+
+def import_questions(pairs, topic, category, subcategory):
+    """
+    Upsert (question, answer) pairs into Question in one transaction.
+
+    `pairs` is consumed lazily in batches of WRITE_BATCH, so parsing and
+    DB writes interleave and memory stays flat however big the input is.
+    """
+    started = time.perf_counter()
+    result = ImportResult(files=1)
+
+    with transaction.atomic():
+        for batch in _batched(pairs, WRITE_BATCH):
+            _import_batch(batch, topic, category, subcategory, result)
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def import_uploads(uploaded_files, topic, category):
+    """
+    Import several uploaded files (and/or zip archives) in one transaction.
+    Each file gets its subcategory from its own filename and its parser
+    from its extension; unsupported files are skipped and reported.
+    """
+    started = time.perf_counter()
+    total = ImportResult()
+
+    with transaction.atomic():
+        for uploaded in uploaded_files:
+            for filename, binary_file in iter_upload_sources(uploaded):
+                parser = get_parser(filename)
+                if parser is None:
+                    total.skipped_files.append(os.path.basename(filename))
+                    continue
+                result = import_questions(
+                    parser(text_lines(binary_file)),
+                    topic,
+                    category,
+                    subcategory_from_filename(filename),
+                )
+                total.add(result)
+
+    total.seconds = time.perf_counter() - started
+    return total
@@ -0,0 +1,24 @@
+# quiz/learners.py
+
+import uuid
+
+LEARNER_SESSION_KEY = "learner_id"
+
+
+def get_learner_key(request) -> str:
+    """
+    Stable id for "who is answering":
+
+      - "u:<pk>" for logged-in users
+      - "s:<hex>" for anonymous visitors, kept in the session (the signed
+        cookie session has no stable session_key of its own)
+    """
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"u:{user.pk}"
+
+    learner_id = request.session.get(LEARNER_SESSION_KEY)
+    if not learner_id:
+        learner_id = uuid.uuid4().hex
+        request.session[LEARNER_SESSION_KEY] = learner_id
+    return f"s:{learner_id}"
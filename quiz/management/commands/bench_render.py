@@ -0,0 +1,71 @@
+# quiz/management/commands/bench_render.py
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+# (label, url) of the pages whose HTML only depends on the bank
+DEFAULT_PAGES = [
+    ("practice_menu", "/practice/"),
+    ("book_home", "/book_home/"),
+    ("book_play", "/book_home/play/?mode=normal"),
+    ("mc_quiz", "/quiz/all/"),
+    ("mc_quiz facets", "/api/quiz/all/facets"),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Time full renders vs. conditional (If-None-Match) revalidations "
+        "of the bank-driven pages, through the full middleware stack."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-n", "--iterations", type=int, default=200,
+            help="Requests per page and mode (default: 200).",
+        )
+        parser.add_argument(
+            "--host", default="127.0.0.1",
+            help="Host header to send; must be in ALLOWED_HOSTS (default: 127.0.0.1).",
+        )
+
+    def handle(self, *args, **options):
+        n = options["iterations"]
+        client = Client(SERVER_NAME=options["host"])
+
+        self.stdout.write(f"{'page':<16} {'full p50':>9} {'full p95':>9} {'304 p50':>9} {'304 p95':>9}  status")
+        for label, url in DEFAULT_PAGES:
+            first = client.get(url)            # warm caches, get the CSRF cookie
+            etag = client.get(url).get("ETag")
+
+            full = self._time(client, url, n, {})
+            if etag:
+                revalidate = self._time(client, url, n, {"HTTP_IF_NONE_MATCH": etag})
+                status = client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+            else:
+                revalidate, status = None, first.status_code
+
+            self.stdout.write(
+                f"{label:<16} {self._ms(full, 50):>9} {self._ms(full, 95):>9} "
+                f"{self._ms(revalidate, 50):>9} {self._ms(revalidate, 95):>9}  {status}"
+            )
+
+    @staticmethod
+    def _time(client, url, n, headers):
+        timings = []
+        for _ in range(n):
+            started = time.perf_counter()
+            client.get(url, **headers)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    @staticmethod
+    def _ms(timings, pct):
+        if not timings:
+            return "-"
+        if len(timings) == 1:
+            return f"{timings[0] * 1000:.2f}ms"
+        return f"{statistics.quantiles(timings, n=100)[pct - 1] * 1000:.2f}ms"
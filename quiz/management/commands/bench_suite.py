@@ -0,0 +1,188 @@
+# quiz/management/commands/bench_suite.py
+
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings
+
+from bookmode.sync import sync_book_based_to_bookmode
+from quiz import benchmarks
+from quiz.choices import invalidate_distractor_index
+from quiz.models import Question
+from quiz.synthetic import BANK_SIZES, generate_bank, parse_bank_size
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the quiz hot paths (mc_quiz, exam, book_listen, upload, "
+        "admin actions) through the test client on a synthetic bank in a "
+        "scratch database. Records latency percentiles and SQL query counts "
+        "per view as JSON, and fails if a view goes over its query budget, "
+        "answers with an unexpected status code, or a filter case finds no question."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size", default="3.5k",
+            help=f"Bank size: number of questions or one of {', '.join(BANK_SIZES)} (default: 3.5k).",
+        )
+        parser.add_argument(
+            "-n", "--iterations", type=int, default=20,
+            help="Requests per page / step (default: 20).",
+        )
+        parser.add_argument(
+            "--exam-runs", type=int, default=3,
+            help="Full exams to sit (default: 3).",
+        )
+        parser.add_argument(
+            "--admin-runs", type=int, default=3,
+            help="Runs of each upload / admin action (default: 3).",
+        )
+        parser.add_argument(
+            "--keepdb", action="store_true",
+            help="Keep the scratch database (and its generated bank) for the next run.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Where to write the JSON results (default: bench_results/<commit>-<size>.json).",
+        )
+        parser.add_argument(
+            "--compare",
+            help="Earlier results JSON to print the differences against.",
+        )
+        parser.add_argument(
+            "--host", default="127.0.0.1",
+            help="Host header to send; must be in ALLOWED_HOSTS (default: 127.0.0.1).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            size = parse_bank_size(options["size"])
+        except ValueError:
+            raise CommandError(f"Unknown size {options['size']!r}.")
+
+        test_settings = connection.settings_dict.setdefault("TEST", {})
+        if connection.vendor == "sqlite" and not test_settings.get("NAME"):
+            # on disk, not the in-memory default, so timings are realistic
+            test_settings["NAME"] = str(Path(settings.BASE_DIR) / f"bench_{options['size']}.sqlite3")
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        try:
+            with tempfile.TemporaryDirectory() as scratch, override_settings(
+                TTS_BACKEND="quiz.tts_backends.StubBackend",
+                TTS_CACHE_DIR=str(Path(scratch) / "tts"),
+                PACK_CACHE_DIR=str(Path(scratch) / "packs"),
+                # no collectstatic manifest needed to render the pages
+                STORAGES={
+                    **settings.STORAGES,
+                    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+                },
+                # one process: its own bumps update the memo, and a periodic
+                # re-read would land in a random request's query count
+                BANK_VERSION_TTL=3600,
+            ):
+                results, seconds = self._run(size, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        report = {
+            "commit": self._commit(),
+            "size": size,
+            "iterations": options["iterations"],
+            "exam_runs": options["exam_runs"],
+            "admin_runs": options["admin_runs"],
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "seconds": round(seconds, 2),
+            "results": results,
+        }
+        output = Path(options["output"] or Path(settings.BASE_DIR) / "bench_results" / f"{report['commit']}-{options['size']}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + "\n")
+
+        baseline = json.loads(Path(options["compare"]).read_text())["results"] if options["compare"] else {}
+        self._print(results, baseline)
+        self.stdout.write(f"\nResults written to {output}")
+
+        over = [label for label, row in results.items() if row["over_budget"]]
+        failed = [label for label, row in results.items() if row["errors"]]
+        problems = []
+        if failed:
+            problems.append(f"Unexpected responses (status code, or no question shown): {', '.join(failed)}")
+        if over:
+            problems.append(f"Over the query budget: {', '.join(over)}")
+        if problems:
+            raise CommandError("\n".join(problems))
+        self.stdout.write(self.style.SUCCESS("All views answered as expected and within their query budgets."))
+
+    def _run(self, size, options):
+        cache.clear()
+        invalidate_distractor_index()
+        if Question.objects.count() != size:
+            self.stdout.write(f"Generating a {size}-question bank...")
+            self.stdout.write(generate_bank(size, replace=True).summary())
+            self.stdout.write(sync_book_based_to_bookmode().summary())
+
+        staff, _ = get_user_model().objects.get_or_create(
+            username="bench", defaults={"is_staff": True, "is_superuser": True},
+        )
+        client = Client(SERVER_NAME=options["host"])
+        staff_client = Client(SERVER_NAME=options["host"])
+        staff_client.force_login(staff)
+
+        rec = benchmarks.BenchRecorder()
+        started = time.perf_counter()
+        steps = [
+            ("mc_quiz", lambda: benchmarks.bench_mc_quiz(rec, client, options["iterations"])),
+            ("exam", lambda: benchmarks.bench_exam(rec, client, options["exam_runs"])),
+            ("book_listen", lambda: benchmarks.bench_book_listen(rec, client, options["iterations"])),
+            # these write to the bank, so they go last
+            ("upload_questions", lambda: benchmarks.bench_upload(rec, staff_client, options["admin_runs"], int(time.time()))),
+            ("admin", lambda: benchmarks.bench_admin(rec, staff_client, options["admin_runs"])),
+        ]
+        for name, step in steps:
+            step_started = time.perf_counter()
+            step()
+            self.stdout.write(f"  {name}: {time.perf_counter() - step_started:.1f}s")
+        benchmarks.remove_uploads()
+        return rec.as_dict(), time.perf_counter() - started
+
+    def _print(self, results, baseline):
+        self.stdout.write(
+            f"\n{'view':<40} {'n':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'budget':>6}"
+            + ("  vs baseline (p50, queries)" if baseline else "")
+        )
+        for label, row in results.items():
+            line = (
+                f"{label:<40} {row['n']:>4} {row['p50_ms']:>7.2f}ms {row['p95_ms']:>7.2f}ms "
+                f"{row['p99_ms']:>7.2f}ms {row['queries_max']:>8} {row['query_budget']:>6}"
+            )
+            old = baseline.get(label)
+            if old:
+                change = (row["p50_ms"] - old["p50_ms"]) * 100 / old["p50_ms"] if old["p50_ms"] else 0.0
+                line += f"  {change:+6.1f}%  {row['queries_max'] - old['queries_max']:+d}"
+            if row["over_budget"]:
+                line = self.style.ERROR(line + "  OVER BUDGET")
+            self.stdout.write(line)
+
+    @staticmethod
+    def _commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return "unknown"
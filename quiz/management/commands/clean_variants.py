@@ -0,0 +1,24 @@
+# quiz/management/commands/clean_variants.py
+
+from django.core.management.base import BaseCommand
+
+from quiz.cleanup import clean_variants
+
+
+class Command(BaseCommand):
+    help = "Collapse '(variant N)' / '(extended variant N)' duplicate questions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Show what would change without writing anything.",
+        )
+
+    def handle(self, *args, **options):
+        plan = clean_variants(dry_run=options["dry_run"])
+        if options["dry_run"] and options["verbosity"] > 1:
+            for q_id, old_text, new_text in plan.renames:
+                self.stdout.write(f"rename #{q_id}: {old_text!r} -> {new_text!r}")
+            if plan.delete_ids:
+                self.stdout.write(f"delete ids: {', '.join(map(str, plan.delete_ids))}")
+        self.stdout.write(self.style.SUCCESS(plan.summary()))
@@ -0,0 +1,15 @@
+# quiz/management/commands/compact_bank_changes.py
+
+from django.core.management.base import BaseCommand
+
+from quiz.changes import compact_bank_changes
+from quiz.models import BankChange
+
+
+class Command(BaseCommand):
+    help = "Remove change-log rows superseded by a later change to the same object."
+
+    def handle(self, *args, **options):
+        removed = compact_bank_changes()
+        kept = BankChange.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Removed {removed} superseded changes; {kept} kept."))
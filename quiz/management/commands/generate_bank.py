@@ -0,0 +1,72 @@
+# quiz/management/commands/generate_bank.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from bookmode.sync import sync_book_based_to_bookmode
+from quiz.models import Question
+from quiz.synthetic import BANK_SIZES, generate_bank, parse_bank_size
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the question bank with synthetic questions (same category / "
+        "topic / year / true-false mix as the real bank), for benchmarks. "
+        "Use on a scratch database: it asks before writing unless --noinput."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "size",
+            help=f"Number of questions, or one of {', '.join(BANK_SIZES)}.",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Random seed; the same seed and size give the same bank (default: 0).",
+        )
+        parser.add_argument(
+            "--replace", action="store_true",
+            help="Delete the existing questions (and their stats) first.",
+        )
+        parser.add_argument(
+            "--no-bookmode", action="store_true",
+            help="Don't sync the book-based questions into listening mode afterwards.",
+        )
+        parser.add_argument(
+            "--noinput", "--no-input", action="store_false", dest="interactive",
+            help="Don't ask for confirmation before writing to the database.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            count = parse_bank_size(options["size"])
+        except ValueError:
+            raise CommandError(f"Unknown size {options['size']!r}.")
+        if count <= 0:
+            raise CommandError("Size must be positive.")
+        if options["replace"]:
+            action = (
+                "DELETE every question (with its stats, review cards, change log "
+                f"and listening sessions) and write {count} synthetic ones to"
+            )
+        else:
+            action = f"add {count} synthetic questions to"
+            if Question.objects.exists():
+                self.stdout.write(self.style.WARNING(
+                    "The bank is not empty; adding to it (use --replace to start over)."
+                ))
+
+        if options["interactive"]:
+            confirm = input(
+                f"This will {action} the database {connection.settings_dict['NAME']!r}.\n"
+                "Type 'yes' to continue, or 'no' to cancel: "
+            )
+            if confirm != "yes":
+                self.stdout.write("Generate cancelled.")
+                return
+
+        result = generate_bank(count, seed=options["seed"], replace=options["replace"])
+        self.stdout.write(self.style.SUCCESS(result.summary()))
+
+        if not options["no_bookmode"]:
+            self.stdout.write(self.style.SUCCESS(sync_book_based_to_bookmode().summary()))
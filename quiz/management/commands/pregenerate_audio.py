@@ -0,0 +1,183 @@
+# quiz/management/commands/pregenerate_audio.py
+
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from bookmode.models import BookModeSession
+from quiz import tts
+from quiz.models import Question
+
+
+def _render(job):
+    """Worker: synthesise one sentence into the cache. Runs in a child process."""
+    key, text, speed = job
+    backend = tts.get_backend()
+    try:
+        data = backend.synthesise(text, tts.DEFAULT_LANG, tts.DEFAULT_TLD, speed)
+    except tts.TTSError as exc:
+        return key, str(exc)
+    tts.get_tts_cache().put(key, backend.suffix, data)
+    return key, None
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-generate TTS audio for book listening mode (and optionally every "
+        "Question) so playback never waits on synthesis."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1,
+            help="Number of worker processes (default: CPU count).",
+        )
+        parser.add_argument(
+            "--speed", type=float, action="append", dest="speeds",
+            help="Speech speed to render the listening items at; repeat for several "
+                 "(default: 1.4, the listening page default).",
+        )
+        parser.add_argument(
+            "--sections", action="store_true",
+            help="Also render each item as numbered within its own section filter.",
+        )
+        parser.add_argument(
+            "--questions", action="store_true",
+            help="Also render what the 🔊 button reads on the quiz pages (each "
+                 "question and answer, at the default speed it asks for).",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Re-synthesise items even if their audio is already cached.",
+        )
+        parser.add_argument(
+            "--manifest", default=None,
+            help="Where to write the item -> audio file manifest "
+                 "(default: <TTS_CACHE_DIR>/manifest.json).",
+        )
+
+    def collect_items(self, sections, questions, speeds):
+        """Yield (item_id, text, speeds) for everything we want audio for."""
+        sessions = list(
+            BookModeSession.objects.filter(active=True)
+            .order_by("order_index", "id")
+            .only("id", "question_text", "correct_answer", "section", "section_norm")
+        )
+
+        # "All sections" playlist: numbered across the whole book
+        for position, item in enumerate(sessions, start=1):
+            yield f"book/{item.pk}", item.listen_text(position), speeds
+
+        # per-section playlists: numbered within the section, grouped on
+        # section_norm like the listening page and its playlist
+        if sections:
+            by_section = {}
+            for item in sessions:
+                if item.section_norm:
+                    by_section.setdefault(item.section_norm, []).append(item)
+            for items in by_section.values():
+                for position, item in enumerate(items, start=1):
+                    yield f"book/{item.pk}@{item.section}", item.listen_text(position), speeds
+
+        if questions:
+            # the 🔊 button plays read_aloud_parts() (question, then each
+            # option) with no ?speed=, i.e. at DEFAULT_SPEED
+            backend = tts.get_backend()
+            default = [backend.effective_speed(tts.DEFAULT_SPEED)]
+            rows = Question.objects.values_list("id", "question_text", "answer_text").iterator()
+            for q_id, question_text, answer_text in rows:
+                text = tts.read_aloud_text(question_text)
+                if text:
+                    yield f"question/{q_id}", text, default
+                text = tts.read_aloud_text(answer_text)
+                if text:
+                    yield f"answer/{q_id}", text, default
+
+    def handle(self, *args, **options):
+        backend = tts.get_backend()
+        # keyed like tts_view: on the speed the backend really renders
+        speeds = sorted({
+            backend.effective_speed(tts.parse_speed(s)) for s in (options["speeds"] or [1.4])
+        })
+        cache = tts.get_tts_cache()
+        started = time.perf_counter()
+
+        manifest_items = {}
+        jobs = {}
+        cached = 0
+        items = self.collect_items(options["sections"], options["questions"], speeds)
+        for item_id, text, item_speeds in items:
+            for speed in item_speeds:
+                key = cache.key(backend.name, text, tts.DEFAULT_LANG, tts.DEFAULT_TLD, speed)
+                path = cache.path_for(key, backend.suffix)
+                manifest_items.setdefault(item_id, {})[f"{speed:.2f}"] = str(
+                    path.relative_to(cache.directory)
+                )
+                if not options["force"] and cache.get(key, backend.suffix) is not None:
+                    cached += 1
+                elif key not in jobs:
+                    jobs[key] = (key, text, speed)
+
+        self.stdout.write(
+            f"{len(manifest_items)} items: "
+            f"{cached} already cached, {len(jobs)} to synthesise with '{backend.name}'."
+        )
+
+        failed = {}
+        done = 0
+        workers = max(1, options["workers"])
+        if jobs and workers == 1:
+            for job in jobs.values():
+                key, error = _render(job)
+                if error:
+                    failed[key] = error
+                done += 1
+        elif jobs:
+            # children only synthesise and write files; don't hand them our DB connection
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_render, job) for job in jobs.values()]
+                for future in as_completed(futures):
+                    key, error = future.result()
+                    if error:
+                        failed[key] = error
+                    done += 1
+                    if done % 500 == 0:
+                        self.stdout.write(f"  {done}/{len(jobs)}")
+
+        # drop entries we couldn't render so the manifest only points at real files
+        if failed:
+            failed_paths = {str(cache.path_for(k, backend.suffix).relative_to(cache.directory)) for k in failed}
+            for item_id, files in list(manifest_items.items()):
+                files = {s: p for s, p in files.items() if p not in failed_paths}
+                if files:
+                    manifest_items[item_id] = files
+                else:
+                    del manifest_items[item_id]
+            self.stderr.write(f"{len(failed)} sentences failed, e.g.: {next(iter(failed.values()))}")
+
+        manifest_path = Path(options["manifest"] or cache.directory / "manifest.json")
+        self.write_manifest(manifest_path, {
+            "backend": backend.name,
+            "speeds": [f"{s:.2f}" for s in speeds],
+            "generated_at": int(time.time()),
+            "items": manifest_items,
+        })
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Synthesised {done - len(failed)} files in {time.perf_counter() - started:.1f}s; "
+            f"manifest written to {manifest_path}."
+        ))
+
+    def write_manifest(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, indent=1, sort_keys=True)
+        os.replace(tmp_name, path)
@@ -0,0 +1,19 @@
+# quiz/management/commands/rebuild_exam_rollups.py
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from quiz.progress import rebuild_exam_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the exam progress rollups from the stored exam attempts."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        rollups, daily = rebuild_exam_rollups()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {rollups} topic/section rollups and {daily} daily rows "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0009_alter_question_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='answer_kind',
+            field=models.CharField(choices=[('text', 'Text'), ('year', 'Year / date'), ('true_false', 'True / False')], db_index=True, default='text', editable=False, max_length=10),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='answer_len',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='answer_norm',
+            field=models.TextField(blank=True, db_index=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='answer_year',
+            field=models.PositiveSmallIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='question_norm',
+            field=models.TextField(blank=True, db_index=True, default='', editable=False),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:37
+
+from django.db import migrations
+
+from quiz.normalise import derived_answer_fields
+
+
+def populate(apps, schema_editor):
+    Question = apps.get_model("quiz", "Question")
+    fields = ["answer_kind", "answer_year", "answer_len", "answer_norm", "question_norm"]
+
+    batch = []
+    for q in Question.objects.only("id", "question_text", "answer_text").iterator(chunk_size=1000):
+        for field, value in derived_answer_fields(q.question_text, q.answer_text).items():
+            setattr(q, field, value)
+        batch.append(q)
+        if len(batch) >= 1000:
+            Question.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0010_question_derived_answer_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
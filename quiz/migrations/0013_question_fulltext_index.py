@@ -0,0 +1,105 @@
+"""
+Full-text index over question_text, answer_text and subcategory.
+
+- SQLite: an FTS5 external-content table (quiz_question_fts) kept in
+  step with quiz_question by triggers, so saves, deletes, bulk_create
+  and bulk_update are all indexed without any Python hooks.
+- PostgreSQL: a generated, weighted tsvector column with a GIN index.
+- Anything else (or SQLite built without FTS5): nothing is created and
+  quiz.search falls back to icontains.
+"""
+
+from django.db import migrations
+
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE quiz_question_fts USING fts5(
+        question_text, answer_text, subcategory,
+        content='quiz_question', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER quiz_question_fts_ai AFTER INSERT ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(rowid, question_text, answer_text, subcategory)
+        VALUES (new.id, new.question_text, new.answer_text, coalesce(new.subcategory, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_question_fts_ad AFTER DELETE ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(quiz_question_fts, rowid, question_text, answer_text, subcategory)
+        VALUES ('delete', old.id, old.question_text, old.answer_text, coalesce(old.subcategory, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER quiz_question_fts_au AFTER UPDATE OF question_text, answer_text, subcategory ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(quiz_question_fts, rowid, question_text, answer_text, subcategory)
+        VALUES ('delete', old.id, old.question_text, old.answer_text, coalesce(old.subcategory, ''));
+        INSERT INTO quiz_question_fts(rowid, question_text, answer_text, subcategory)
+        VALUES (new.id, new.question_text, new.answer_text, coalesce(new.subcategory, ''));
+    END
+    """,
+    "INSERT INTO quiz_question_fts(quiz_question_fts) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS quiz_question_fts_ai",
+    "DROP TRIGGER IF EXISTS quiz_question_fts_ad",
+    "DROP TRIGGER IF EXISTS quiz_question_fts_au",
+    "DROP TABLE IF EXISTS quiz_question_fts",
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE quiz_question ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(question_text, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(answer_text, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(subcategory, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX quiz_question_search_idx ON quiz_question USING GIN (search_vector)",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS quiz_question_search_idx",
+    "ALTER TABLE quiz_question DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _sqlite_has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any("FTS5" in row[0] for row in cursor.fetchall())
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == "sqlite":
+        if not _sqlite_has_fts5(connection):
+            return
+        statements = SQLITE_FORWARD
+    elif connection.vendor == "postgresql":
+        statements = POSTGRES_FORWARD
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def backwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0012_question_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0013_question_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64)),
+                ('seed', models.BigIntegerField()),
+                ('started_at', models.DateTimeField()),
+                ('finished_at', models.DateTimeField()),
+                ('total', models.PositiveSmallIntegerField()),
+                ('correct', models.PositiveSmallIntegerField()),
+                ('passed', models.BooleanField()),
+                ('answer_vector', models.CharField(blank=True, max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['learner_key', '-finished_at'], name='quiz_attempt_learner_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('passed', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+                ('answered', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('learner_key', 'day'), name='quiz_exam_daily_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64)),
+                ('dimension', models.CharField(choices=[('topic', 'Topic'), ('subcategory', 'Subcategory')], max_length=12)),
+                ('key', models.CharField(blank=True, max_length=200)),
+                ('attempted', models.PositiveIntegerField(default=0)),
+                ('correct', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('learner_key', 'dimension', 'key'), name='quiz_exam_rollup_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ExamAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('chosen', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('is_correct', models.BooleanField()),
+                ('topic', models.CharField(blank=True, default='', max_length=20)),
+                ('subcategory', models.CharField(blank=True, default='', max_length=200)),
+                ('question', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quiz.question')),
+                ('attempt', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_answers', to='quiz.examattempt')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('attempt', 'position'), name='quiz_exam_answer_position_uniq')],
+            },
+        ),
+    ]
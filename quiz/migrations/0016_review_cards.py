@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0015_answer_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64)),
+                ('due_at', models.DateTimeField()),
+                ('interval_days', models.FloatField(default=0.0)),
+                ('ease', models.FloatField(default=2.5)),
+                ('repetitions', models.PositiveIntegerField(default=0)),
+                ('lapses', models.PositiveIntegerField(default=0)),
+                ('last_reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='review_cards', to='quiz.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['learner_key', 'due_at'], name='quiz_review_due_idx')],
+                'constraints': [models.UniqueConstraint(fields=('learner_key', 'question'), name='quiz_review_card_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0016_review_cards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('question', 'Question'), ('bookmode', 'Book mode session')], max_length=10)),
+                ('object_id', models.BigIntegerField()),
+                ('op', models.CharField(choices=[('upsert', 'Created / updated'), ('delete', 'Deleted')], max_length=6)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'object_id'], name='quiz_bankchange_object_idx')],
+            },
+        ),
+    ]
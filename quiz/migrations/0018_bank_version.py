@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0017_bank_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:21
+
+"""
+Drop the single-column indexes on the derived answer fields; nothing
+filters or orders by them (question_norm keeps its index).
+
+The indexes are dropped by name instead of with AlterField: on SQLite an
+AlterField rebuilds quiz_question, and the rebuild silently loses the
+FTS triggers from 0013.
+"""
+
+from django.db import migrations, models
+
+
+COLUMNS = ['answer_kind', 'answer_len', 'answer_norm', 'answer_year']
+
+
+def _column_indexes(schema_editor, columns):
+    """{column: [index names]} for the plain single-column indexes on quiz_question."""
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, 'quiz_question')
+    found = {}
+    for name, info in constraints.items():
+        if info['index'] and not info['unique'] and not info['primary_key'] and len(info['columns']) == 1:
+            found.setdefault(info['columns'][0], []).append(name)
+    return {column: found.get(column, []) for column in columns}
+
+
+def drop_indexes(apps, schema_editor):
+    for names in _column_indexes(schema_editor, COLUMNS).values():
+        for name in names:
+            schema_editor.execute(schema_editor._delete_index_sql(apps.get_model('quiz', 'Question'), name))
+
+
+def create_indexes(apps, schema_editor):
+    Question = apps.get_model('quiz', 'Question')
+    for column in COLUMNS:
+        field = Question._meta.get_field(column)
+        for sql in schema_editor._field_indexes_sql(Question, field):
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0018_bank_version'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(drop_indexes, create_indexes),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='question',
+                    name='answer_kind',
+                    field=models.CharField(choices=[('text', 'Text'), ('year', 'Year / date'), ('true_false', 'True / False')], default='text', editable=False, max_length=10),
+                ),
+                migrations.AlterField(
+                    model_name='question',
+                    name='answer_len',
+                    field=models.PositiveIntegerField(default=0, editable=False),
+                ),
+                migrations.AlterField(
+                    model_name='question',
+                    name='answer_norm',
+                    field=models.TextField(blank=True, default='', editable=False),
+                ),
+                migrations.AlterField(
+                    model_name='question',
+                    name='answer_year',
+                    field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+                ),
+            ],
+        ),
+    ]
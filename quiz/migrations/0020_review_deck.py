@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:28
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_existing_cards(apps, schema_editor):
+    ReviewCard = apps.get_model("quiz", "ReviewCard")
+    ReviewDeck = apps.get_model("quiz", "ReviewDeck")
+    ReviewDeck.objects.bulk_create(
+        ReviewDeck(learner_key=row["learner_key"], cards=row["n"])
+        for row in ReviewCard.objects.values("learner_key").annotate(n=Count("id"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0019_drop_unused_derived_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewDeck',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('learner_key', models.CharField(max_length=64, unique=True)),
+                ('cards', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_existing_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+"""
+Put back the SQLite FTS triggers from 0013 on databases that ran the
+first version of 0019: its AlterFields rebuilt quiz_question, which drops
+every trigger on the table. The index is then rebuilt from the table, so
+rows added, edited or deleted in the meantime are searchable again (and
+deleted ones gone). A no-op where the triggers are already there, and on
+other databases.
+"""
+
+from django.db import migrations
+
+
+TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS quiz_question_fts_ai AFTER INSERT ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(rowid, question_text, answer_text, subcategory)
+        VALUES (new.id, new.question_text, new.answer_text, coalesce(new.subcategory, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quiz_question_fts_ad AFTER DELETE ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(quiz_question_fts, rowid, question_text, answer_text, subcategory)
+        VALUES ('delete', old.id, old.question_text, old.answer_text, coalesce(old.subcategory, ''));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS quiz_question_fts_au AFTER UPDATE OF question_text, answer_text, subcategory ON quiz_question BEGIN
+        INSERT INTO quiz_question_fts(quiz_question_fts, rowid, question_text, answer_text, subcategory)
+        VALUES ('delete', old.id, old.question_text, old.answer_text, coalesce(old.subcategory, ''));
+        INSERT INTO quiz_question_fts(rowid, question_text, answer_text, subcategory)
+        VALUES (new.id, new.question_text, new.answer_text, coalesce(new.subcategory, ''));
+    END
+    """,
+]
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite" or "quiz_question_fts" not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'quiz_question_fts_%'")
+        if cursor.fetchone()[0] == len(TRIGGERS):
+            return
+    for sql in TRIGGERS:
+        schema_editor.execute(sql)
+    schema_editor.execute("INSERT INTO quiz_question_fts(quiz_question_fts) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0020_review_deck'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0021_restore_fulltext_triggers'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='examattempt',
+            name='answer_vector',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
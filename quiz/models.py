@@ -1,5 +1,7 @@
 from django.db import models
 
+from .normalise import derived_answer_fields
+
 class Question(models.Model):
     TOPIC_CHOICES = [
         ('history', 'History'),
@@ -24,6 +26,14 @@ class Question(models.Model):
         ('mixed', 'Random'),
         ('other', 'Other'),
     ]
+    KIND_TEXT = 'text'
+    KIND_YEAR = 'year'
+    KIND_TRUE_FALSE = 'true_false'
+    ANSWER_KIND_CHOICES = [
+        (KIND_TEXT, 'Text'),
+        (KIND_YEAR, 'Year / date'),
+        (KIND_TRUE_FALSE, 'True / False'),
+    ]
 
     question_text = models.TextField()
     subcategory = models.CharField(max_length=200, blank=True, null=True)
@@ -33,6 +43,38 @@ class Question(models.Model):
     theme = models.CharField(max_length=20, choices=THEME_CHOICES, blank=True, null=True, help_text="(Kings, Wars, Gov...ect)",
     )
 
+    # Derived from question_text / answer_text in update_derived_fields(),
+    # so the quiz views never have to re-run the regexes per request.
+    # Only question_norm is looked up (importer matching), so only it is indexed.
+    answer_kind = models.CharField(max_length=10, choices=ANSWER_KIND_CHOICES, default=KIND_TEXT, editable=False)
+    answer_year = models.PositiveSmallIntegerField(blank=True, null=True, editable=False)
+    answer_len = models.PositiveIntegerField(default=0, editable=False)
+    answer_norm = models.TextField(blank=True, default='', editable=False)
+    question_norm = models.TextField(blank=True, default='', editable=False, db_index=True)
+
+    class Meta:
+        # match the mc_quiz access paths: mode (category or topic) + filters,
+        # and the DISTINCT subcategory dropdown
+        indexes = [
+            models.Index(fields=['category', 'topic'], name='quiz_q_category_topic_idx'),
+            models.Index(fields=['category', 'subcategory'], name='quiz_q_category_sub_idx'),
+            models.Index(fields=['topic', 'subcategory'], name='quiz_q_topic_sub_idx'),
+            models.Index(fields=['subcategory'], name='quiz_q_sub_idx'),
+        ]
+
+    DERIVED_FIELDS = ['answer_kind', 'answer_year', 'answer_len', 'answer_norm', 'question_norm']
+
+    def update_derived_fields(self):
+        for field, value in derived_answer_fields(self.question_text, self.answer_text).items():
+            setattr(self, field, value)
+
+    def save(self, *args, **kwargs):
+        self.update_derived_fields()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = set(update_fields) | set(self.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+
 
     
     # def __str__(self):
@@ -40,3 +82,200 @@ class Question(models.Model):
     
     def __str__(self):
         return f"[{self.category} / {self.subcategory}] {self.question_text[:80]}"
+
+
+# ----------------- EXAM HISTORY -----------------
+
+class ExamAttempt(models.Model):
+    """
+    One finished exam. The paper itself is not stored: it derives from
+    `seed` (see quiz/exam.py); `answer_vector` is the packed answers.
+    """
+    learner_key = models.CharField(max_length=64)
+    seed = models.BigIntegerField()
+    started_at = models.DateTimeField()
+    finished_at = models.DateTimeField()
+    total = models.PositiveSmallIntegerField()
+    correct = models.PositiveSmallIntegerField()
+    passed = models.BooleanField()
+    answer_vector = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        indexes = [
+            # "my recent attempts" on the progress page
+            models.Index(fields=['learner_key', '-finished_at'], name='quiz_attempt_learner_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.learner_key} {self.correct}/{self.total} ({self.finished_at:%Y-%m-%d %H:%M})"
+
+
+class ExamAnswer(models.Model):
+    # topic / subcategory are copied from the question, so the rollups can
+    # be rebuilt even after questions are edited or deleted
+    attempt = models.ForeignKey(ExamAttempt, on_delete=models.CASCADE, related_name='exam_answers')
+    question = models.ForeignKey(Question, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    position = models.PositiveSmallIntegerField()
+    chosen = models.PositiveSmallIntegerField(null=True, blank=True)   # option index, None = no answer
+    is_correct = models.BooleanField()
+    topic = models.CharField(max_length=20, blank=True, default='')
+    subcategory = models.CharField(max_length=200, blank=True, default='')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['attempt', 'position'], name='quiz_exam_answer_position_uniq'),
+        ]
+
+
+class ExamRollup(models.Model):
+    """
+    Per-learner correct/attempted totals for one topic or subcategory.
+    Maintained incrementally by quiz.progress.record_exam_attempt().
+    """
+    DIMENSION_TOPIC = 'topic'
+    DIMENSION_SUBCATEGORY = 'subcategory'
+    DIMENSION_CHOICES = [
+        (DIMENSION_TOPIC, 'Topic'),
+        (DIMENSION_SUBCATEGORY, 'Subcategory'),
+    ]
+
+    learner_key = models.CharField(max_length=64)
+    dimension = models.CharField(max_length=12, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=200, blank=True)
+    attempted = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['learner_key', 'dimension', 'key'], name='quiz_exam_rollup_uniq'),
+        ]
+
+
+class ExamDailyRollup(models.Model):
+    """Per-learner exams taken / passed per day (pass rate over time)."""
+    learner_key = models.CharField(max_length=64)
+    day = models.DateField()
+    attempts = models.PositiveIntegerField(default=0)
+    passed = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    answered = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['learner_key', 'day'], name='quiz_exam_daily_uniq'),
+        ]
+
+
+# ----------------- ANSWER STATISTICS -----------------
+
+class AnswerEvent(models.Model):
+    """One answered practice question (written in batches by quiz.events)."""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='answer_events')
+    chosen = models.CharField(max_length=255, blank=True)
+    is_correct = models.BooleanField()
+    mode = models.CharField(max_length=30, blank=True)
+    created_at = models.DateTimeField()
+
+
+class QuestionStats(models.Model):
+    """Running per-question totals, folded in from AnswerEvent batches."""
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    error_rate = models.FloatField(default=0.0, db_index=True)   # (attempts - correct) / attempts
+    last_answered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'question stats'
+
+    def __str__(self):
+        return f"#{self.question_id}: {self.correct}/{self.attempts}"
+
+
+# ----------------- SPACED REPETITION -----------------
+
+class ReviewCard(models.Model):
+    """
+    One learner's SM-2 state for one question (see quiz/review.py).
+    learner_key is quiz.learners.get_learner_key(): 'u:<pk>' or 's:<uuid>'.
+    """
+    learner_key = models.CharField(max_length=64)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='review_cards')
+    due_at = models.DateTimeField()
+    interval_days = models.FloatField(default=0.0)
+    ease = models.FloatField(default=2.5)
+    repetitions = models.PositiveIntegerField(default=0)
+    lapses = models.PositiveIntegerField(default=0)
+    last_reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            # also serves "which card is this" and "newest question introduced"
+            models.UniqueConstraint(fields=['learner_key', 'question'], name='quiz_review_card_uniq'),
+        ]
+        indexes = [
+            # next due card = one seek on this index
+            models.Index(fields=['learner_key', 'due_at'], name='quiz_review_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.learner_key} #{self.question_id} due {self.due_at:%Y-%m-%d %H:%M}"
+
+
+class ReviewDeck(models.Model):
+    """
+    Per-learner count of cards introduced, bumped by quiz.review.record_review()
+    so the review page never counts ReviewCard rows. Cards of questions
+    deleted later stay counted ("learned" is history).
+    """
+    learner_key = models.CharField(max_length=64, unique=True)
+    cards = models.PositiveIntegerField(default=0)
+
+
+# ----------------- CHANGE LOG -----------------
+
+class BankChange(models.Model):
+    """
+    Append-only log of changes to Question / BookModeSession, written by
+    the signal receivers (quiz/changes.py). The autoincrement id is the
+    change version clients sync from; deletes are kept as tombstones.
+    """
+    MODEL_QUESTION = 'question'
+    MODEL_BOOKMODE = 'bookmode'
+    MODEL_CHOICES = [
+        (MODEL_QUESTION, 'Question'),
+        (MODEL_BOOKMODE, 'Book mode session'),
+    ]
+    OP_UPSERT = 'upsert'
+    OP_DELETE = 'delete'
+    OP_CHOICES = [
+        (OP_UPSERT, 'Created / updated'),
+        (OP_DELETE, 'Deleted'),
+    ]
+
+    model = models.CharField(max_length=10, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # compaction: latest change per object
+            models.Index(fields=['model', 'object_id'], name='quiz_bankchange_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.id} {self.op} {self.model}:{self.object_id}"
+
+
+# ----------------- BANK VERSION -----------------
+
+class BankVersion(models.Model):
+    """
+    One row holding the current bank version (see quiz/bank.py). Kept in
+    the database, not the cache, so every worker process sees a bump.
+    """
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"bank version {self.version}"
@@ -0,0 +1,73 @@
+# quiz/normalise.py
+
+import re
+import string
+
+
+# match things like 1066, 1415, 1450s, 2010s
+YEAR_RE = re.compile(r"(1[0-9]{3}|20[0-9]{2})s?")
+
+
+def normalise_answer(value: str) -> str:
+    """
+    Normalise answers for comparison:
+      - handle None safely
+      - strip spaces
+      - lowercase
+      - strip punctuation at both ends
+    So:
+      'True.'  ' TRUE! '  'true??'  all become 'true'
+    """
+    if not value:
+        return ""
+    return value.strip().lower().strip(string.punctuation)
+
+
+def normalise_question(text: str) -> str:
+    """
+    Normalise question text so small changes (like trailing full stop)
+    don't create duplicates.
+    """
+    if not text:
+        return ""
+    t = text.strip()
+    t = t.rstrip(".")                 # remove final "."
+    t = re.sub(r"\s+", " ", t)        # collapse multiple spaces
+    return t.lower()
+
+
+def find_year(answer: str):
+    """Return the first year-like match in an answer ('1066', '1450s'), or None."""
+    return YEAR_RE.search(answer or "")
+
+
+def is_true_false(question_text: str, answer_text: str) -> bool:
+    norm_answer = (answer_text or "").strip().lower().strip(" .!?")
+    return (
+        (question_text or "").strip().lower().startswith("true or false")
+        or norm_answer in ("true", "false")
+    )
+
+
+def derived_answer_fields(question_text: str, answer_text: str) -> dict:
+    """
+    The Question columns that are pure functions of its text:
+    answer_kind, answer_year, answer_len, answer_norm, question_norm.
+    """
+    answer = (answer_text or "").strip()
+    year_match = find_year(answer)
+
+    if is_true_false(question_text, answer):
+        kind = "true_false"
+    elif year_match:
+        kind = "year"
+    else:
+        kind = "text"
+
+    return {
+        "answer_kind": kind,
+        "answer_year": int(year_match.group(1)) if year_match else None,
+        "answer_len": len(answer),
+        "answer_norm": normalise_answer(answer),
+        "question_norm": normalise_question(question_text),
+    }
@@ -0,0 +1,250 @@
+# quiz/packs.py
+
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+
+from .bank import get_bank_version
+from .choices import build_choices_with_seed
+from .models import Question
+from .normalise import normalise_answer
+from .queries import questions_for_mode
+
+try:  # optional: serve .br as well when the brotli package is installed
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+PACK_FORMAT = 1
+
+# Accept-Encoding token -> file suffix, in order of preference
+ENCODINGS = [("br", ".json.br"), ("gzip", ".json.gz")]
+
+
+def pack_modes():
+    """Modes that can be downloaded as a pack (same keys as mc_quiz)."""
+    return (
+        ["all", "practice"]
+        + [key for key, _ in Question.CATEGORY_CHOICES]
+        + [key for key, _ in Question.TOPIC_CHOICES]
+    )
+
+
+def pack_salt() -> str:
+    # one stable salt for every pack and for /api/bank/changes, so the
+    # hashes in a delta match the pack they are applied to
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), b"quiz-pack", hashlib.sha256).hexdigest()[:16]
+
+
+def answer_hash(salt, answer_text) -> str:
+    """
+    What the client recomputes to check an answer offline:
+    sha256(salt + normalised answer), hex. Normalised = trimmed,
+    lower-cased, ASCII punctuation stripped from both ends
+    (quiz.normalise.normalise_answer).
+    """
+    return hashlib.sha256((salt + normalise_answer(answer_text)).encode("utf-8")).hexdigest()
+
+
+def choose_encoding(accept_encoding, available):
+    """First of `available` (preference order) the client accepts, or None."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token.strip().lower())
+    for encoding in available:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+
+# ----------------- BUILDING -----------------
+
+def build_pack(mode, version):
+    """The pack for one mode as a dict (one query for the questions)."""
+    from .changes import latest_change_id   # changes imports this module
+
+    # read before the questions: a delta from here may repeat a few
+    # upserts, but can never miss one
+    change_version = latest_change_id()
+    salt = pack_salt()
+    questions = (
+        questions_for_mode(mode)
+        .exclude(answer_text="")
+        .order_by("id")
+    )
+
+    items = []
+    for q in questions.iterator(chunk_size=1000):
+        items.append({
+            "id": q.id,
+            "q": q.question_text,
+            "sub": q.subcategory or "",
+            "topic": q.topic,
+            # seeded by id, so the same question always gets the same options
+            "choices": build_choices_with_seed(q, q.id),
+            "answer_hash": answer_hash(salt, q.answer_text),
+        })
+
+    return {
+        "format": PACK_FORMAT,
+        "mode": mode,
+        "version": version,
+        "change_version": change_version,   # ?since= for /api/bank/changes
+        "salt": salt,
+        "count": len(items),
+        "questions": items,
+    }
+
+
+class PackStore:
+    """
+    Pre-compressed JSON documents on disk, one set of files per
+    (name, bank version):
+
+        <dir>/<name>-<version>.json.gz   (+ .json.br with brotli installed)
+
+    `build(name, version, *args)` returns the document as a dict. It runs
+    on the first request after a bank change. A version's files are
+    removed once a newer version has been on disk for `prune_after`
+    seconds: another worker may still be on it for a moment (the bank
+    version is only re-read every BANK_VERSION_TTL), or be mid-download.
+    """
+
+    def __init__(self, directory, build, prune_after=600):
+        self.directory = Path(directory)
+        self.build = build
+        self.prune_after = prune_after
+
+    def path_for(self, name, version, suffix) -> Path:
+        return self.directory / f"{name}-{version}{suffix}"
+
+    def get_or_build(self, name, *args):
+        """(version, {encoding: path}) for the current bank version."""
+        version = get_bank_version()
+        return version, self.ensure(name, version, *args)
+
+    def ensure(self, name, version, *args):
+        """{encoding: path} for `version`, (re)built if any file is missing."""
+        paths = {
+            encoding: self.path_for(name, version, suffix)
+            for encoding, suffix in ENCODINGS
+            if encoding != "br" or brotli is not None
+        }
+        if not all(p.exists() for p in paths.values()):
+            self._build(name, version, paths, args)
+        return paths
+
+    def _build(self, name, version, paths, args):
+        raw = json.dumps(self.build(name, version, *args), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        for encoding, path in paths.items():
+            if encoding == "br":
+                data = brotli.compress(raw, quality=11)
+            else:
+                data = gzip.compress(raw, compresslevel=9, mtime=0)
+            self._write(path, data)
+
+        self._prune(name)
+
+    def _prune(self, name):
+        """Remove versions of `name` superseded more than prune_after seconds ago."""
+        versions = {}   # version -> [(path, mtime)]
+        for path in self.directory.glob(f"{name}-*.json.*"):
+            version = path.name[len(name) + 1:].split(".", 1)[0]
+            if path.name.endswith(".tmp") or not version.isdigit():
+                continue
+            try:
+                versions.setdefault(int(version), []).append((path, path.stat().st_mtime))
+            except FileNotFoundError:
+                continue
+
+        ordered = sorted(versions)
+        cutoff = time.time() - self.prune_after
+        for old, newer in zip(ordered, ordered[1:]):
+            # superseded when the next version's files were written
+            if min(mtime for _, mtime in versions[newer]) > cutoff:
+                continue
+            for path, _ in versions[old]:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    @staticmethod
+    def _write(path, data):
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+
+
+_store = None
+
+
+def get_pack_store() -> PackStore:
+    global _store
+    if _store is None:
+        _store = PackStore(settings.PACK_CACHE_DIR, build_pack, settings.PACK_PRUNE_AFTER)
+    return _store
+
+
+# ----------------- RESPONSES -----------------
+
+def pack_response(request, store, name, filename, *args):
+    """
+    Serve `name` from `store` (built with *args on a miss): the best pre-compressed file the client
+    accepts, with a strong ETag per (name, version, encoding). Any
+    representation of the current version revalidates to a 304.
+    """
+    version, paths = store.get_or_build(name, *args)
+    etag_base = f"{name}-{version}"
+    encoding = choose_encoding(request.headers.get("Accept-Encoding"), list(paths))
+    etag = f'"{etag_base}-{encoding or "identity"}"'
+
+    def add_headers(response):
+        response["ETag"] = etag
+        response["Cache-Control"] = "public, no-cache"
+        response["Vary"] = "Accept-Encoding"
+        return response
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        if tag == "*" or tag.rsplit("-", 1)[0] == etag_base:
+            return add_headers(HttpResponseNotModified())
+
+    try:
+        response = _pack_file_response(paths, encoding, filename)
+    except FileNotFoundError:
+        # pruned (or the cache dir cleared) since get_or_build(): build it again
+        response = _pack_file_response(store.ensure(name, version, *args), encoding, filename)
+    return add_headers(response)
+
+
+def _pack_file_response(paths, encoding, filename):
+    if encoding is None:
+        # rare: a client without gzip support
+        return HttpResponse(gzip.decompress(paths["gzip"].read_bytes()), content_type="application/json")
+    response = FileResponse(open(paths[encoding], "rb"), content_type="application/json", filename=filename)
+    response["Content-Encoding"] = encoding
+    return response
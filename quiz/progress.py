@@ -0,0 +1,209 @@
+# quiz/progress.py
+
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .exam import EXAM_PASS_MARK, answer_code, is_answer_correct, unpack_answer
+from .models import ExamAnswer, ExamAttempt, ExamDailyRollup, ExamRollup, Question
+
+
+# ----------------- RECORDING ATTEMPTS -----------------
+
+def record_exam_attempt(learner_key, seed, paper, answers, started_at, finished_at=None):
+    """
+    Store one finished exam and fold it into the rollups, all in one
+    transaction:
+
+      - 1 ExamAttempt row + bulk-created ExamAnswer rows
+      - rollup rows are created if missing, then bumped with F() so
+        concurrent finishes never lose counts
+      - questions removed mid-attempt aren't recorded (or counted);
+        unanswered ones are, as incorrect (same rule as score_exam)
+    """
+    finished_at = finished_at or timezone.now()
+
+    rows = []
+    for position, item in enumerate(paper):
+        if item.get("removed"):
+            continue
+        code = answer_code(answers, position)
+        selected = unpack_answer(item, code)
+        chosen = None if selected is None else item["choices"].index(selected)
+        rows.append(ExamAnswer(
+            question_id=item["id"],
+            position=position,
+            chosen=chosen,
+            is_correct=is_answer_correct(item, code),
+            topic=item["topic"] or "",
+            subcategory=item["subcategory"] or "",
+        ))
+
+    correct = sum(1 for row in rows if row.is_correct)
+    total = len(rows)
+    passed = correct >= EXAM_PASS_MARK
+
+    with transaction.atomic():
+        attempt = ExamAttempt.objects.create(
+            learner_key=learner_key,
+            seed=seed,
+            started_at=started_at,
+            finished_at=finished_at,
+            total=total,
+            correct=correct,
+            passed=passed,
+            answer_vector=answers,
+        )
+        for row in rows:
+            row.attempt = attempt
+        ExamAnswer.objects.bulk_create(rows)
+
+        _bump_rollups(learner_key, rows)
+        _bump_daily(learner_key, timezone.localdate(finished_at), passed, correct, total)
+
+    return attempt
+
+
+def _bump_rollups(learner_key, answer_rows):
+    attempted = Counter()
+    correct = Counter()
+    for row in answer_rows:
+        for dimension, key in [
+            (ExamRollup.DIMENSION_TOPIC, row.topic),
+            (ExamRollup.DIMENSION_SUBCATEGORY, row.subcategory),
+        ]:
+            attempted[dimension, key] += 1
+            correct[dimension, key] += row.is_correct
+
+    ExamRollup.objects.bulk_create(
+        [ExamRollup(learner_key=learner_key, dimension=d, key=k) for d, k in attempted],
+        ignore_conflicts=True,
+    )
+    for (dimension, key), n in attempted.items():
+        ExamRollup.objects.filter(learner_key=learner_key, dimension=dimension, key=key).update(
+            attempted=F("attempted") + n,
+            correct=F("correct") + correct[dimension, key],
+        )
+
+
+def _bump_daily(learner_key, day, passed, correct, answered):
+    ExamDailyRollup.objects.bulk_create(
+        [ExamDailyRollup(learner_key=learner_key, day=day)],
+        ignore_conflicts=True,
+    )
+    ExamDailyRollup.objects.filter(learner_key=learner_key, day=day).update(
+        attempts=F("attempts") + 1,
+        passed=F("passed") + int(passed),
+        correct=F("correct") + correct,
+        answered=F("answered") + answered,
+    )
+
+
+# ----------------- REBUILD -----------------
+
+def rebuild_exam_rollups():
+    """
+    Recompute every rollup from ExamAttempt / ExamAnswer (a few grouped
+    queries, then bulk inserts). Returns (rollup rows, daily rows).
+    """
+    rollups = []
+    for dimension in (ExamRollup.DIMENSION_TOPIC, ExamRollup.DIMENSION_SUBCATEGORY):
+        grouped = (
+            ExamAnswer.objects
+            .values("attempt__learner_key", dimension)
+            .annotate(n=Count("id"), ok=Count("id", filter=Q(is_correct=True)))
+            .order_by()
+        )
+        for row in grouped:
+            rollups.append(ExamRollup(
+                learner_key=row["attempt__learner_key"],
+                dimension=dimension,
+                key=row[dimension],
+                attempted=row["n"],
+                correct=row["ok"],
+            ))
+
+    # days are local dates, so group in Python rather than with TruncDate
+    daily = {}
+    for learner_key, finished_at, passed, correct, total in (
+        ExamAttempt.objects.values_list("learner_key", "finished_at", "passed", "correct", "total").iterator()
+    ):
+        key = (learner_key, timezone.localdate(finished_at))
+        row = daily.get(key)
+        if row is None:
+            row = daily[key] = ExamDailyRollup(learner_key=key[0], day=key[1])
+        row.attempts += 1
+        row.passed += int(passed)
+        row.correct += correct
+        row.answered += total
+
+    with transaction.atomic():
+        ExamRollup.objects.all().delete()
+        ExamDailyRollup.objects.all().delete()
+        ExamRollup.objects.bulk_create(rollups, batch_size=500)
+        ExamDailyRollup.objects.bulk_create(list(daily.values()), batch_size=500)
+
+    return len(rollups), len(daily)
+
+
+# ----------------- DASHBOARD -----------------
+
+def _with_percent(rows):
+    for row in rows:
+        row["percent"] = round(row["correct"] * 100 / row["attempted"]) if row["attempted"] else 0
+    return rows
+
+
+def progress_summary(learner_key, days=30, recent=10):
+    """
+    Everything the progress dashboard shows, read from the rollup tables
+    (plus the last few attempts) -- no scans over raw answers.
+    """
+    rollups = list(
+        ExamRollup.objects
+        .filter(learner_key=learner_key)
+        .values("dimension", "key", "attempted", "correct")
+        .order_by("dimension", "key")
+    )
+    topic_labels = dict(Question.TOPIC_CHOICES)
+    topics = _with_percent([
+        {**r, "label": topic_labels.get(r["key"], r["key"] or "Other")}
+        for r in rollups if r["dimension"] == ExamRollup.DIMENSION_TOPIC
+    ])
+    subcategories = _with_percent([
+        {**r, "label": r["key"] or "(none)"}
+        for r in rollups if r["dimension"] == ExamRollup.DIMENSION_SUBCATEGORY
+    ])
+    # weakest first: that's what people want to practise
+    subcategories.sort(key=lambda r: (r["percent"], -r["attempted"]))
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    daily = list(
+        ExamDailyRollup.objects
+        .filter(learner_key=learner_key, day__gte=since)
+        .order_by("day")
+    )
+    for row in daily:
+        row.pass_rate = round(row.passed * 100 / row.attempts) if row.attempts else 0
+
+    totals = ExamDailyRollup.objects.filter(learner_key=learner_key).aggregate(
+        attempts=Sum("attempts"), passed=Sum("passed"),
+    )
+
+    recent_attempts = list(
+        ExamAttempt.objects
+        .filter(learner_key=learner_key)
+        .order_by("-finished_at")[:recent]
+    )
+
+    return {
+        "topics": topics,
+        "subcategories": subcategories,
+        "daily": daily,
+        "attempts": totals["attempts"] or 0,
+        "passed": totals["passed"] or 0,
+        "recent_attempts": recent_attempts,
+    }
@@ -0,0 +1,42 @@
+# quiz/queries.py
+
+from .models import Question
+
+
+# ----------------- QUESTION POOL BY MODE -----------------
+
+def questions_for_mode(mode: str):
+    """
+    Interpret `mode` flexibly:
+
+      - "all"      -> all questions
+      - "practice"  -> mixed realistic practice (general + common + hardest)
+      - category key -> filter by category (general / hardest / cheatsheet / common)
+      - topic key    -> filter by topic (history / government / culture / geography / other)
+    """
+    mode = (mode or "").strip().lower()
+
+    # 1. ALL QUESTIONS
+    if mode == "all":
+        return Question.objects.all()
+
+    # 2. PRACTICE MIX
+    if mode == "practice":
+        return Question.objects.filter(
+            category__in=["general", "common", "hardest"]
+            # add "cheatsheet" if you want them included as well:
+            # category__in=["general", "common", "hardest", "cheatsheet"]
+        )
+
+    # 3. CATEGORY (matches CATEGORY_CHOICES keys)
+    category_keys = {key for key, _ in Question.CATEGORY_CHOICES}
+    if mode in category_keys:
+        return Question.objects.filter(category=mode)
+
+    # 4. TOPIC (matches TOPIC_CHOICES keys)
+    topic_keys = {key for key, _ in Question.TOPIC_CHOICES}
+    if mode in topic_keys:
+        return Question.objects.filter(topic=mode)
+
+    # 5. Unknown -> empty queryset
+    return Question.objects.none()
@@ -0,0 +1,110 @@
+# quiz/review.py
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import Question, ReviewCard, ReviewDeck
+
+# SM-2 grades we map a multiple-choice answer onto
+QUALITY_CORRECT = 4
+QUALITY_WRONG = 1
+
+MIN_EASE = 1.3
+RELEARN_DELAY = timedelta(minutes=10)   # missed cards come back in the same sitting
+
+
+# ----------------- SCHEDULER -----------------
+
+def sm2_schedule(card, quality, now):
+    """
+    Update `card` in place with the SM-2 rules (O(1), no queries):
+
+      - quality < 3 -> lapse: repetitions reset, due again in RELEARN_DELAY
+      - otherwise   -> 1 day, then 6 days, then interval * ease
+      - ease moves by the usual SM-2 formula, never below 1.3
+    """
+    if quality < 3:
+        card.repetitions = 0
+        card.interval_days = 0.0
+        card.lapses += 1
+        card.due_at = now + RELEARN_DELAY
+    else:
+        if card.repetitions == 0:
+            card.interval_days = 1.0
+        elif card.repetitions == 1:
+            card.interval_days = 6.0
+        else:
+            card.interval_days = round(card.interval_days * card.ease, 2)
+        card.repetitions += 1
+        card.due_at = now + timedelta(days=card.interval_days)
+
+    card.ease = max(MIN_EASE, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    card.last_reviewed_at = now
+    return card
+
+
+# ----------------- QUEUE -----------------
+
+def next_review_question(learner_key, now=None):
+    """
+    (question, state) for the learner's next card:
+
+      - "due"      oldest card with due_at <= now  (index seek on learner, due_at)
+      - "new"      the next question (by id) the learner hasn't seen yet;
+                   cards are introduced in id order, so "seen" is just the
+                   largest question id on the learner's cards
+      - "upcoming" nothing due and nothing new: the next card to come due
+      - (None, "empty") when the bank is empty
+    """
+    now = now or timezone.now()
+    cards = ReviewCard.objects.filter(learner_key=learner_key)
+
+    card = cards.filter(due_at__lte=now).select_related("question").order_by("due_at").first()
+    if card is not None:
+        return card.question, "due"
+
+    last_seen = cards.aggregate(last=Max("question_id"))["last"] or 0
+    question = Question.objects.filter(id__gt=last_seen).exclude(answer_text="").order_by("id").first()
+    if question is not None:
+        return question, "new"
+
+    card = cards.select_related("question").order_by("due_at").first()
+    if card is not None:
+        return card.question, "upcoming"
+    return None, "empty"
+
+
+def record_review(learner_key, question, is_correct, now=None):
+    """
+    Create or update the learner's card for `question` after one answer.
+    get_or_create() copes with a double-submit racing to create the same
+    card; a new card also bumps the learner's ReviewDeck count.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # row-locked (where the database can) so two answers can't both
+        # reschedule from the same old state
+        card, created = ReviewCard.objects.select_for_update().get_or_create(
+            learner_key=learner_key, question=question, defaults={"due_at": now},
+        )
+        if created:
+            ReviewDeck.objects.bulk_create([ReviewDeck(learner_key=learner_key)], ignore_conflicts=True)
+            ReviewDeck.objects.filter(learner_key=learner_key).update(cards=F("cards") + 1)
+
+        sm2_schedule(card, QUALITY_CORRECT if is_correct else QUALITY_WRONG, now)
+        card.save()
+    return card
+
+
+def review_counts(learner_key, now=None):
+    """
+    (due now, cards learned) for the stats box: the due count is a range
+    on the (learner_key, due_at) index, the total comes from ReviewDeck.
+    """
+    now = now or timezone.now()
+    due = ReviewCard.objects.filter(learner_key=learner_key, due_at__lte=now).count()
+    cards = ReviewDeck.objects.filter(learner_key=learner_key).values_list("cards", flat=True).first()
+    return due, cards or 0
@@ -0,0 +1,85 @@
+# quiz/search.py
+
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Question
+
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_backend = None   # "sqlite_fts" / "postgres" / "like", detected once per process
+
+
+def search_backend():
+    """Which full-text index the database has (see migration 0013)."""
+    global _backend
+    if _backend is None:
+        if connection.vendor == "postgresql":
+            _backend = "postgres"
+        elif connection.vendor == "sqlite" and "quiz_question_fts" in connection.introspection.table_names():
+            _backend = "sqlite_fts"
+        else:
+            _backend = "like"
+    return _backend
+
+
+def _tokens(query):
+    return _TOKEN_RE.findall((query or "").lower())
+
+
+def search_questions(query, queryset=None, ranked=False):
+    """
+    Filter `queryset` (default: all questions) to those matching `query`
+    in question text, answer or subcategory.
+
+    Every word must match, and each word also matches as a prefix
+    ('tud' finds 'Tudors'). With ranked=True the results are ordered
+    best match first (question text outweighs answer, then subcategory).
+    """
+    qs = Question.objects.all() if queryset is None else queryset
+    tokens = _tokens(query)
+    if not tokens:
+        return qs
+
+    backend = search_backend()
+
+    if backend == "sqlite_fts":
+        match = " ".join(f'"{t}"*' for t in tokens)
+        qs = qs.filter(id__in=RawSQL(
+            "SELECT rowid FROM quiz_question_fts WHERE quiz_question_fts MATCH %s",
+            [match],
+        ))
+        if ranked:
+            qs = qs.annotate(search_rank=RawSQL(
+                "SELECT bm25(quiz_question_fts, 10.0, 5.0, 1.0) FROM quiz_question_fts "
+                "WHERE quiz_question_fts MATCH %s AND rowid = quiz_question.id",
+                [match],
+            )).order_by("search_rank", "id")
+        return qs
+
+    if backend == "postgres":
+        tsquery = " & ".join(f"{t}:*" for t in tokens)
+        qs = qs.filter(id__in=RawSQL(
+            "SELECT id FROM quiz_question WHERE search_vector @@ to_tsquery('english', %s)",
+            [tsquery],
+        ))
+        if ranked:
+            qs = qs.annotate(search_rank=RawSQL(
+                "SELECT ts_rank(q2.search_vector, to_tsquery('english', %s)) "
+                "FROM quiz_question q2 WHERE q2.id = quiz_question.id",
+                [tsquery],
+            )).order_by("-search_rank", "id")
+        return qs
+
+    # no index available: every word must appear somewhere
+    for t in tokens:
+        qs = qs.filter(
+            Q(question_text__icontains=t) |
+            Q(answer_text__icontains=t) |
+            Q(subcategory__icontains=t)
+        )
+    return qs
@@ -0,0 +1,28 @@
+# quiz/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .bank import bump_bank_version
+from .changes import after_bank_commit, log_bank_change
+from .choices import invalidate_distractor_index
+from .models import BankChange, Question
+
+
+# Sent by bulk operations (bulk_create / bulk_update / queryset.update)
+# that bypass post_save, with kwargs:
+#   changed_ids: ids of rows created or updated
+#   deleted_ids: ids of rows removed
+# `sender` is the model class. Send it inside the writing transaction.
+bank_changed = Signal()
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(bank_changed, sender=Question)
+def question_changed(sender, signal, instance=None, changed_ids=(), deleted_ids=(), **kwargs):
+    log_bank_change(BankChange.MODEL_QUESTION, signal, instance, changed_ids, deleted_ids)
+
+    # rebuild from committed data, not from inside an open transaction
+    after_bank_commit(invalidate_distractor_index)
+    after_bank_commit(bump_bank_version)
@@ -0,0 +1,139 @@
+// quiz/static/quiz/sw.js
+//
+// Service worker for the whole site (registered from base.html with
+// scope "/"; WhiteNoise adds the Service-Worker-Allowed header).
+//
+//   - app shell:   precached on install from /offline/precache.json
+//   - /static/:    cache first (hashed names never change)
+//   - /tts/ audio: cache first, bounded LRU of MAX_AUDIO_ENTRIES
+//   - pages:       network first, cached copy when offline
+//
+// Cache names include this script's (hashed) URL, so a deploy with new
+// assets starts from clean caches and the old ones are dropped.
+
+const VERSION = self.location.pathname;
+const SHELL_CACHE = "shell:" + VERSION;
+const STATIC_CACHE = "static:" + VERSION;
+const AUDIO_CACHE = "tts-audio";          // audio is content-addressed, keep across deploys
+const MAX_AUDIO_ENTRIES = 200;
+
+self.addEventListener("install", (event) => {
+  event.waitUntil((async () => {
+    const cache = await caches.open(SHELL_CACHE);
+    const res = await fetch("/offline/precache.json", { cache: "no-store" });
+    const { urls } = await res.json();
+    await cache.addAll(urls);
+    await self.skipWaiting();
+  })());
+});
+
+self.addEventListener("activate", (event) => {
+  event.waitUntil((async () => {
+    const keep = new Set([SHELL_CACHE, STATIC_CACHE, AUDIO_CACHE]);
+    for (const name of await caches.keys()) {
+      if (!keep.has(name)) await caches.delete(name);
+    }
+    await self.clients.claim();
+  })());
+});
+
+self.addEventListener("fetch", (event) => {
+  const req = event.request;
+  if (req.method !== "GET") return;
+
+  const url = new URL(req.url);
+  if (url.origin !== self.location.origin) return;
+
+  if (url.pathname.startsWith("/static/")) {
+    event.respondWith(cacheFirst(req, STATIC_CACHE));
+  } else if (url.pathname === "/tts/") {
+    event.respondWith(audio(req));
+  } else if (req.mode === "navigate") {
+    event.respondWith(networkFirst(req));
+  }
+});
+
+async function cacheFirst(req, cacheName) {
+  const cache = await caches.open(cacheName);
+  const hit = await cache.match(req) || await caches.match(req);
+  if (hit) return hit;
+
+  const res = await fetch(req);
+  if (res.ok) cache.put(req, res.clone());
+  return res;
+}
+
+async function networkFirst(req) {
+  try {
+    const res = await fetch(req);
+    // refresh precached pages so the offline copy stays recent
+    const shell = await caches.open(SHELL_CACHE);
+    if (res.ok && await shell.match(req, { ignoreSearch: true })) {
+      shell.put(req, res.clone());
+    }
+    return res;
+  } catch (err) {
+    const hit = await caches.match(req) || await caches.match(req, { ignoreSearch: true });
+    if (hit) return hit;
+    throw err;
+  }
+}
+
+// ----------------- TTS AUDIO (LRU) -----------------
+
+async function audio(req) {
+  // key on the URL only: <audio> adds Range headers we don't want to vary on
+  const key = new Request(req.url);
+  const cache = await caches.open(AUDIO_CACHE);
+
+  let res = await cache.match(key);
+  if (res) {
+    // move to the most-recently-used end (keys() is insertion order)
+    await cache.delete(key);
+    await cache.put(key, res.clone());
+  } else {
+    res = await fetch(key);
+    if (res.status !== 200) return res;
+    await cache.put(key, res.clone());
+    trimAudio(cache);
+  }
+  return withRange(req, res);
+}
+
+async function trimAudio(cache) {
+  const keys = await cache.keys();
+  for (let i = 0; i < keys.length - MAX_AUDIO_ENTRIES; i++) {
+    await cache.delete(keys[i]);
+  }
+}
+
+// answer "Range: bytes=a-b" from a cached full response (Safari needs 206s)
+async function withRange(req, res) {
+  const range = req.headers.get("Range");
+  const m = range && /^bytes=(\d*)-(\d*)$/.exec(range.trim());
+  if (!m || (!m[1] && !m[2])) return res;
+
+  const blob = await res.blob();
+  const size = blob.size;
+  let start, end;
+  if (m[1]) {
+    start = parseInt(m[1], 10);
+    end = m[2] ? Math.min(parseInt(m[2], 10), size - 1) : size - 1;
+  } else {
+    start = Math.max(size - parseInt(m[2], 10), 0);
+    end = size - 1;
+  }
+  if (start > end || start >= size) {
+    return new Response(null, { status: 416, headers: { "Content-Range": "bytes */" + size } });
+  }
+
+  return new Response(blob.slice(start, end + 1), {
+    status: 206,
+    headers: {
+      "Content-Type": res.headers.get("Content-Type") || "audio/mpeg",
+      "Content-Range": `bytes ${start}-${end}/${size}`,
+      "Content-Length": String(end - start + 1),
+      "Accept-Ranges": "bytes",
+    },
+  });
+}
@@ -0,0 +1,199 @@
+# quiz/synthetic.py
+
+import random
+import time
+from dataclasses import dataclass
+
+from django.db import transaction
+
+from .changes import batched_bank_changes
+from .models import AnswerEvent, BankChange, ExamAnswer, Question, QuestionStats, ReviewCard, ReviewDeck
+from .signals import bank_changed
+
+
+WRITE_BATCH = 1000
+
+# named sizes for `manage.py generate_bank` / `bench_suite`
+BANK_SIZES = {"3.5k": 3_500, "50k": 50_000, "500k": 500_000}
+
+# (category, topic, answer kind) -> questions in the real bank (3,529 rows),
+# so a synthetic bank of any size has the same mix
+MIX = [
+    ("book_based", "other", "text", 1317),
+    ("book_based", "other", "true_false", 174),
+    ("book_based", "other", "year", 78),
+    ("general", "culture", "text", 737),
+    ("general", "culture", "year", 13),
+    ("general", "geography", "text", 465),
+    ("general", "government", "text", 317),
+    ("general", "government", "year", 1),
+    ("general", "history", "text", 180),
+    ("general", "history", "true_false", 4),
+    ("general", "history", "year", 33),
+    ("general", "other", "text", 210),
+]
+
+# every VARIANT_EVERY-th question starts a two-row "(Variant N)" group like
+# the imported files have (what clean_variants collapses); every other
+# group has no clean base row, so one of its variants gets renamed.
+# Capped, so the cleanup's batched deletes (and its bench query budget)
+# don't grow with the bank.
+VARIANT_EVERY = 50
+MAX_VARIANT_GROUPS = 70
+
+# about how many questions share a subcategory (book sections are short,
+# the general "Master" files long)
+SUBCATEGORY_SIZE = {"book_based": 20, "general": 80}
+
+WORDS = [
+    "Norman", "Tudor", "Stuart", "Roman", "Saxon", "Viking", "Georgian", "Victorian",
+    "Parliament", "Crown", "Church", "Castle", "Abbey", "Charter", "Council", "Union",
+    "Scotland", "Wales", "Ireland", "England", "London", "Edinburgh", "Cardiff", "Belfast",
+    "Industrial", "Reformation", "Enlightenment", "Empire", "Commonwealth", "Treaty",
+    "Festival", "Tradition", "Garden", "River", "Bridge", "Island", "Museum", "Library",
+]
+PEOPLE = [
+    "William the Conqueror", "Henry VIII", "Elizabeth I", "Oliver Cromwell", "Queen Victoria",
+    "Winston Churchill", "Isaac Newton", "Florence Nightingale", "Robert Burns", "Emmeline Pankhurst",
+    "King Alfred", "Robert the Bruce", "Charles Darwin", "William Shakespeare", "Margaret Thatcher",
+]
+TEXT_TEMPLATES = [
+    ("Who is associated with the {a} {b} (Q{n})?", "{person}."),
+    ("What was the {a} {b} known for (Q{n})?", "It was a {c} {d} recognised across the United Kingdom."),
+    ("Where is the {a} {b} found (Q{n})?", "In {c}."),
+    ("Which institution oversees the {a} {b} (Q{n})?", "The {c} {d}."),
+]
+YEAR_TEMPLATES = [
+    "When did the {a} {b} take place (Q{n})?",
+    "In what year was the {a} {b} established (Q{n})?",
+]
+TRUE_FALSE_TEMPLATE = "True or false: The {a} {b} is part of British history (Q{n})."
+
+
+@dataclass
+class GenerateResult:
+    created: int = 0
+    removed: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        removed = f", replaced {self.removed}" if self.removed else ""
+        return f"Generated {self.created} synthetic questions{removed} ({self.seconds:.2f}s)."
+
+
+def parse_bank_size(value) -> int:
+    """'3.5k' / '50k' / '500k' or a plain number of questions."""
+    value = str(value).strip().lower()
+    if value in BANK_SIZES:
+        return BANK_SIZES[value]
+    if value.endswith("k"):
+        return int(float(value[:-1]) * 1000)
+    return int(value)
+
+
+def _plan(count):
+    """[(category, topic, kind, n)] following MIX, summing to exactly `count`."""
+    weight_total = sum(weight for *_, weight in MIX)
+    plan = [(c, t, k, count * weight // weight_total) for c, t, k, weight in MIX]
+    # hand the rounding remainder to the biggest groups
+    short = count - sum(n for *_, n in plan)
+    order = sorted(range(len(plan)), key=lambda i: -plan[i][3])
+    for i in order[:short]:
+        c, t, k, n = plan[i]
+        plan[i] = (c, t, k, n + 1)
+    return plan
+
+
+def _question(rng, category, topic, kind, n):
+    a, b, c, d = rng.sample(WORDS, 4)
+    if kind == "year":
+        text = rng.choice(YEAR_TEMPLATES).format(a=a, b=b, n=n)
+        answer = f"{rng.randint(1066, 2022)}."
+    elif kind == "true_false":
+        text = TRUE_FALSE_TEMPLATE.format(a=a, b=b, n=n)
+        answer = rng.choice(["True.", "False."])
+    else:
+        template, answer_template = rng.choice(TEXT_TEMPLATES)
+        text = template.format(a=a, b=b, n=n)
+        answer = answer_template.format(c=c, d=d, person=rng.choice(PEOPLE))
+    return Question(question_text=text, answer_text=answer, category=category, topic=topic)
+
+
+def _questions(count, seed):
+    """Synthetic Questions in subcategory-sized runs, derived fields set."""
+    rng = random.Random(seed)
+    n = 0
+    prev = variant_of = None
+    for category, topic, kind, group_size in _plan(count):
+        per_sub = SUBCATEGORY_SIZE[category]
+        for i in range(group_size):
+            n += 1
+            q = _question(rng, category, topic, kind, n)
+            if n % VARIANT_EVERY == 0 and n // VARIANT_EVERY <= MAX_VARIANT_GROUPS and prev is not None:
+                source = prev if (n // VARIANT_EVERY) % 2 == 0 else q
+                variant_of = (source.question_text, source.answer_text)
+                q.question_text, q.answer_text = f"{variant_of[0]} (Variant 1)", variant_of[1]
+            elif n % VARIANT_EVERY == 1 and variant_of is not None:
+                q.question_text, q.answer_text = f"{variant_of[0]} (Extended Variant 2)", variant_of[1]
+                variant_of = None
+            prev = q
+            prefix = "Book" if category == "book_based" else topic.title()
+            q.subcategory = f"{prefix} {kind.replace('_', ' ').title()} Part{i // per_sub + 1}"
+            q.update_derived_fields()
+            yield q
+
+
+def _clear_bank():
+    """
+    Empty the question bank: meant for a scratch / benchmark database.
+    Listening-mode sessions and the change log go too; re-sync the
+    sessions after generating.
+    """
+    from bookmode.models import BookModeSession
+
+    removed = Question.objects.count()
+    # no delete receivers on these, so each is a single DELETE
+    for model in (AnswerEvent, QuestionStats, ReviewCard, ReviewDeck):
+        model.objects.all().delete()
+    ExamAnswer.objects.update(question=None)
+
+    # these send post_delete per row: delete in batches, each logged in one write
+    for model in (Question, BookModeSession):
+        ids = list(model.objects.values_list("id", flat=True))
+        for start in range(0, len(ids), WRITE_BATCH):
+            with batched_bank_changes():
+                model.objects.filter(id__in=ids[start:start + WRITE_BATCH]).delete()
+    BankChange.objects.all().delete()
+    return removed
+
+
+def generate_bank(count, seed=0, replace=False):
+    """
+    Add `count` synthetic questions with the same category / topic /
+    answer-kind mix as the real bank (MIX). Deterministic for a given
+    seed. With replace=True the existing bank is emptied first.
+    """
+    started = time.perf_counter()
+    result = GenerateResult()
+
+    with transaction.atomic():
+        if replace:
+            result.removed = _clear_bank()
+
+        batch = []
+        for q in _questions(count, seed):
+            batch.append(q)
+            if len(batch) >= WRITE_BATCH:
+                result.created += _write_batch(batch)
+                batch = []
+        if batch:
+            result.created += _write_batch(batch)
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _write_batch(batch):
+    Question.objects.bulk_create(batch)
+    bank_changed.send(sender=Question, changed_ids=[q.pk for q in batch], deleted_ids=[])
+    return len(batch)
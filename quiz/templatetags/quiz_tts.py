@@ -0,0 +1,14 @@
+# quiz/templatetags/quiz_tts.py
+
+from django import template
+
+from quiz.tts import read_aloud_parts
+
+
+register = template.Library()
+
+
+@register.filter
+def read_aloud(question_text, choices=()):
+    """{{ question.question_text|read_aloud:choices|json_script:"qa-read-text" }}"""
+    return read_aloud_parts(question_text, choices or ())
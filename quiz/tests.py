@@ -0,0 +1,631 @@
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.admin.models import LogEntry
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bookmode.models import BookModeSession
+from bookmode.playlist import listen_queryset
+
+from . import bank, tts
+from .changes import changes_since, latest_change_id
+from .choices import get_distractor_index, invalidate_distractor_index
+from .cleanup import clean_variants, plan_variant_cleanup
+from .events import AnswerEventBuffer
+from .exam import (
+    EXAM_DURATION_SECONDS,
+    EXAM_QUESTION_COUNT,
+    NO_ANSWER,
+    answer_code,
+    build_exam_paper,
+    pack_answer,
+    score_exam,
+)
+from .importers import import_questions, import_uploads, parse_csv_lines, parse_jsonl_lines, parse_qa_lines
+from .management.commands.pregenerate_audio import Command as PregenerateAudio
+from .models import BankChange, BankVersion, ExamAnswer, ExamAttempt, Question, QuestionStats, ReviewCard
+from .normalise import normalise_answer
+from .packs import PackStore, answer_hash, build_pack, pack_response, pack_salt
+from .progress import record_exam_attempt
+from .review import record_review, review_counts, sm2_schedule
+from .search import search_backend, search_questions
+from .synthetic import VARIANT_EVERY, generate_bank
+from .tts_backends import GTTSBackend, StubBackend
+from .views import _random_question
+
+
+class BankVersionTests(TestCase):
+    def setUp(self):
+        bank._cached = (None, 0.0)
+
+    @override_settings(BANK_VERSION_TTL=0)
+    def test_bump_in_another_process_is_seen(self):
+        version = bank.get_bank_version()
+        # what another worker's bump_bank_version() leaves behind
+        BankVersion.objects.filter(pk=1).update(version=version + 5)
+        self.assertEqual(bank.get_bank_version(), version + 5)
+
+    @override_settings(BANK_VERSION_TTL=60)
+    def test_read_at_most_once_per_ttl(self):
+        bank.get_bank_version()
+        with self.assertNumQueries(0):
+            bank.get_bank_version()
+
+    def test_bump_never_goes_backwards(self):
+        BankVersion.objects.update_or_create(pk=1, defaults={"version": 2 ** 62})
+        bank.bump_bank_version()
+        self.assertEqual(BankVersion.objects.get(pk=1).version, 2 ** 62 + 1)
+        self.assertEqual(bank.get_bank_version(), 2 ** 62 + 1)
+
+
+def make_questions(n, **fields):
+    """`n` Questions with distinct texts/answers (bulk, derived fields set)."""
+    fields.setdefault("category", "general")
+    fields.setdefault("topic", "history")
+    questions = []
+    for i in range(n):
+        q = Question(question_text=f"Test question {i}?", answer_text=f"Answer number {i}.", **fields)
+        q.update_derived_fields()
+        questions.append(q)
+    return Question.objects.bulk_create(questions)
+
+
+class McQuizStaleCountTests(TestCase):
+    def test_rows_deleted_behind_the_cached_total(self):
+        make_questions(50)
+        self.client.get("/quiz/general/")          # caches the facets (total 50)
+        # most of the mode goes; the version bump only lands on commit, so
+        # (as in another worker) the cached total still says 50
+        Question.objects.filter(id__in=list(Question.objects.order_by("id").values_list("id", flat=True)[:40])).delete()
+        for _ in range(30):
+            self.assertEqual(self.client.get("/quiz/general/").status_code, 200)
+
+    def test_random_question_of_an_emptied_set_is_none(self):
+        self.assertIsNone(_random_question(Question.objects.all(), 10))
+
+
+@override_settings(BANK_VERSION_TTL=0)
+class DistractorIndexTests(TestCase):
+    def setUp(self):
+        bank._cached = (None, 0.0)
+        invalidate_distractor_index()
+
+    def test_rebuilt_when_another_process_changes_the_bank(self):
+        make_questions(5)
+        first = get_distractor_index()
+        self.assertIs(get_distractor_index(), first)
+        # another worker adds a question and bumps the shared version; no
+        # signal runs in this process
+        Question.objects.create(question_text="Who built it?", answer_text="A brand new answer.")
+        BankVersion.objects.filter(pk=1).update(version=bank.get_bank_version() + 1)
+        index = get_distractor_index()
+        self.assertIsNot(index, first)
+        self.assertIn("A brand new answer.", [text for _, text in index.answers])
+
+
+class TTSSpeedTests(SimpleTestCase):
+    def test_gtts_renders_only_slow_or_normal(self):
+        backend = GTTSBackend()
+        self.assertEqual(backend.effective_speed(0.5), 0.5)
+        self.assertEqual(backend.effective_speed(0.7), 0.5)
+        for speed in (0.75, 1.0, 1.4, 3.0):
+            self.assertEqual(backend.effective_speed(speed), 1.0)
+
+    def test_continuous_backend_keeps_the_speed(self):
+        self.assertEqual(StubBackend().effective_speed(1.4), 1.4)
+
+    @override_settings(TTS_BACKEND="quiz.tts_backends.GTTSBackend")
+    def test_gtts_slider_positions_share_one_file(self):
+        calls = []
+
+        def synthesise(text, lang, tld, speed):
+            calls.append(speed)
+            return b"mp3"
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(TTS_CACHE_DIR=directory):
+            tts._backend, tts._cache = None, None
+            try:
+                tts.get_backend().synthesise = synthesise
+                etags = {
+                    self.client.get("/tts/", {"text": "Hello.", "speed": speed})["ETag"]
+                    for speed in ("1.00", "1.40", "2.50")
+                }
+            finally:
+                tts._backend, tts._cache = None, None
+        self.assertEqual(len(etags), 1)
+        self.assertEqual(calls, [1.0])
+
+
+@override_settings(TTS_BACKEND="quiz.tts_backends.StubBackend")
+class PregenerateQuestionAudioTests(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(TTS_CACHE_DIR=self.directory.name)
+        self.settings.enable()
+        tts._backend, tts._cache = None, None
+
+    def tearDown(self):
+        tts._backend, tts._cache = None, None
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_speaker_button_clips_are_pregenerated(self):
+        make_questions(6)
+        call_command("pregenerate_audio", "--questions", "--workers", "1", stdout=io.StringIO())
+
+        page = self.client.get("/quiz/general/").content.decode("utf-8")
+        parts = json.loads(re.search(r'<script id="qa-read-text" type="application/json">(.*?)</script>', page).group(1))
+        self.assertGreater(len(parts), 1)
+
+        def synthesise(*args):
+            raise AssertionError("not pregenerated")
+
+        tts.get_backend().synthesise = synthesise
+        # the question and its correct answer are always among the parts
+        question = Question.objects.get(question_text=parts[0])
+        for text in (parts[0], question.answer_text):
+            self.assertEqual(self.client.get("/tts/", {"text": text}).status_code, 200)
+
+    def test_section_clips_are_numbered_like_the_playlist(self):
+        for order, section in enumerate([" Tudors ", "tudors", "Stuarts", "  "]):
+            BookModeSession.objects.create(question_text=f"Q{order}", correct_answer="A", section=section, order_index=order)
+
+        items = PregenerateAudio().collect_items(sections=True, questions=False, speeds=[1.0])
+        section_texts = [text for item_id, text, _ in items if "@" in item_id]
+        expected = [
+            item.listen_text(position)
+            for section in ["tudors", "stuarts"]
+            for position, item in enumerate(listen_queryset(section), start=1)
+        ]
+        self.assertEqual(section_texts, expected)
+
+
+@override_settings(BANK_VERSION_TTL=0)
+class ExamPaperTests(TestCase):
+    def setUp(self):
+        bank._cached = (None, 0.0)
+        cache.clear()
+        invalidate_distractor_index()
+        make_questions(EXAM_QUESTION_COUNT * 2)
+
+    def shown_question_id(self, response):
+        return int(re.search(r'name="question_id" value="(\d+)"', response.content.decode("utf-8")).group(1))
+
+    def test_pack_and_score_round_trip(self):
+        paper = build_exam_paper(seed=7)
+        self.assertEqual(len(paper), EXAM_QUESTION_COUNT)
+        self.assertEqual(paper, build_exam_paper(seed=7))
+        answers = pack_answer(paper[0], paper[0]["answer_text"]) + pack_answer(paper[1], "not an option")
+        self.assertEqual(answer_code(answers, 1), NO_ANSWER)
+        correct, incorrect, review = score_exam(paper, answers)
+        # the 22 never answered are incorrect too
+        self.assertEqual((correct, incorrect), (1, EXAM_QUESTION_COUNT - 1))
+        self.assertTrue(review[0]["is_correct"])
+
+    def test_paper_is_pinned_when_the_bank_changes(self):
+        page = self.client.get("/exam/")
+        pinned = self.client.session["exam_ids"]
+        self.assertEqual(self.shown_question_id(page), pinned[0])
+
+        # an id off the paper goes (shifting every index position) and
+        # the cached paper is lost, as on another worker
+        Question.objects.exclude(id__in=pinned).order_by("id").first().delete()
+        Question.objects.filter(id=pinned[1]).delete()
+        cache.clear()
+        invalidate_distractor_index()
+
+        self.client.post("/exam/", {"check": "1", "choice": ""})
+        page = self.client.post("/exam/", {"next": "1"})
+        # slot 1 was deleted: skipped, not replaced by another question
+        self.assertEqual(self.shown_question_id(page), pinned[2])
+        self.assertEqual(self.client.session["exam_answers"], NO_ANSWER * 2)
+
+    def test_timeout_counts_unanswered_as_incorrect_on_both_sides(self):
+        page = self.client.get("/exam/")
+        paper = build_exam_paper(self.client.session["exam_seed"], self.client.session["exam_ids"])
+        self.client.post("/exam/", {"check": "1", "choice": paper[0]["answer_text"]})
+        self.client.post("/exam/", {"next": "1"})
+        self.client.post("/exam/", {"check": "1", "choice": paper[1]["answer_text"]})
+
+        later = time.time() + EXAM_DURATION_SECONDS + 60
+        with mock.patch("quiz.views.time.time", return_value=later):
+            page = self.client.post("/exam/", {"next": "1"})
+        self.assertTrue(page.context["finished"])
+        self.assertEqual((page.context["correct"], page.context["incorrect"]), (2, EXAM_QUESTION_COUNT - 2))
+        self.assertEqual(len(page.context["review"]), EXAM_QUESTION_COUNT)
+        attempt = ExamAttempt.objects.get()
+        self.assertEqual((attempt.correct, attempt.total), (2, EXAM_QUESTION_COUNT))
+
+    def test_rebuilt_options_score_the_same(self):
+        paper = build_exam_paper(seed=3)
+        wrong = next(c for c in paper[1]["choices"] if c != paper[1]["answer_text"])
+        answers = pack_answer(paper[0], paper[0]["answer_text"]) + pack_answer(paper[1], wrong)
+
+        # a rebuild after a bank edit: other distractors, another order
+        rebuilt = [dict(item, choices=[item["answer_text"], "Some new distractor."]) for item in paper]
+        rebuilt[1]["choices"].append(wrong)
+        self.assertEqual(score_exam(rebuilt, answers)[:2], score_exam(paper, answers)[:2])
+        self.assertEqual(score_exam(rebuilt, answers)[2][1]["your_answer"], wrong)
+
+    def test_removed_questions_are_not_recorded(self):
+        ids = list(Question.objects.order_by("id").values_list("id", flat=True)[:3])
+        Question.objects.filter(id=ids[1]).delete()
+        paper = build_exam_paper(1, ids)
+        self.assertTrue(paper[1]["removed"])
+
+        answers = pack_answer(paper[0], paper[0]["answer_text"]) + NO_ANSWER + NO_ANSWER
+        self.assertEqual(score_exam(paper, answers)[:2], (1, 1))
+        attempt = record_exam_attempt("learner", 1, paper, answers, started_at=timezone.now())
+        self.assertEqual((attempt.total, attempt.correct), (2, 1))
+        self.assertEqual(
+            list(ExamAnswer.objects.filter(attempt=attempt).values_list("position", flat=True).order_by("position")),
+            [0, 2],
+        )
+
+
+class BankChangeLogTests(TestCase):
+    def make_variant_groups(self, groups):
+        make_questions(groups)
+        variants = [
+            Question(question_text=f"{q.question_text} (Variant {n})", answer_text=q.answer_text)
+            for q in Question.objects.all() for n in (1, 2)
+        ]
+        Question.objects.bulk_create(variants)
+        return [q.id for q in variants]
+
+    def clean_variants_queries(self, groups):
+        variant_ids = self.make_variant_groups(groups)
+        since = latest_change_id()
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as queries:
+            clean_variants()
+        deleted = set(
+            BankChange.objects.filter(id__gt=since, op=BankChange.OP_DELETE).values_list("object_id", flat=True)
+        )
+        self.assertEqual(deleted, set(variant_ids))
+        # one invalidate + one version bump, however many rows went
+        self.assertEqual(len(callbacks), 2)
+        return len(queries)
+
+    def test_clean_variants_logs_deletes_in_one_write(self):
+        # 120 rows deleted; logging each on its own was 120 more INSERTs
+        self.assertLess(self.clean_variants_queries(60), 20)
+
+    def test_delta_reports_the_newest_change_per_question(self):
+        since = latest_change_id()
+        q = Question.objects.create(question_text="Where is Big Ben?", answer_text="London.")
+        q.answer_text = "In London."
+        q.save()
+        gone = Question.objects.create(question_text="Gone?", answer_text="Yes.")
+        gone_id = gone.id
+        gone.delete()
+
+        delta = changes_since(since, limit=100)
+        by_id = {change["id"]: change for change in delta["changes"]}
+        self.assertEqual(set(by_id), {q.id, gone_id})
+        self.assertEqual(by_id[q.id]["op"], BankChange.OP_UPSERT)
+        self.assertEqual(by_id[gone_id]["op"], BankChange.OP_DELETE)
+        self.assertEqual(delta["next"], latest_change_id())
+        self.assertFalse(delta["has_more"])
+
+
+class PackStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.builds = []
+
+        def build(name, version):
+            self.builds.append(version)
+            return {"version": version}
+
+        self.store = PackStore(self.directory.name, build, prune_after=600)
+
+    def age(self, name, version, seconds):
+        for path in self.store.ensure(name, version).values():
+            stat = path.stat()
+            os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+    def test_superseded_version_kept_for_the_grace_period(self):
+        old = self.store.ensure("all", 1)
+        self.store.ensure("all", 2)
+        # another worker still on version 1 can serve it
+        self.assertTrue(all(path.exists() for path in old.values()))
+
+    def test_superseded_version_pruned_after_the_grace_period(self):
+        old = self.store.ensure("all", 1)
+        self.age("all", 1, 3600)
+        self.store.ensure("all", 2)
+        self.age("all", 2, 3600)
+        current = self.store.ensure("all", 3)
+        self.assertFalse(any(path.exists() for path in old.values()))
+        self.assertTrue(all(path.exists() for path in current.values()))
+
+    def test_pruned_under_the_response_is_rebuilt(self):
+        with override_settings(BANK_VERSION_TTL=3600):
+            bank._cached = (5, float("inf"))
+            try:
+                version, paths = self.store.get_or_build("all")
+                real_get_or_build = self.store.get_or_build
+
+                def get_or_build_then_prune(name):
+                    result = real_get_or_build(name)
+                    for path in paths.values():
+                        path.unlink()
+                    return result
+
+                self.store.get_or_build = get_or_build_then_prune
+                request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+                response = pack_response(request, self.store, "all", "all.json")
+            finally:
+                bank._cached = (None, 0.0)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.builds, [5, 5])
+
+
+class AnswerEventBufferTests(SimpleTestCase):
+    @mock.patch("quiz.events.write_answer_events")
+    def test_flushed_on_time_without_another_answer(self, write):
+        buffer = AnswerEventBuffer(max_size=100, max_age=0.05)
+        buffer.record(1, "London.", True, "all")
+        deadline = time.monotonic() + 5
+        while not write.called and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(write.call_args.args[0]), 1)
+        self.assertEqual(len(buffer), 0)
+
+    @mock.patch("quiz.events.write_answer_events")
+    def test_flushed_when_full(self, write):
+        buffer = AnswerEventBuffer(max_size=3, max_age=60)
+        for _ in range(3):
+            buffer.record(1, "London.", True, "all")
+        self.assertEqual(len(write.call_args.args[0]), 3)
+        self.assertIsNone(buffer._timer)
+
+
+class MoveMostMissedTests(TestCase):
+    def test_only_the_selection_moves_and_is_logged(self):
+        questions = make_questions(4)
+        QuestionStats.objects.bulk_create(
+            QuestionStats(question=q, attempts=20, correct=2, error_rate=0.9) for q in questions
+        )
+        staff = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+        self.client.force_login(staff)
+
+        selected = [questions[0].id, questions[1].id]
+        self.client.post("/admin/quiz/question/", {
+            "action": "move_most_missed_to_hardest", "_selected_action": selected,
+        })
+        self.assertEqual(
+            sorted(Question.objects.filter(category="hardest").values_list("id", flat=True)), selected,
+        )
+        entries = LogEntry.objects.filter(object_id__in=[str(q_id) for q_id in selected])
+        self.assertEqual(entries.count(), 2)
+        self.assertIn("category was 'general'", entries.first().get_change_message())
+
+
+class ReviewSchedulerTests(TestCase):
+    def test_sm2_intervals_and_lapse(self):
+        now = timezone.now()
+        card = ReviewCard(ease=2.5)
+        for expected in (1.0, 6.0, 15.0):
+            sm2_schedule(card, 4, now)
+            self.assertEqual(card.interval_days, expected)
+        sm2_schedule(card, 1, now)
+        self.assertEqual((card.repetitions, card.lapses, card.interval_days), (0, 1, 0.0))
+        self.assertGreaterEqual(card.ease, 1.3)
+
+    def test_repeat_answers_share_one_card(self):
+        question = Question.objects.get(pk=make_questions(1)[0].pk)
+        record_review("s:one", question, is_correct=True)
+        card = record_review("s:one", question, is_correct=True)
+        self.assertEqual(ReviewCard.objects.filter(learner_key="s:one").count(), 1)
+        self.assertEqual(card.repetitions, 2)
+        self.assertEqual(review_counts("s:one", now=card.last_reviewed_at), (0, 1))
+
+    def test_counts_without_counting_every_card(self):
+        for question in Question.objects.filter(id__in=[q.id for q in make_questions(3)]):
+            record_review("s:two", question, is_correct=False)
+        with self.assertNumQueries(2):
+            due, cards = review_counts("s:two", now=timezone.now() + timedelta(hours=1))
+        self.assertEqual((due, cards), (3, 3))
+
+
+class CheckAnswerApiTests(TestCase):
+    def post(self, body):
+        return self.client.post("/api/quiz/check", json.dumps(body), content_type="application/json")
+
+    def test_bad_bodies_are_400(self):
+        q_id = make_questions(1)[0].id
+        for body in (
+            [q_id, "London."],
+            "London.",
+            {"question_id": [q_id]},
+            {"question_id": True},
+            {"question_id": q_id, "choice": ["London."]},
+            {"question_id": q_id, "choice": "London.", "mode": {"all": 1}},
+            {"question_id": q_id, "choice": "London.", "mode": "x" * 500},
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(self.post(body).status_code, 400)
+
+    def test_answer_checked_and_counted(self):
+        question = Question.objects.get(pk=make_questions(1)[0].pk)
+        response = self.post({"question_id": question.id, "choice": question.answer_text.upper(), "mode": "general"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["correct"])
+        self.assertEqual(self.client.session["mc_correct_general"], 1)
+
+
+@override_settings(BANK_VERSION_TTL=0)
+class TemplatePageTests(TestCase):
+    def test_menu_etag_ignores_bank_changes(self):
+        etag = self.client.get("/practice/")["ETag"]
+        bank.bump_bank_version()
+        response = self.client.get("/practice/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+
+class SyntheticBankTests(TestCase):
+    def test_size_and_variant_groups(self):
+        generate_bank(VARIANT_EVERY * 4)
+        self.assertEqual(Question.objects.count(), VARIANT_EVERY * 4)
+        plan = plan_variant_cleanup()
+        self.assertEqual(plan.groups, 4)
+        # every other group has no clean base row, so a variant gets renamed
+        self.assertEqual(len(plan.renames), 2)
+
+    def test_replace_uses_the_public_delete_path(self):
+        generate_bank(120)
+        record_review("s:one", Question.objects.first(), is_correct=True)
+        result = generate_bank(80, seed=1, replace=True)
+        self.assertEqual((result.removed, Question.objects.count()), (120, 80))
+        self.assertFalse(ReviewCard.objects.exists())
+
+    @mock.patch("builtins.input", return_value="no")
+    def test_command_asks_before_writing(self, _input):
+        out = io.StringIO()
+        call_command("generate_bank", "50", "--replace", "--no-bookmode", stdout=out)
+        self.assertIn("cancelled", out.getvalue())
+        self.assertFalse(Question.objects.exists())
+
+        call_command("generate_bank", "50", "--noinput", "--no-bookmode", stdout=out)
+        self.assertEqual(Question.objects.count(), 50)
+
+
+class ImportTests(TestCase):
+    def upload(self, name, body):
+        return SimpleUploadedFile(name, body.encode("utf-8"), content_type="text/plain")
+
+    def test_parsers_agree(self):
+        qa = ["Q: When was the Magna Carta signed?", "A: 1215.", "", "question: Who wrote Hamlet?", "answer: William", "Shakespeare."]
+        csv_lines = ["answer,question", "1215.,When was the Magna Carta signed?"]
+        jsonl = ['{"q": "When was the Magna Carta signed?", "a": "1215."}', "not json", ""]
+        self.assertEqual(list(parse_qa_lines(qa)), [
+            ("When was the Magna Carta signed?", "1215."),
+            ("Who wrote Hamlet?", "William\nShakespeare."),
+        ])
+        self.assertEqual(list(parse_csv_lines(csv_lines)), [("When was the Magna Carta signed?", "1215.")])
+        self.assertEqual(list(parse_jsonl_lines(jsonl)), [("When was the Magna Carta signed?", "1215.")])
+
+    def test_reimport_matches_on_the_normalised_question(self):
+        first = import_questions([("Where is Big Ben?", "London.")], "geography", "general", "Landmarks")
+        again = import_questions([("where is  Big Ben?.", "London.")], "geography", "general", "Landmarks")
+        changed = import_questions([("Where is Big Ben?", "In London.")], "geography", "general", "Landmarks")
+        self.assertEqual((first.created, again.created, again.updated), (1, 0, 1))
+        self.assertEqual((changed.created, changed.updated), (0, 1))
+        q = Question.objects.get()
+        self.assertEqual((q.question_text, q.answer_norm), ("Where is Big Ben?", "in london"))
+        self.assertEqual(import_questions([("Where is Big Ben?", "In London.")], "geography", "general", "Landmarks").unchanged, 1)
+
+    def test_zip_upload_uses_each_members_name_and_parser(self):
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("stone_age.txt", "Q: What came before bronze?\nA: Stone.")
+            zf.writestr("iron_age.csv", "question,answer\nWhat came after bronze?,Iron.")
+            zf.writestr("notes.pdf", "%PDF")
+            zf.writestr("__MACOSX/._stone_age.txt", "junk")
+        upload = SimpleUploadedFile("ages.zip", archive.getvalue(), content_type="application/zip")
+
+        result = import_uploads([upload, self.upload("roman_britain.jsonl", '{"q": "Who built the wall?", "a": "Hadrian."}')], "history", "general")
+        self.assertEqual((result.files, result.created, result.skipped_files), (3, 3, ["notes.pdf"]))
+        self.assertEqual(
+            set(Question.objects.values_list("subcategory", flat=True)),
+            {"Stone Age", "Iron Age", "Roman Britain"},
+        )
+
+    def test_a_failing_file_rolls_back_the_whole_upload(self):
+        broken = self.upload("broken.txt", "Q: Half imported?\nA: No.")
+        with mock.patch("quiz.importers.subcategory_from_filename", side_effect=["Fine", RuntimeError("boom")]):
+            with self.assertRaises(RuntimeError):
+                import_uploads([self.upload("fine.txt", "Q: Kept?\nA: No."), broken], "other", "general")
+        self.assertFalse(Question.objects.exists())
+
+
+class OfflineAnswerHashTests(TestCase):
+    def test_hash_is_of_the_normalised_answer(self):
+        salt = pack_salt()
+        self.assertEqual(answer_hash(salt, " TRUE! "), answer_hash(salt, "true"))
+        self.assertEqual(
+            answer_hash(salt, "1215."),
+            hashlib.sha256((salt + normalise_answer("1215.")).encode("utf-8")).hexdigest(),
+        )
+        self.assertNotEqual(answer_hash(salt, "1215."), answer_hash(salt, "1216."))
+
+    def test_salt_follows_the_secret_key(self):
+        salt = pack_salt()
+        self.assertEqual(pack_salt(), salt)
+        with override_settings(SECRET_KEY="another-secret-key-for-the-test"):
+            self.assertNotEqual(pack_salt(), salt)
+
+    def test_pack_and_delta_hashes_match(self):
+        since = latest_change_id()
+        q = Question.objects.create(question_text="Where is Big Ben?", answer_text="London.", category="general", topic="geography")
+        pack = build_pack("all", version=1)
+        delta = changes_since(since, limit=100)
+
+        packed = next(item for item in pack["questions"] if item["id"] == q.id)
+        changed = next(change for change in delta["changes"] if change["id"] == q.id)
+        self.assertEqual(pack["salt"], pack_salt())
+        self.assertEqual(packed["answer_hash"], changed["data"]["answer_hash"])
+        self.assertEqual(packed["answer_hash"], answer_hash(pack["salt"], "london"))
+
+
+class SearchTests(TestCase):
+    def ids(self, query, **kwargs):
+        return list(search_questions(query, **kwargs).values_list("id", flat=True))
+
+    def test_index_follows_create_update_and_delete(self):
+        if connection.vendor == "sqlite":
+            # what the migrations left on quiz_question (0019 once lost these)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'quiz_question'")
+                triggers = {row[0] for row in cursor.fetchall()}
+            if search_backend() == "sqlite_fts":
+                self.assertEqual(triggers, {"quiz_question_fts_ai", "quiz_question_fts_ad", "quiz_question_fts_au"})
+
+        q = Question.objects.create(question_text="Who is Zebedee?", answer_text="A spring.")
+        self.assertEqual(self.ids("zebedee"), [q.id])
+
+        q.question_text = "Who is Dougal?"
+        q.save()
+        self.assertEqual(self.ids("zebedee"), [])
+        self.assertEqual(self.ids("dougal"), [q.id])
+
+        Question.objects.filter(id=q.id).update(subcategory="Magic Roundabout")
+        self.assertEqual(self.ids("roundabout"), [q.id])
+
+        q.delete()
+        self.assertEqual(self.ids("dougal"), [])
+        if search_backend() == "sqlite_fts":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT count(*) FROM quiz_question_fts WHERE quiz_question_fts MATCH 'dougal'")
+                self.assertEqual(cursor.fetchone()[0], 0)   # no ghost entry
+
+    def test_every_word_matches_as_a_prefix(self):
+        both = Question.objects.create(question_text="When did the Tudor Parliament meet?", answer_text="1529.")
+        reordered = Question.objects.create(question_text="Which Parliament did the Tudors call?", answer_text="The Reformation Parliament.")
+        one = Question.objects.create(question_text="Name a Tudor castle.", answer_text="Deal Castle.")
+        answer_only = Question.objects.create(question_text="Who led the country?", answer_text="A Tudor king in Parliament.")
+
+        self.assertEqual(set(self.ids("tud parl")), {both.id, reordered.id, answer_only.id})
+        self.assertEqual(set(self.ids("tudor")), {both.id, reordered.id, one.id, answer_only.id})
+        self.assertEqual(self.ids("tudor spaceship"), [])
+        # blank or punctuation-only queries don't filter
+        self.assertEqual(search_questions("  ?! ").count(), 4)
+        # question text outranks the answer
+        self.assertEqual(self.ids("tudor parliament", ranked=True)[-1], answer_only.id)
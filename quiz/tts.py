@@ -0,0 +1,222 @@
+# quiz/tts.py
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils.module_loading import import_string
+
+from .tts_backends import TTSError  # noqa: F401  (re-exported for views)
+
+
+DEFAULT_LANG = "en"
+DEFAULT_TLD = "co.uk"     # British English
+DEFAULT_SPEED = 1.0
+MIN_SPEED = 0.5
+MAX_SPEED = 3.0
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_speed(value) -> float:
+    """Clamp the ?speed= parameter to what the listening slider can send."""
+    try:
+        speed = float(value)
+    except (TypeError, ValueError):
+        return DEFAULT_SPEED
+    return round(min(max(speed, MIN_SPEED), MAX_SPEED), 2)
+
+
+def read_aloud_text(text) -> str:
+    """One sentence as the 🔊 buttons and pregenerate_audio send it (whitespace collapsed)."""
+    return " ".join(str(text or "").split())
+
+
+def read_aloud_parts(question_text, choices=()) -> list:
+    """
+    What the 🔊 button on a question page reads, one clip per part:
+    the question, then each option. Every part is a question or answer
+    text on its own, so `pregenerate_audio --questions` can have it
+    cached whatever order the options were shuffled into.
+    """
+    parts = [read_aloud_text(question_text)] + [read_aloud_text(c) for c in choices]
+    return [p for p in parts if p]
+
+
+_backend = None
+
+
+def get_backend():
+    """The TTS backend named by settings.TTS_BACKEND (one instance per process)."""
+    global _backend
+    if _backend is None:
+        _backend = import_string(settings.TTS_BACKEND)()
+    return _backend
+
+
+# ----------------- ON-DISK AUDIO CACHE -----------------
+
+class TTSCache:
+    """
+    Content-addressed audio cache.
+
+      - one file per sha256(backend, text, lang, tld, speed), sharded by prefix
+      - writes go to a temp file in the same directory, then os.replace()
+      - file mtime doubles as "last used"; the oldest files are evicted
+        once the directory grows past max_bytes
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size = None       # approximate bytes on disk, scanned lazily
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(backend_name, text, lang, tld, speed) -> str:
+        raw = "\x1f".join([backend_name, text, lang, tld, f"{speed:.2f}"])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def path_for(self, key, suffix) -> Path:
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    def get(self, key, suffix):
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)      # mark as recently used
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key, suffix, data: bytes) -> Path:
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._evict()
+        return path
+
+    def get_or_create(self, key, suffix, make_audio):
+        """Return the cached file for `key`, calling make_audio() only on a miss."""
+        path = self.get(key, suffix)
+        if path is None:
+            path = self.put(key, suffix, make_audio())
+        return path
+
+    def _files(self):
+        return [
+            p for p in self.directory.glob("*/*")
+            if p.is_file() and p.suffix != ".tmp"
+        ]
+
+    def _scan_size(self) -> int:
+        return sum(p.stat().st_size for p in self._files())
+
+    def _evict(self):
+        # least recently used first; stop at 90% so we don't evict on every write
+        entries = []
+        for p in self._files():
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, p in entries:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
+
+
+_cache = None
+
+
+def get_tts_cache() -> TTSCache:
+    global _cache
+    if _cache is None:
+        _cache = TTSCache(settings.TTS_CACHE_DIR, settings.TTS_CACHE_MAX_BYTES)
+    return _cache
+
+
+# ----------------- RESPONSES -----------------
+
+def audio_response(request, path, etag, content_type="audio/mpeg"):
+    """
+    Serve a cached audio file:
+      - 304 when If-None-Match matches the (strong) ETag
+      - 206 for a single "Range: bytes=a-b" request (seeking / Safari)
+      - otherwise a FileResponse, which the server can sendfile()
+    """
+    etag = f'"{etag}"'
+
+    def add_headers(response):
+        response["ETag"] = etag
+        response["Cache-Control"] = CACHE_CONTROL
+        response["Accept-Ranges"] = "bytes"
+        return response
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [t.strip() for t in if_none_match.split(",")] or if_none_match.strip() == "*":
+        return add_headers(HttpResponseNotModified())
+
+    size = os.path.getsize(path)
+    range_header = request.headers.get("Range")
+    if range_header:
+        m = _RANGE_RE.match(range_header.strip())
+        start = end = None
+        if m and (m.group(1) or m.group(2)):
+            if m.group(1):
+                start = int(m.group(1))
+                end = min(int(m.group(2)), size - 1) if m.group(2) else size - 1
+            else:
+                # suffix range: the last N bytes
+                start = max(size - int(m.group(2)), 0)
+                end = size - 1
+
+        if start is None or start > end or start >= size:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return add_headers(response)
+
+        with open(path, "rb") as fh:
+            fh.seek(start)
+            chunk = fh.read(end - start + 1)
+        response = HttpResponse(chunk, status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        return add_headers(response)
+
+    response = FileResponse(open(path, "rb"), content_type=content_type)
+    response["Content-Disposition"] = f'inline; filename="tts{Path(path).suffix}"'
+    return add_headers(response)
@@ -0,0 +1,144 @@
+# quiz/tts_backends.py
+
+import hashlib
+import math
+import shutil
+import struct
+import subprocess
+import wave
+from io import BytesIO
+
+from django.conf import settings
+
+
+class TTSError(Exception):
+    """Raised when a backend can't produce audio for some text."""
+
+
+class TTSBackend:
+    """
+    Turns text into audio bytes.
+
+    Subclasses set `name` (part of the cache key, so switching backend
+    never serves another engine's audio), `content_type` and `suffix`.
+    `speed` is a playback-rate multiplier: 1.0 normal, 0.5 half speed.
+
+    Engines that only have a few speeds list them in `speed_steps`; a
+    request is rendered at the nearest one (effective_speed) and the
+    player makes up the rest with audio.playbackRate.
+    """
+
+    name = "base"
+    content_type = "application/octet-stream"
+    suffix = ".bin"
+    speed_steps = None      # None: any speed
+
+    def effective_speed(self, speed: float) -> float:
+        """The speed the audio for `speed` is actually rendered at (ties go up)."""
+        if not self.speed_steps:
+            return speed
+        return min(self.speed_steps, key=lambda step: (abs(step - speed), -step))
+
+    def synthesise(self, text: str, lang: str, tld: str, speed: float) -> bytes:
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """
+    Google Translate TTS (network call per synthesis).
+    gTTS only has normal and slow, so speed < 0.75 selects slow mode.
+    """
+
+    name = "gtts"
+    content_type = "audio/mpeg"
+    suffix = ".mp3"
+    speed_steps = (0.5, 1.0)
+
+    def synthesise(self, text, lang, tld, speed):
+        from gtts import gTTS, gTTSError
+
+        buf = BytesIO()
+        try:
+            gTTS(text=text, lang=lang, tld=tld, slow=self.effective_speed(speed) < 1.0).write_to_fp(buf)
+        except gTTSError as exc:
+            raise TTSError(str(exc)) from exc
+        return buf.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """
+    Offline synthesis with espeak-ng (or espeak) run as a subprocess.
+    Produces WAV; speed is mapped straight onto words-per-minute.
+    """
+
+    name = "espeak"
+    content_type = "audio/wav"
+    suffix = ".wav"
+
+    base_wpm = 175
+    timeout = 30
+
+    def __init__(self):
+        self.binary = getattr(settings, "TTS_ESPEAK_BINARY", None) or (
+            shutil.which("espeak-ng") or shutil.which("espeak") or "espeak-ng"
+        )
+
+    def voice_for(self, lang, tld):
+        if lang == "en":
+            return "en-gb" if tld == "co.uk" else "en-us"
+        return lang
+
+    def synthesise(self, text, lang, tld, speed):
+        cmd = [
+            self.binary,
+            "-v", self.voice_for(lang, tld),
+            "-s", str(int(self.base_wpm * speed)),
+            "--stdin",
+            "--stdout",
+        ]
+        try:
+            proc = subprocess.run(
+                cmd,
+                input=text.encode("utf-8"),
+                capture_output=True,
+                timeout=self.timeout,
+                check=True,
+            )
+        except (OSError, subprocess.SubprocessError) as exc:
+            raise TTSError(f"{self.binary} failed: {exc}") from exc
+        return proc.stdout
+
+
+class StubBackend(TTSBackend):
+    """
+    Deterministic, dependency-free backend for tests and benchmarks.
+    Returns a short WAV tone whose pitch comes from the text hash and
+    whose length scales with the text and speed.
+    """
+
+    name = "stub"
+    content_type = "audio/wav"
+    suffix = ".wav"
+
+    sample_rate = 8000
+
+    def synthesise(self, text, lang, tld, speed):
+        digest = hashlib.sha256(f"{lang}|{tld}|{text}".encode("utf-8")).digest()
+        freq = 220 + digest[0] * 2
+        seconds = min(0.02 * len(text) / speed, 5.0)
+        n = int(self.sample_rate * seconds)
+
+        # one period of the tone, repeated
+        period = self.sample_rate // freq
+        wave_period = b"".join(
+            struct.pack("<h", int(8000 * math.sin(2 * math.pi * i / period)))
+            for i in range(period)
+        )
+        frames = (wave_period * (n // period + 1))[:n * 2]
+        buf = BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(frames)
+        return buf.getvalue()
@@ -7,9 +7,17 @@ urlpatterns = [
 
     path('practice/', views.practice_menu, name='practice_menu'),
     path('upload/', views.upload_questions, name='quiz_upload'),
+    path('quiz/review/', views.review_quiz, name='quiz_review'),
     path('quiz/<str:mode>/', views.mc_quiz, name='quiz_mc'),
     path("exam/", views.exam_quiz, name="exam_quiz"),
+    path("exam/progress/", views.exam_progress, name="exam_progress"),
     path("tts/", views.tts_view, name="tts_view"),
+    path("api/quiz/check", views.api_check_answer, name="api_quiz_check"),
+    path("api/quiz/<str:mode>/next", views.api_next_questions, name="api_quiz_next"),
+    path("api/quiz/<str:mode>/facets", views.api_quiz_facets, name="api_quiz_facets"),
+    path("api/packs/<str:mode>.json", views.api_offline_pack, name="api_offline_pack"),
+    path("api/bank/changes", views.api_bank_changes, name="api_bank_changes"),
+    path("offline/precache.json", views.offline_precache, name="offline_precache"),
     path('quiz/book_based/', include('bookmode.urls')),
     # path("exam/", views.exam_mode, name="exam_quiz"),
     # path('drill/<str:category>/', views.drill_quiz, name='quiz_drill'),
@@ -1,84 +1,106 @@
 # quiz/views.py
 
-import os
+import json
 import random
-import re
-import string
+import time
+from datetime import datetime, timezone as dt_timezone
 
 from django.shortcuts import render, redirect
+from django.templatetags.static import static
+from django.urls import reverse
 from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
-from django.db.models import Q
 from .models import Question
+from .choices import build_choices_with_seed
+from .normalise import normalise_answer
+from .queries import questions_for_mode
+from .search import search_questions
+from .facets import count_for, get_question_facets
 from .forms import UploadFileForm
-from django.http import FileResponse, HttpResponseBadRequest
-from tempfile import NamedTemporaryFile
-from gtts import gTTS
-
-# ----------------- GLOBAL EXAM SETTINGS -----------------
-
-EXAM_QUESTION_COUNT = 24          # questions per exam
-EXAM_DURATION_SECONDS = 45 * 60  # 45 minutes
-
+from .importers import import_uploads
+from .exam import (
+    ANSWER_WIDTH,
+    EXAM_DURATION_SECONDS,
+    EXAM_PASS_MARK,
+    answer_code,
+    answered_count,
+    exam_question_ids,
+    get_exam_paper,
+    is_answer_correct,
+    new_exam_seed,
+    pack_answer,
+    score_exam,
+    skip_removed,
+    unpack_answer,
+)
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_GET, require_POST
+from .bank import get_bank_version
+from .changes import changes_since
+from .conditional import template_page
+from .events import record_answer
+from .learners import get_learner_key
+from .review import next_review_question, record_review, review_counts
+from .progress import progress_summary, record_exam_attempt
+from . import packs, tts
+
+
+def _read_question_filters(request):
+    """(sub, topic, search query) from the querystring, blanks -> None."""
+    current_sub = (request.GET.get("sub") or "").strip() or None
+    current_topic = (request.GET.get("topic") or "").strip() or None
+    search_query = (request.GET.get("q") or "").strip() or None
+    return current_sub, current_topic, search_query
 
-# ----------------- HELPER: NORMALISE ANSWERS -----------------
 
-def normalise_answer(value: str) -> str:
+def _filter_questions(mode, current_sub=None, current_topic=None, search_query=None):
     """
-    Normalise answers for comparison:
-      - handle None safely
-      - strip spaces
-      - lowercase
-      - strip punctuation at both ends
-    So:
-      'True.'  ' TRUE! '  'true??'  all become 'true'
+    The mode's questions narrowed by the mc_quiz filters.
+    Returns (queryset, facets, total); total comes from the cached facets
+    unless there is a search.
     """
-    if not value:
-        return ""
-    return value.strip().lower().strip(string.punctuation)
+    # subcategory / topic dropdowns with counts (based only on mode, not search);
+    # cached per bank version, so no queries here on a normal render
+    facets = get_question_facets(mode)
+
+    qs = questions_for_mode(mode)
+    if current_sub:
+        qs = qs.filter(subcategory=current_sub)
+    if current_topic:
+        qs = qs.filter(topic=current_topic)
+    if search_query:
+        qs = search_questions(search_query, qs)
 
+    if search_query:
+        total = qs.count()
+    else:
+        total = count_for(facets, current_sub, current_topic)
+    return qs, facets, total
 
-# ----------------- HELPER: QUESTION POOL BY MODE -----------------
 
-def _get_question_queryset_for_mode(mode: str):
+def _random_question(qs, total):
     """
-    Interpret `mode` flexibly:
-
-      - "all"      -> all questions
-      - "practice"  -> mixed realistic practice (general + common + hardest)
-      - category key -> filter by category (general / hardest / cheatsheet / common)
-      - topic key    -> filter by topic (history / government / culture / geography / other)
+    One random row of `qs` without loading them all, or None if it's empty.
+    `total` comes from the cached facets and can be behind the table (rows
+    deleted by another process since); an offset past the end falls back
+    to a live count.
     """
-    mode = (mode or "").strip().lower()
-
-    # 1. ALL QUESTIONS
-    if mode == "all":
-        return Question.objects.all()
-
-    # 2. PRACTICE MIX
-    if mode == "practice":
-        return Question.objects.filter(
-            category__in=["general", "common", "hardest"]
-            # add "cheatsheet" if you want them included as well:
-            # category__in=["general", "common", "hardest", "cheatsheet"]
-        )
-
-    # 3. CATEGORY (matches CATEGORY_CHOICES keys)
-    category_keys = {key for key, _ in Question.CATEGORY_CHOICES}
-    if mode in category_keys:
-        return Question.objects.filter(category=mode)
-
-    # 4. TOPIC (matches TOPIC_CHOICES keys)
-    topic_keys = {key for key, _ in Question.TOPIC_CHOICES}
-    if mode in topic_keys:
-        return Question.objects.filter(topic=mode)
-
-    # 5. Unknown -> empty queryset
-    return Question.objects.none()
+    for _ in range(3):
+        if total > 0:
+            try:
+                return qs.order_by("id")[random.randrange(total)]
+            except IndexError:
+                pass
+        total = qs.count()
+        if total == 0:
+            return None
+    return qs.order_by("id").first()
 
 
 # ----------------- SIMPLE MENU -----------------
 
+@template_page()
 def practice_menu(request):
     return render(request, "quiz/practice_menu.html", {})
 
@@ -88,93 +110,31 @@ def practice_menu(request):
 @user_passes_test(lambda u: u.is_authenticated and u.is_staff)
 def upload_questions(request):
     """
-    Upload a plain text file containing Q&A blocks.
+    Upload one or more Q&A files (or a .zip of them).
+
+    Accepted formats (picked by file extension):
+
+    .txt / .md - Q&A blocks:
+        Q: When was the Magna Carta signed?
+        A: 1215.
 
-    Accepted formats (all OK):
+        question: When was the Magna Carta signed?
+        answer: 1215.
 
-    Q: When was the Magna Carta signed?
-    A: 1215.
+    .csv   - question,answer columns (header row optional)
+    .jsonl - {"question": "...", "answer": "..."} per line
 
-    question: When was the Magna Carta signed?
-    answer: 1215.
+    Each file's subcategory comes from its filename.
     """
     if request.method == "POST":
         form = UploadFileForm(request.POST, request.FILES)
         if form.is_valid():
-            topic = form.cleaned_data["topic"]
-            category = form.cleaned_data["category"]
-            file_obj = request.FILES["file"]
-            content = file_obj.read().decode("utf-8", errors="ignore")
-
-            # Derive subcategory from filename
-            filename = file_obj.name
-            base, _ = os.path.splitext(filename)
-            subcategory = base.replace("_", " ").title().strip()
-
-            parsed = 0
-            created = 0
-            updated = 0
-            current_q = None
-            current_a = None
-
-            def save_pair(q_text, a_text):
-                nonlocal parsed, created, updated
-                if not q_text or not a_text:
-                    return
-                parsed += 1
-                q_clean = q_text.strip()
-                a_clean = a_text.strip()
-
-                obj, was_created = Question.objects.update_or_create(
-                    # question text as the unique-ish key (case-insensitive)
-                    question_text__iexact=q_clean,
-                    defaults={
-                        "question_text": q_clean,
-                        "answer_text": a_clean,
-                        "topic": topic,
-                        "category": category,
-                        "subcategory": subcategory,
-                    },
-                )
-                if was_created:
-                    created += 1
-                else:
-                    updated += 1
-
-            # Accept: "Q:", "question:", "A:", "answer:" (any case, optional spaces)
-            q_pattern = re.compile(r"^\s*(question|q)\s*:", re.IGNORECASE)
-            a_pattern = re.compile(r"^\s*(answer|a)\s*:", re.IGNORECASE)
-
-            for raw_line in content.splitlines():
-                line = raw_line.strip()
-                if not line:
-                    continue
-
-                if q_pattern.match(line):
-                    # save previous pair
-                    if current_q and current_a:
-                        save_pair(current_q, current_a)
-                    current_q = line.split(":", 1)[1].strip()
-                    current_a = None
-
-                elif a_pattern.match(line):
-                    current_a = line.split(":", 1)[1].strip()
-
-                else:
-                    # continuation lines
-                    if current_a is not None:
-                        current_a += "\n" + line
-                    elif current_q is not None:
-                        current_q += "\n" + line
-
-            # flush last pair
-            if current_q and current_a:
-                save_pair(current_q, current_a)
-
-            messages.success(
-                request,
-                f"Parsed {parsed} Q/A pairs. Created {created}, updated {updated}."
+            result = import_uploads(
+                form.cleaned_data["file"],
+                form.cleaned_data["topic"],
+                form.cleaned_data["category"],
             )
+            messages.success(request, result.summary())
             return redirect("practice_menu")
     else:
         form = UploadFileForm()
@@ -196,36 +156,9 @@ def mc_quiz(request, mode):
     """
 
     # --- read filters from querystring ---
-    current_sub = (request.GET.get("sub") or "").strip() or None
-    current_topic = (request.GET.get("topic") or "").strip() or None
-    search_query = (request.GET.get("q") or "").strip() or None
-
-    # --- base queryset for this mode ---
-    base_qs = _get_question_queryset_for_mode(mode)
+    current_sub, current_topic, search_query = _read_question_filters(request)
+    qs, facets, total = _filter_questions(mode, current_sub, current_topic, search_query)
 
-    # subcategory list for dropdown (based only on mode, not search)
-    subcategories = (
-        base_qs.exclude(subcategory__isnull=True)
-              .exclude(subcategory__exact="")
-              .values_list("subcategory", flat=True)
-              .distinct()
-              .order_by("subcategory")
-    )
-
-    # apply filters
-    qs = base_qs
-    if current_sub:
-        qs = qs.filter(subcategory=current_sub)
-    if current_topic:
-        qs = qs.filter(topic=current_topic)
-    if search_query:
-        qs = qs.filter(
-            Q(question_text__icontains=search_query) |
-            Q(answer_text__icontains=search_query) |
-            Q(subcategory__icontains=search_query)
-        )
-
-    total = qs.count()
     question = None
     choices = []
     selected = None
@@ -249,139 +182,15 @@ def mc_quiz(request, mode):
             request.session.modified = True
         return redirect("quiz_mc", mode=mode)
 
-    # ------------ SMART CHOICE BUILDER ------------
-
-    def build_choices_with_seed(q, seed_value: int):
-        """
-        Smarter multiple-choice options:
-
-        - True/False questions -> only 'True' and 'False'
-        - Year / date-style answers -> other year/date-style distractors
-        - Other answers -> text distractors of similar length
-        """
-        rng = random.Random(seed_value)
-        correct_raw = (q.answer_text or "").strip()
-        question_text = (q.question_text or "").strip()
-        norm_answer = correct_raw.lower().strip(" .!?")
-
-        # -------- helpers --------
-        def is_true_false_question() -> bool:
-            qt = question_text.lower()
-            return qt.startswith("true or false") or norm_answer in ("true", "false")
-
-        # match things like 1066, 1415, 1450s, 2010s
-        year_match = re.search(r"(1[0-9]{3}|20[0-9]{2})s?", correct_raw)
-        year_num = int(year_match.group(1)) if year_match else None
-
-        # -------- TRUE / FALSE --------
-        if is_true_false_question():
-            options = ["True", "False"]
-            # safer: only treat exact 'true' as True
-            correct_clean = "True" if norm_answer == "true" else "False"
-            if correct_clean not in options:
-                options.append(correct_clean)
-            rng.shuffle(options)
-            return options
-
-        # -------- YEAR / DATE-STYLE ANSWERS --------
-        if year_num is not None:
-            # keep the wording pattern, e.g. "In the 1450s."
-            prefix = correct_raw[:year_match.start()]
-            suffix = correct_raw[year_match.end():]
-            has_s = "s" in year_match.group(0)
-
-            # collect other year values from DB
-            other_years = set()
-            for obj in Question.objects.exclude(id=q.id):
-                a = (obj.answer_text or "")
-                m2 = re.search(r"(1[0-9]{3}|20[0-9]{2})s?", a)
-                if m2:
-                    other_years.add(int(m2.group(1)))
-
-            other_years.discard(year_num)
-            other_years = list(other_years)
-            rng.shuffle(other_years)
-
-            distract_years = [y for y in other_years[:3]]
-
-            # if we don't have enough, synthesise nearby years
-            while len(distract_years) < 3:
-                delta = rng.choice([-10, -5, -1, 1, 5, 10])
-                y = year_num + delta
-                if 1000 <= y <= 2099 and y not in distract_years and y != year_num:
-                    distract_years.append(y)
-
-            def make_phrase(y: int) -> str:
-                y_str = f"{y}{'s' if has_s else ''}"
-                return f"{prefix}{y_str}{suffix}"
-
-            options = [make_phrase(year_num)] + [make_phrase(y) for y in distract_years[:3]]
-            rng.shuffle(options)
-            return options
-
-        # -------- GENERAL TEXT ANSWERS --------
-        correct = correct_raw
-        pool = list(Question.objects.exclude(id=q.id))
-        candidates = []
-
-        for obj in pool:
-            text = (obj.answer_text or "").strip()
-            if text and text != correct:
-                candidates.append(text)
-
-        # sort by similar length
-        candidates = sorted(
-            candidates,
-            key=lambda t: abs(len(t) - len(correct))
-        )
-
-        near = candidates[:20]
-        rng.shuffle(near)
-        distractors = []
-
-        for d in near:
-            d = d.strip()
-            if d and d not in distractors and d != correct:
-                distractors.append(d)
-            if len(distractors) == 3:
-                break
-
-        # pad if still short
-        extra_pool = [
-            (obj.answer_text or "").strip()
-            for obj in pool
-            if (obj.answer_text or "").strip() not in distractors
-            and (obj.answer_text or "").strip() != correct
-        ]
-        rng.shuffle(extra_pool)
-        for d in extra_pool:
-            distractors.append(d)
-            if len(distractors) == 3:
-                break
-
-        # final options
-        options = [correct] + distractors[:3]
-        # de-duplicate while preserving order
-        seen = set()
-        dedup = []
-        for o in options:
-            if o not in seen:
-                dedup.append(o)
-                seen.add(o)
-        options = dedup
-
-        rng.shuffle(options)
-        return options
-
     # ------------ MAIN PRACTICE FLOW ------------
 
     if total > 0:
         # --- NEXT QUESTION BUTTON ---
         if request.method == "POST" and "next" in request.POST:
             # Just pick a new random question; don't change stats
-            question = random.choice(list(qs))
+            question = _random_question(qs, total)
             seed = random.randint(1, 10_000_000)
-            choices = build_choices_with_seed(question, seed)
+            choices = build_choices_with_seed(question, seed) if question else []
             # selected / is_correct stay as None so template shows fresh state
 
         # --- CHECK ANSWER SUBMISSION ---
@@ -403,13 +212,8 @@ def mc_quiz(request, mode):
                 choices = build_choices_with_seed(question, seed)
 
                 # NORMALISED, CASE/PUNCTUATION-INSENSITIVE COMPARISON
-                correct_answer_raw = (question.answer_text or "")
-                correct_answer = correct_answer_raw.strip()
-
-                selected_norm = normalise_answer(selected or "")
-                correct_norm = normalise_answer(correct_answer)
-
-                is_correct = (selected_norm == correct_norm)
+                # (question.answer_norm is stored on save)
+                is_correct = (normalise_answer(selected or "") == question.answer_norm)
 
                 if is_correct:
                     request.session[counter_key_correct] += 1
@@ -418,11 +222,14 @@ def mc_quiz(request, mode):
 
                 request.session.modified = True
 
+                # buffered, written in batches (see quiz/events.py)
+                record_answer(question.id, selected, is_correct, mode)
+
         # --- FIRST LOAD / NON-POST ---
         else:
-            question = random.choice(list(qs))
+            question = _random_question(qs, total)
             seed = random.randint(1, 10_000_000)
-            choices = build_choices_with_seed(question, seed)
+            choices = build_choices_with_seed(question, seed) if question else []
 
     # Stats
     correct_count = request.session.get(counter_key_correct, 0)
@@ -434,8 +241,6 @@ def mc_quiz(request, mode):
         min(round(answered * 100 / total), 100) if (total > 0 and answered > 0) else 0
     )
 
-    topic_choices = Question.TOPIC_CHOICES  # for dropdown
-
     return render(request, "quiz/mc_quiz.html", {
         "mode": mode,
         "question": question,
@@ -449,14 +254,259 @@ def mc_quiz(request, mode):
         "answered": answered,
         "accuracy": accuracy,
         "progress_percent": progress_percent,
-        "subcategories": subcategories,
+        "subcategories": facets["subcategories"],
+        "bank_version": get_bank_version(),
         "current_sub": current_sub,
         "current_topic": current_topic,
-        "topic_choices": topic_choices,
+        "topic_choices": facets["topics"],
         "search_query": search_query,
     })
 
 
+# ----------------- JSON API -----------------
+
+API_MAX_BATCH = 20
+
+
+def _random_questions(qs, total, n):
+    """
+    Up to `n` distinct random rows of `qs`: n id-only offset lookups
+    (covering index) and one in_bulk(), instead of loading the whole set.
+    """
+    if total <= 0:
+        return []
+    offsets = random.sample(range(total), min(n, total))
+    ids_qs = qs.order_by("id").values_list("id", flat=True)
+    ids = []
+    for offset in offsets:
+        ids.extend(ids_qs[offset:offset + 1])
+    by_id = Question.objects.in_bulk(ids)
+    return [by_id[q_id] for q_id in ids if q_id in by_id]
+
+
+@require_GET
+def api_next_questions(request, mode):
+    """
+    GET /api/quiz/<mode>/next?n=5[&sub=..&topic=..&q=..]
+
+    N questions with their seeded choices, so the client can prefetch
+    while the learner reads the current one. Answers are not included;
+    POST to /api/quiz/check to mark one.
+    """
+    try:
+        n = min(max(int(request.GET.get("n", 5)), 1), API_MAX_BATCH)
+    except ValueError:
+        return JsonResponse({"error": "n must be a number"}, status=400)
+
+    current_sub, current_topic, search_query = _read_question_filters(request)
+    qs, _, total = _filter_questions(mode, current_sub, current_topic, search_query)
+
+    items = []
+    for question in _random_questions(qs, total, n):
+        seed = random.randint(1, 10_000_000)
+        items.append({
+            "id": question.id,
+            "question": question.question_text,
+            "subcategory": question.subcategory,
+            "topic": question.topic,
+            "seed": seed,
+            "choices": build_choices_with_seed(question, seed),
+        })
+
+    return JsonResponse({"mode": mode, "total": total, "questions": items})
+
+
+@require_GET
+@condition(etag_func=lambda request, mode: f"facets-{mode}-{get_bank_version()}")
+def api_quiz_facets(request, mode):
+    """
+    GET /api/quiz/<mode>/facets
+
+    The mc_quiz dropdown data (question sets and topics with counts).
+    Only changes with the bank, so revalidation is a 304.
+    """
+    facets = get_question_facets(mode)
+    response = JsonResponse({
+        "mode": mode,
+        "total": facets["total"],
+        "subcategories": [{"name": sub, "count": n} for sub, n in facets["subcategories"]],
+        "topics": [{"key": key, "label": label, "count": n} for key, label, n in facets["topics"]],
+    })
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+@require_POST
+def api_check_answer(request):
+    """
+    POST /api/quiz/check  (form fields or a JSON body)
+      question_id, choice, seed, mode (optional, for the session stats)
+
+    Same normalised comparison as mc_quiz; also updates the mc_quiz
+    session counters for `mode` and records the answer event.
+    """
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"error": "invalid JSON"}, status=400)
+        if not isinstance(data, dict):
+            return JsonResponse({"error": "expected a JSON object"}, status=400)
+    else:
+        data = request.POST
+
+    q_id = data.get("question_id")
+    if isinstance(q_id, bool) or not isinstance(q_id, (int, str)):
+        return JsonResponse({"error": "question_id is required"}, status=400)
+    try:
+        q_id = int(q_id)
+    except ValueError:
+        return JsonResponse({"error": "question_id is required"}, status=400)
+
+    selected = data.get("choice") or ""
+    mode = data.get("mode") or ""
+    if not isinstance(selected, str) or not isinstance(mode, str):
+        return JsonResponse({"error": "choice and mode must be strings"}, status=400)
+    mode = mode.strip()
+    # the mode names a session counter, so only the real ones
+    if mode and mode not in packs.pack_modes():
+        return JsonResponse({"error": "unknown mode"}, status=400)
+
+    question = Question.objects.filter(id=q_id).first()
+    if question is None:
+        return JsonResponse({"error": "unknown question"}, status=404)
+
+    is_correct = (normalise_answer(selected) == question.answer_norm)
+
+    if mode:
+        counter_key = f"mc_correct_{mode}" if is_correct else f"mc_incorrect_{mode}"
+        request.session[counter_key] = request.session.get(counter_key, 0) + 1
+    record_answer(question.id, selected, is_correct, mode or "api")
+
+    return JsonResponse({
+        "question_id": question.id,
+        "correct": is_correct,
+        "correct_answer": (question.answer_text or "").strip(),
+    })
+
+
+@require_GET
+def api_offline_pack(request, mode):
+    """
+    GET /api/packs/<mode>.json
+
+    The whole mode as one pack (questions, choices, salted answer
+    hashes -- see quiz/packs.py), pre-compressed on disk per bank
+    version. Strong ETag per version + encoding; a client that already
+    has the current version gets a 304.
+    """
+    if mode not in packs.pack_modes():
+        raise Http404("Unknown pack")
+    return packs.pack_response(request, packs.get_pack_store(), mode, f"{mode}.json")
+
+
+BANK_CHANGES_PAGE_SIZE = 500
+
+
+@require_GET
+@gzip_page
+def api_bank_changes(request):
+    """
+    GET /api/bank/changes?since=<version>[&limit=500]
+
+    What changed in Question / BookModeSession after `since` (a pack's
+    change_version, or the previous page's `next`): upserts with the
+    current row, deletes as tombstones. Page until has_more is false.
+    """
+    try:
+        since = max(int(request.GET.get("since", 0)), 0)
+        limit = min(max(int(request.GET.get("limit", BANK_CHANGES_PAGE_SIZE)), 1), BANK_CHANGES_PAGE_SIZE)
+    except ValueError:
+        return JsonResponse({"error": "since and limit must be numbers"}, status=400)
+
+    return JsonResponse(changes_since(since, limit))
+
+
+# ----------------- OFFLINE (SERVICE WORKER) -----------------
+
+def offline_precache(request):
+    """
+    App shell for the service worker (quiz/static/quiz/sw.js) to
+    precache on install: the main pages plus their static assets, with
+    the hashed static URLs of this deploy.
+    """
+    urls = [
+        reverse("home"),
+        reverse("practice_menu"),
+        reverse("exam_progress"),
+        reverse("book_home"),
+        static("quiz/style.css"),
+        static("quiz/manifest.webmanifest"),
+        static("quiz/icon.svg"),
+    ]
+    response = JsonResponse({"urls": urls})
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+# ----------------- SPACED-REPETITION REVIEW -----------------
+
+def review_quiz(request):
+    """
+    Review mode: like mc_quiz, but the next question comes from the
+    learner's SM-2 queue (quiz/review.py) instead of uniformly at random.
+
+      - due cards first (oldest due first)
+      - then questions the learner hasn't seen yet
+      - each answer reschedules that one card
+    """
+    learner_key = get_learner_key(request)
+    selected = None
+    is_correct = None
+    question = None
+    state = None
+
+    if request.method == "POST" and "choice" in request.POST and "question_id" in request.POST:
+        selected = request.POST.get("choice")
+        try:
+            question = Question.objects.get(id=int(request.POST.get("question_id")))
+        except (Question.DoesNotExist, ValueError):
+            question = None
+
+        try:
+            seed = int(request.POST.get("seed", "0"))
+        except ValueError:
+            seed = 0
+
+        if question:
+            is_correct = (normalise_answer(selected or "") == question.answer_norm)
+            card = record_review(learner_key, question, is_correct)
+            record_answer(question.id, selected, is_correct, "review")
+            state = "answered"
+        else:
+            selected = None
+
+    if question is None:
+        question, state = next_review_question(learner_key)
+        seed = random.randint(1, 10_000_000)
+        card = None
+
+    choices = build_choices_with_seed(question, seed) if question else []
+    due_count, card_count = review_counts(learner_key)
+
+    return render(request, "quiz/review_quiz.html", {
+        "question": question,
+        "choices": choices,
+        "selected": selected,
+        "is_correct": is_correct,
+        "seed": seed,
+        "state": state,
+        "card": card,
+        "due_count": due_count,
+        "card_count": card_count,
+    })
+
+
 # ----------------- EXAM MODE -----------------
 
 def exam_quiz(request):
@@ -464,97 +514,62 @@ def exam_quiz(request):
     PSI-style exam:
       - Fixed number of questions (EXAM_QUESTION_COUNT)
       - Linear exam, one by one
-      - Timer stored in session
-      - Review at the end
+      - The whole paper (questions + choices) derives from one exam seed
+        and is cached for the attempt (see quiz/exam.py)
+      - The session only holds the seed, the question ids (so a rebuilt
+        paper can't shift when the bank changes), the index, a packed
+        answer vector and the deadline, so the signed cookie stays small
+      - Review at the end, rebuilt server-side from the seed
     """
     session = request.session
 
-    # 🔹 Always start a fresh exam on a plain GET request.
-    if request.method == "GET":
-        for key in [
-            "exam_active",
-            "exam_question_ids",
-            "exam_index",
-            "exam_correct",
-            "exam_incorrect",
-            "exam_time_left",
-            "exam_review",
-        ]:
-            session.pop(key, None)
-        session.modified = True
-
-    # -------- START NEW EXAM IF NEEDED --------
-    if not session.get("exam_active"):
-        all_ids = list(Question.objects.values_list("id", flat=True))
-        if len(all_ids) <= EXAM_QUESTION_COUNT:
-            selected_ids = all_ids
-        else:
-            selected_ids = random.sample(all_ids, EXAM_QUESTION_COUNT)
-
-        session["exam_active"] = True
-        session["exam_question_ids"] = selected_ids
+    # 🔹 Always start a fresh exam on a plain GET request (or when the
+    # session holds answers packed the old, one-character way).
+    if (request.method == "GET" or "exam_seed" not in session
+            or len(session.get("exam_answers", "")) % ANSWER_WIDTH):
+        _clear_exam_session(session)
+        session["exam_seed"] = new_exam_seed()
+        session["exam_ids"] = exam_question_ids(session["exam_seed"])
         session["exam_index"] = 0
-        session["exam_correct"] = 0
-        session["exam_incorrect"] = 0
-        session["exam_time_left"] = EXAM_DURATION_SECONDS
-        session["exam_review"] = []
-        session.modified = True
+        session["exam_answers"] = ""
+        session["exam_deadline"] = int(time.time()) + EXAM_DURATION_SECONDS
 
-    ids = session.get("exam_question_ids", [])
+    seed = session["exam_seed"]
     index = session.get("exam_index", 0)
-    correct_count = session.get("exam_correct", 0)
-    incorrect_count = session.get("exam_incorrect", 0)
-    time_left = session.get("exam_time_left", EXAM_DURATION_SECONDS)
-    review = session.get("exam_review", [])
+    answers = session.get("exam_answers", "")
+    deadline = session.get("exam_deadline", 0)
+
+    paper = get_exam_paper(seed, session.get("exam_ids"))
+    total = len(paper)
+    time_left = max(deadline - int(time.time()), 0)
+
+    # questions deleted mid-attempt keep their slot but are skipped
+    skipped = skip_removed(paper, index, answers)
+    if skipped != (index, answers):
+        index, answers = skipped
+        session["exam_index"], session["exam_answers"] = index, answers
 
-    total = len(ids)
-    finished = False
     selected = None
     is_correct = None
-    question = None
-    choices = []
-    seed = None
 
-    # -------- UPDATE TIMER FROM POST --------
-    if request.method == "POST":
-        tl_str = request.POST.get("time_left")
-        try:
-            tl = int(float(tl_str))
-            time_left = max(tl, 0)
-        except (TypeError, ValueError):
-            pass
-        session["exam_time_left"] = time_left
-        session.modified = True
+    if request.method == "POST" and time_left > 0 and index < total:
+        item = paper[index]
+
+        if request.POST.get("check") == "1" and answered_count(answers) == index:
+            answers += pack_answer(item, request.POST.get("choice"))
+            session["exam_answers"] = answers
 
-        if time_left <= 0:
-            finished = True
+        elif request.POST.get("next") == "1" and answered_count(answers) > index:
+            index, answers = skip_removed(paper, index + 1, answers)
+            session["exam_index"], session["exam_answers"] = index, answers
 
     # -------- FINISH CONDITIONS --------
-    if index >= total:
-        finished = True
-
-    if finished:
-        context_review = []
-        for item in review:
-            context_review.append({
-                "question": item["question"],
-                "your_answer": item.get("your_answer"),
-                "correct_answer": item.get("correct_answer"),
-                "is_correct": item.get("is_correct", False),
-            })
-
-        passed = correct_count >= 18  # Life in the UK style pass mark
-
-        for key in [
-            "exam_active", "exam_question_ids", "exam_index",
-            "exam_correct", "exam_incorrect",
-            "exam_time_left", "exam_review",
-        ]:
-            session.pop(key, None)
-        session.modified = True
-
-        minutes = time_left // 60
-        seconds = time_left % 60
+    if time_left <= 0 or index >= total:
+        correct_count, incorrect_count, review = score_exam(paper, answers)
+        _clear_exam_session(session)
+
+        started_at = datetime.fromtimestamp(deadline - EXAM_DURATION_SECONDS, tz=dt_timezone.utc)
+        record_exam_attempt(get_learner_key(request), seed, paper, answers, started_at)
 
         return render(request, "quiz/exam.html", {
             "finished": True,
@@ -564,141 +579,92 @@ def exam_quiz(request):
             "total": total,
             "correct": correct_count,
             "incorrect": incorrect_count,
-            "passed": passed,
-            "minutes": minutes,
-            "seconds": seconds,
+            "passed": correct_count >= EXAM_PASS_MARK,
+            "minutes": time_left // 60,
+            "seconds": time_left % 60,
             "progress_percent": 100,
-            "review": context_review,
+            "review": review,
         })
 
     # -------- EXAM IN PROGRESS --------
-    q_id = ids[index]
-    question = Question.objects.get(id=q_id)
-
-    def build_choices(q, seed_value=0):
-        correct = (q.answer_text or "").strip()
-        same_topic = Question.objects.filter(topic=q.topic).exclude(id=q.id)
-        pool = list(same_topic)
-        if len(pool) < 3:
-            pool = list(Question.objects.exclude(id=q.id))
-
-        rng = random.Random(seed_value or q.id)
-        rng.shuffle(pool)
-
-        seen = {correct}
-        distractors = []
-        for cand in pool:
-            ans = (cand.answer_text or "").strip()
-            if ans and ans not in seen:
-                seen.add(ans)
-                distractors.append(ans)
-            if len(distractors) == 3:
-                break
-
-        opts = [correct] + distractors
-        rng2 = random.Random((seed_value or q.id) + 999_999)
-        rng2.shuffle(opts)
-        return opts
-
-    if request.method == "POST" and request.POST.get("check") == "1":
-        selected = request.POST.get("choice")
-        seed_str = request.POST.get("seed")
-        try:
-            seed = int(seed_str) if seed_str is not None else 0
-        except ValueError:
-            seed = 0
-
-        choices = build_choices(question, seed)
-
-        # NORMALISED, CASE/PUNCTUATION-INSENSITIVE COMPARISON
-        correct_answer_raw = (question.answer_text or "")
-        correct_answer = correct_answer_raw.strip()
-
-        selected_norm = normalise_answer(selected or "")
-        correct_norm = normalise_answer(correct_answer)
-
-        is_correct = (selected_norm == correct_norm)
-
-        if is_correct:
-            correct_count += 1
-            session["exam_correct"] = correct_count
-        else:
-            incorrect_count += 1
-            session["exam_incorrect"] = incorrect_count
-
-        review.append({
-            "question": question.question_text,
-            "your_answer": selected,
-            "correct_answer": correct_answer,
-            "is_correct": is_correct,
-        })
-        session["exam_review"] = review
-        session.modified = True
+    question = paper[index]
+    if answered_count(answers) > index:
+        # answered: show the feedback for this question
+        selected = unpack_answer(question, answer_code(answers, index))
+        is_correct = is_answer_correct(question, answer_code(answers, index))
+        if selected is None:
+            selected = request.POST.get("choice") or "(no answer)"
 
-    elif request.method == "POST" and request.POST.get("next") == "1":
-        index += 1
-        session["exam_index"] = index
-        session.modified = True
-
-        if index >= total:
-            return redirect("exam_quiz")
-
-        q_id = ids[index]
-        question = Question.objects.get(id=q_id)
-        seed = random.randint(1, 10_000_000)
-        choices = build_choices(question, seed)
-        selected = None
-        is_correct = None
-
-    else:
-        seed = random.randint(1, 10_000_000)
-        choices = build_choices(question, seed)
-
-    minutes = time_left // 60
-    seconds = time_left % 60
-    current_index = index + 1
-    progress_percent = round(index * 100 / total) if total > 0 else 0
+    correct_count, incorrect_count, _ = score_exam(paper[:answered_count(answers)], answers)
 
     return render(request, "quiz/exam.html", {
         "finished": False,
         "question": question,
-        "choices": choices,
+        "choices": question["choices"],
         "selected": selected,
         "is_correct": is_correct,
-        "seed": seed,
-        "current_index": current_index,
+        "current_index": index + 1,
         "total": total,
         "correct": correct_count,
         "incorrect": incorrect_count,
-        "minutes": minutes,
-        "seconds": seconds,
+        "minutes": time_left // 60,
+        "seconds": time_left % 60,
         "time_left": time_left,
-        "progress_percent": progress_percent,
+        "progress_percent": round(index * 100 / total) if total > 0 else 0,
         "review": [],
     })
 
 
+def _clear_exam_session(session):
+    for key in ["exam_seed", "exam_ids", "exam_index", "exam_answers", "exam_deadline"]:
+        session.pop(key, None)
+    session.modified = True
+
+
+def exam_progress(request):
+    """
+    Progress dashboard: per-topic / per-subcategory scores and the pass
+    rate over time, all read from the pre-aggregated exam rollups.
+    """
+    summary = progress_summary(get_learner_key(request))
+    pass_rate = round(summary["passed"] * 100 / summary["attempts"]) if summary["attempts"] else 0
+
+    return render(request, "quiz/exam_progress.html", {
+        **summary,
+        "pass_rate": pass_rate,
+        "pass_mark": EXAM_PASS_MARK,
+    })
+
+
 def tts_view(request):
     """
     Simple TTS endpoint.
-    Usage: /tts/?text=Some+text+to+read
-    Returns an MP3 audio response.
+    Usage: /tts/?text=Some+text+to+read[&speed=1.4]
+    Returns an audio response (MP3 for gTTS, WAV for the offline engines).
+
+    Audio comes from settings.TTS_BACKEND and is cached on disk by hash
+    of (backend, text, lang, tld, speed), so a repeat request is a static
+    file read and never touches the synthesiser. The speed in the key is
+    the one the backend really renders (gTTS: slow or normal), so slider
+    positions that sound the same share one file.
     """
     text = (request.GET.get("text") or "").strip()
     if not text:
         return HttpResponseBadRequest("Missing 'text' parameter")
 
-    # Create TTS in British English
-    tts = gTTS(text=text, lang="en", tld="co.uk")
-
-    # Write to a temporary MP3 file
-    tmp = NamedTemporaryFile(delete=False, suffix=".mp3")
-    tts.write_to_fp(tmp)
-    tmp.flush()
-    tmp.seek(0)
+    speed = tts.parse_speed(request.GET.get("speed"))
+    lang, tld = tts.DEFAULT_LANG, tts.DEFAULT_TLD
+    backend = tts.get_backend()
+    speed = backend.effective_speed(speed)
+
+    cache = tts.get_tts_cache()
+    key = cache.key(backend.name, text, lang, tld, speed)
+    try:
+        path = cache.get_or_create(
+            key, backend.suffix,
+            lambda: backend.synthesise(text, lang, tld, speed),
+        )
+    except tts.TTSError:
+        return HttpResponse("Text-to-speech is unavailable right now", status=503)
 
-    # Serve the file as an audio response
-    audio_file = open(tmp.name, "rb")
-    response = FileResponse(audio_file, content_type="audio/mpeg")
-    response["Content-Disposition"] = 'inline; filename="tts.mp3"'
-    return response
+    return tts.audio_response(request, path, etag=key, content_type=backend.content_type)